@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+ASTRALOVES - Taille des prompts ASTRA, tour par tour
+Rejoue les conversations de bench-astra-context.fixtures.json dans le
+constructeur de contexte d'AstraService, avant (historique et mémoires
+complets) et après le budget de tokens de variables.json (astra.context),
+et affiche les tokens estimés du prompt à chaque tour.
+
+services/astra/astraService.ts est généré deux fois dans un dossier
+temporaire (budget illimité, puis budget de variables.json) et exécuté tel
+quel par Node (>= 22.6, --experimental-strip-types) : buildMessages et
+estimateTokens sont ceux du template, le prompt système celui de
+src/config/openai.ts ; SDK OpenAI et client Supabase simulés.
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+GENERATOR_PATH = ROOT / 'generate-structure.py'
+FIXTURES_PATH = ROOT / 'bench-astra-context.fixtures.json'
+VARIABLES_PATH = ROOT / 'templates' / 'variables.json'
+OPENAI_CONFIG_PATH = ROOT / 'src' / 'config' / 'openai.ts'
+
+# « Avant » : un budget que rien n'atteint, historique et mémoires passent en entier
+UNLIMITED = 10 ** 9
+
+# Doublures des clients : seul le constructeur de contexte est exercé
+SUPABASE_STUB = """
+export const supabase = { rpc: async () => ({ error: null }) };
+"""
+OPENAI_SDK_STUB = """
+export default class OpenAI {}
+"""
+
+# import.meta.env de Vite pour config/openai.ts
+VITE_ENV = {'VITE_OPENAI_API_KEY': 'bench'}
+
+# Alias '@/' vers le src généré, imports sans extension (comme Vite), paquet
+# openai simulé ; import.meta.env injecté en première ligne des modules de src
+RESOLVE_HOOKS = r"""
+let src, sdk, env;
+export function initialize(data) { ({ src, sdk, env } = data); }
+export async function resolve(specifier, context, next) {
+  if (specifier === 'openai') return { url: sdk, shortCircuit: true };
+  if (!specifier.startsWith('@/')) return next(specifier, context);
+  return next(new URL(specifier.slice(2) + '.ts', src).href, context);
+}
+export async function load(url, context, next) {
+  const result = await next(url, context);
+  if (!url.startsWith(src)) return result;
+  const source = `import.meta.env ??= ${JSON.stringify(env)};` + Buffer.from(result.source).toString('utf-8');
+  return { ...result, source };
+}
+"""
+
+DRIVER = r"""
+import { readFile } from 'node:fs/promises';
+import { register } from 'node:module';
+import { pathToFileURL } from 'node:url';
+
+const [hooksPath, sdkPath, env, fixturesPath, ...builderArgs] = process.argv.slice(2);
+const { conversations } = JSON.parse(await readFile(fixturesPath, 'utf-8'));
+
+// Un src par constructeur : chacun importe ses propres '@/config/...'
+const builders = [];
+for (let i = 0; i < builderArgs.length; i += 2) {
+  const src = pathToFileURL(builderArgs[i + 1] + '/').href;
+  register(pathToFileURL(hooksPath).href, { data: { src, sdk: pathToFileURL(sdkPath).href, env: JSON.parse(env) } });
+  builders.push([builderArgs[i], await import(new URL('services/astra/astraService.ts', src).href)]);
+}
+
+const results = {};
+for (const conversation of conversations) {
+  const rows = conversation.turns.map((_, index) => ({ turn: index + 1 }));
+  let profileBuilds = 0;
+  for (const [name, module] of builders) {
+    const service = new module.AstraService();
+    // Chaque construction du bloc profil passe par profileBlocks.set
+    const set = service.profileBlocks.set.bind(service.profileBlocks);
+    service.profileBlocks.set = (...args) => (profileBuilds += name === 'après', set(...args));
+    // buildMessages marque les mémoires référencées : copie par constructeur
+    const memories = structuredClone(conversation.memories);
+    const history = [];
+    conversation.turns.forEach((turn, index) => {
+      const messages = service.buildMessages(turn.user, conversation.profile, history, memories);
+      rows[index][name] = messages.reduce((sum, message) => sum + module.messageTokens(message.content), 0);
+      history.push(
+        { message_type: 'user', content: turn.user },
+        { message_type: 'astra', content: turn.astra },
+      );
+    });
+  }
+  results[conversation.id] = { rows, profile_builds: profileBuilds };
+}
+// L'envoi groupé des last_referenced garde une minuterie armée : sortie explicite
+process.stdout.write(JSON.stringify(results), () => process.exit(0));
+"""
+
+
+def emit_service(workdir: Path, variables: dict) -> Path:
+    """Génère services/ avec variables dans workdir/src, config OpenAI réelle et Supabase simulé."""
+    workdir.mkdir()
+    config = workdir / 'variables.json'
+    config.write_text(json.dumps(variables), encoding='utf-8')
+    src = workdir / 'src'
+    subprocess.run(
+        [sys.executable, str(GENERATOR_PATH), '--base-dir', str(src), '--config', str(config),
+         '--only', 'services', '-q'],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+    (src / 'config').mkdir(parents=True, exist_ok=True)
+    (src / 'config' / 'supabase.ts').write_text(SUPABASE_STUB, encoding='utf-8')
+    shutil.copy(OPENAI_CONFIG_PATH, src / 'config' / 'openai.ts')
+    return src
+
+
+def check_node(node: str) -> None:
+    version = subprocess.run([node, '--version'], capture_output=True, text=True, check=True).stdout.strip()
+    major, minor = (int(part) for part in version.lstrip('v').split('.')[:2])
+    if (major, minor) < (22, 6):
+        sys.exit(f"❌ Node {version} : --experimental-strip-types demande Node >= 22.6 (voir --node)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Tokens des prompts ASTRA tour par tour")
+    parser.add_argument(
+        'fixtures', type=Path, nargs='?', default=FIXTURES_PATH,
+        help=f"conversations à rejouer (défaut : {FIXTURES_PATH.name})",
+    )
+    parser.add_argument('--budget', type=int, default=None, help="budget du prompt (défaut : variables.json)")
+    parser.add_argument('--node', default=shutil.which('node') or 'node', help="exécutable Node >= 22.6")
+    parser.add_argument('--json', action='store_true', help="résultats JSON sur la sortie standard")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    check_node(args.node)
+    variables = json.loads(VARIABLES_PATH.read_text(encoding='utf-8'))
+    settings = variables['astra']['context']
+    budget = args.budget or settings['budget_tokens']
+
+    with tempfile.TemporaryDirectory(prefix='astraloves-context-') as tmp:
+        workdir = Path(tmp)
+        builders = []
+        for name, prompt_budget, memory_budget in (
+            ('avant', UNLIMITED, UNLIMITED), ('après', budget, settings['memory_tokens']),
+        ):
+            variables['astra']['context'] = {
+                **settings, 'budget_tokens': prompt_budget, 'memory_tokens': memory_budget,
+            }
+            builders += [name, str(emit_service(workdir / name, variables))]
+        (workdir / 'package.json').write_text('{"type": "module"}', encoding='utf-8')
+        (workdir / 'hooks.mjs').write_text(RESOLVE_HOOKS, encoding='utf-8')
+        (workdir / 'openai.mjs').write_text(OPENAI_SDK_STUB, encoding='utf-8')
+        driver = workdir / 'driver.mjs'
+        driver.write_text(DRIVER, encoding='utf-8')
+        completed = subprocess.run(
+            [args.node, '--experimental-strip-types', '--no-warnings', str(driver),
+             str(workdir / 'hooks.mjs'), str(workdir / 'openai.mjs'), json.dumps(VITE_ENV),
+             str(args.fixtures.resolve()), *builders],
+            capture_output=True, text=True,
+        )
+    if completed.returncode != 0:
+        sys.exit(f"❌ Node a échoué :\n{completed.stderr}")
+    results = json.loads(completed.stdout)
+
+    if args.json:
+        json.dump({'budget': budget, 'conversations': results}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return results
+
+    for name, result in results.items():
+        rows = result['rows']
+        print(f"\n💬 {name} — {len(rows)} tour(s), bloc profil construit "
+              f"{result['profile_builds']} fois")
+        print("   tour   avant   après")
+        for row in rows:
+            print(f"   {row['turn']:>4} {row['avant']:>7} {row['après']:>7}")
+        before, after = sum(r['avant'] for r in rows), sum(r['après'] for r in rows)
+        print(f"   max {max(r['avant'] for r in rows)} → {max(r['après'] for r in rows)} tokens · "
+              f"total {before} → {after} ({100 * (1 - after / before):.0f} % en moins)")
+    print(f"\n📏 budget {budget} tokens estimés (mémoires ≤ {settings['memory_tokens']})")
+    return results
+
+
+if __name__ == '__main__':
+    main()
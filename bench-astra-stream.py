@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+ASTRALOVES - Temps jusqu'au premier token des réponses ASTRA
+serve : bouchon local compatible /v1/chat/completions (JSON ou flux SSE),
+        pour faire tourner l'app sans clé OpenAI :
+        VITE_OPENAI_BASE_URL=http://127.0.0.1:8787/v1
+ttft  : lance le bouchon et compare, sur les mêmes réponses simulées,
+        l'attente d'une réponse complète au premier delta reçu en streaming
+
+Benchmark de bouchon : ttft mesure le protocole HTTP (JSON complet contre
+SSE) entre ce script et le bouchon local. Le chemin réel
+(config/openai.ts, astraService.streamResponse généré) est exercé contre
+ce même bouchon par tests/test_astra_stream.py ; le rendu React
+d'AstraPage (frame par frame) se vérifie dans le navigateur avec `serve`.
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8787
+
+# Profil de génération simulé : latence avant le premier token, puis débit
+DEFAULT_FIRST_TOKEN_MS = 400
+DEFAULT_TOKEN_MS = 25
+DEFAULT_TOKENS = 80
+
+REPLY = "Tu cherches la validation. Pas la vérité. Ce que tu appelles aimer trop vite est un test d'attachement."
+
+
+def make_handler(first_token_ms: float, token_ms: float, tokens: int):
+    words = REPLY.split(' ')
+    deltas = [words[i % len(words)] + ' ' for i in range(tokens)]
+
+    class CompletionHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def cors(self):
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Headers', '*')
+
+        def do_OPTIONS(self):
+            self.send_response(204)
+            self.cors()
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_POST(self):
+            if not self.path.endswith('/chat/completions'):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            model = body.get('model', 'stub')
+            if body.get('stream'):
+                self.stream(model)
+            else:
+                self.complete(model)
+
+        def complete(self, model: str):
+            time.sleep((first_token_ms + token_ms * (len(deltas) - 1)) / 1000)
+            data = json.dumps({
+                'id': 'chatcmpl-stub', 'object': 'chat.completion', 'model': model,
+                'choices': [{
+                    'index': 0, 'finish_reason': 'stop',
+                    'message': {'role': 'assistant', 'content': ''.join(deltas).strip()},
+                }],
+            }).encode('utf-8')
+            self.send_response(200)
+            self.cors()
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def stream(self, model: str):
+            self.send_response(200)
+            self.cors()
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            time.sleep(first_token_ms / 1000)
+            for number, delta in enumerate(deltas):
+                if number:
+                    time.sleep(token_ms / 1000)
+                self.event({'delta': {'content': delta}, 'finish_reason': None}, model)
+            self.event({'delta': {}, 'finish_reason': 'stop'}, model)
+            self.chunk(b'data: [DONE]\n\n')
+            self.chunk(b'')
+
+        def event(self, choice: dict, model: str):
+            payload = {
+                'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'model': model,
+                'choices': [{'index': 0, **choice}],
+            }
+            self.chunk(f"data: {json.dumps(payload)}\n\n".encode('utf-8'))
+
+        def chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+            self.wfile.flush()
+
+    return CompletionHandler
+
+
+class StubServer(ThreadingHTTPServer):
+    # File d'attente assez longue pour des clients très parallèles (generate-horoscopes.py)
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def start_server(port: int, first_token_ms: float, token_ms: float, tokens: int) -> ThreadingHTTPServer:
+    server = StubServer(('127.0.0.1', port), make_handler(first_token_ms, token_ms, tokens))
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+def request(port: int, stream: bool) -> tuple[float, float]:
+    """(ms jusqu'au premier texte affichable, ms jusqu'à la réponse complète)."""
+    body = json.dumps({
+        'model': 'stub', 'stream': stream,
+        'messages': [{'role': 'user', 'content': 'Pourquoi je doute ?'}],
+    })
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('POST', '/v1/chat/completions', body, {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    first = None
+    if stream:
+        for line in response:
+            if not line.startswith(b'data: ') or line.strip() == b'data: [DONE]':
+                continue
+            delta = json.loads(line[6:])['choices'][0]['delta'].get('content')
+            if delta and first is None:
+                first = time.perf_counter()
+    else:
+        json.loads(response.read())  # réponse décodée : le texte est affichable
+        first = time.perf_counter()
+    done = time.perf_counter()
+    conn.close()
+    return (first - started) * 1000, (done - started) * 1000
+
+
+def run_ttft(args) -> dict:
+    server = start_server(args.port, args.first_token_ms, args.token_ms, args.tokens)
+    try:
+        results = {}
+        for mode, stream in (('complète', False), ('streaming', True)):
+            samples = [request(args.port, stream) for _ in range(args.runs)]
+            results[mode] = {
+                'ttft_ms': statistics.median(first for first, _ in samples),
+                'total_ms': statistics.median(total for _, total in samples),
+            }
+    finally:
+        server.shutdown()
+
+    print(f"🤖 bouchon HTTP local (sans SDK ni rendu React) : premier token "
+          f"{args.first_token_ms:.0f} ms, {args.tokens} tokens à {args.token_ms:.0f} ms — "
+          f"médiane de {args.runs} requête(s)")
+    for mode, result in results.items():
+        print(f"   {mode:<10} premier texte {result['ttft_ms']:7.1f} ms · "
+              f"réponse complète {result['total_ms']:7.1f} ms")
+    gain = results['complète']['ttft_ms'] - results['streaming']['ttft_ms']
+    print(f"⏱️ premier delta HTTP {gain:.0f} ms plus tôt en streaming (mesure de bouchon)")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Temps jusqu'au premier token des réponses ASTRA (bouchon HTTP)")
+    parser.add_argument('mode', choices=('ttft', 'serve'), nargs='?', default='ttft')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        '--first-token-ms', type=float, default=DEFAULT_FIRST_TOKEN_MS,
+        help=f"latence simulée avant le premier token (défaut : {DEFAULT_FIRST_TOKEN_MS} ms)",
+    )
+    parser.add_argument(
+        '--token-ms', type=float, default=DEFAULT_TOKEN_MS,
+        help=f"intervalle simulé entre deux tokens (défaut : {DEFAULT_TOKEN_MS} ms)",
+    )
+    parser.add_argument(
+        '--tokens', type=int, default=DEFAULT_TOKENS,
+        help=f"tokens par réponse (défaut : {DEFAULT_TOKENS})",
+    )
+    parser.add_argument('--runs', type=int, default=5, help="requêtes par mode (défaut : 5)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.mode == 'serve':
+        server = start_server(args.port, args.first_token_ms, args.token_ms, args.tokens)
+        print(f"🤖 bouchon OpenAI sur http://127.0.0.1:{args.port}/v1 (Ctrl+C pour arrêter)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return None
+    return run_ttft(args)
+
+
+if __name__ == '__main__':
+    main()
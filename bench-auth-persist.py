@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+ASTRALOVES - Coût de la persistance d'authStore
+Compare, pour un profil réaliste (thème natal complet, photos, User
+Supabase), l'ancienne persistance (JSON complet { user, profile } écrit à
+chaque setProfile, relu avant le premier rendu) et celle émise par les
+templates (aperçu compact versionné, écritures fusionnées hors du fil
+principal via utils/idleStorage.ts, hydratation asynchrone).
+
+utils/idleStorage.ts est généré dans un dossier temporaire et exécuté tel
+quel par Node (>= 22.6, --experimental-strip-types), avec localStorage et
+requestIdleCallback simulés. Le comportement (rafales fusionnées, pagehide,
+migrate de la version 0) est vérifié par tests/test_auth_persist.py.
+"""
+
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+GENERATOR_PATH = ROOT / 'generate-structure.py'
+VARIABLES_PATH = ROOT / 'templates' / 'variables.json'
+
+SIGNS = (
+    'Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+    'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces',
+)
+PLANETS = (
+    'sun', 'moon', 'mercury', 'venus', 'mars', 'jupiter',
+    'saturn', 'uranus', 'neptune', 'pluto', 'ascendant', 'midheaven',
+)
+ASPECTS = ('conjunction', 'sextile', 'square', 'trine', 'opposition')
+
+DRIVER = r"""
+import { pathToFileURL } from 'node:url';
+
+const [modulePath, fixturePath, fieldsJson, setsArg, runsArg] = process.argv.slice(2);
+const { user, profile } = JSON.parse(await (await import('node:fs/promises')).readFile(fixturePath, 'utf-8'));
+const fields = JSON.parse(fieldsJson);
+const sets = Number(setsArg);
+const runs = Number(runsArg);
+
+const store = new Map();
+globalThis.localStorage = {
+  getItem: (name) => (store.has(name) ? store.get(name) : null),
+  setItem: (name, value) => store.set(name, String(value)),
+  removeItem: (name) => store.delete(name),
+};
+globalThis.requestIdleCallback = (callback) => setTimeout(callback, 0);
+globalThis.cancelIdleCallback = (handle) => clearTimeout(handle);
+
+const { createIdleStorage } = await import(pathToFileURL(modulePath).href);
+
+const toSnapshot = (p) => Object.fromEntries(fields.map((field) => [field, p[field]]));
+const median = (values) => values.sort((a, b) => a - b)[values.length >> 1];
+
+function time(fn) {
+  const samples = [];
+  for (let run = 0; run < runs; run++) {
+    const started = performance.now();
+    fn();
+    samples.push(performance.now() - started);
+  }
+  return median(samples);
+}
+
+// Chaque refetch produit un nouvel objet profil de même contenu
+const refetches = Array.from({ length: sets }, () => structuredClone(profile));
+
+// Avant : persist + localStorage synchrone, état complet à chaque set
+const before = {
+  write_ms: time(() => {
+    for (const p of refetches) {
+      localStorage.setItem('before', JSON.stringify({ state: { user, profile: p }, version: 0 }));
+    }
+  }),
+};
+const beforeJson = localStorage.getItem('before');
+before.bytes = Buffer.byteLength(beforeJson);
+before.hydrate_ms = time(() => JSON.parse(beforeJson));
+
+// Après : setItem ne fait que retenir la valeur, une seule sérialisation par rafale
+const storage = createIdleStorage();
+const after = {
+  write_ms: time(() => {
+    for (const p of refetches) storage.setItem('after', { state: { snapshot: toSnapshot(p) }, version: 1 });
+  }),
+};
+after.idle_ms = time(() => {
+  storage.setItem('after', { state: { snapshot: toSnapshot(profile) }, version: 1 });
+  storage.flush();
+});
+const afterJson = localStorage.getItem('after');
+after.bytes = Buffer.byteLength(afterJson);
+after.hydrate_ms = time(() => JSON.parse(afterJson));
+const hydrated = await storage.getItem('after');
+after.hydrate_ok = JSON.stringify(hydrated) === afterJson;
+
+process.stdout.write(JSON.stringify({ before, after }));
+process.exit(0);
+"""
+
+
+def realistic_profile(seed: int = 7) -> tuple[dict, dict]:
+    """Profil et User Supabase de taille réaliste (thème complet, 6 photos)."""
+    rng = random.Random(seed)
+    user_id = '5f0c2d9e-7a41-4c7b-9e2f-3b8d1a6c4e21'
+    chart = {
+        planet: {
+            'sign': rng.choice(SIGNS), 'degree': round(rng.uniform(0, 30), 4),
+            'longitude': round(rng.uniform(0, 360), 4), 'house': rng.randint(1, 12),
+            'retrograde': rng.random() < 0.2,
+        }
+        for planet in PLANETS
+    }
+    chart['houses'] = [
+        {'house': number, 'sign': rng.choice(SIGNS), 'cusp': round(rng.uniform(0, 360), 4)}
+        for number in range(1, 13)
+    ]
+    chart['aspects'] = [
+        {
+            'planet1': first, 'planet2': second, 'type': rng.choice(ASPECTS),
+            'orb': round(rng.uniform(0, 8), 3), 'applying': rng.random() < 0.5,
+        }
+        for index, first in enumerate(PLANETS) for second in PLANETS[index + 1:]
+        if rng.random() < 0.6
+    ]
+    chart['elementEnergies'] = {element: rng.randint(5, 40) for element in ('fire', 'earth', 'air', 'water')}
+    photos = [
+        {
+            'url': f'https://xyz.supabase.co/storage/v1/object/public/photos/{user_id}/{index}.webp',
+            'path': f'{user_id}/{index}.webp', 'order': index,
+            'uploaded_at': f'2026-0{rng.randint(1, 9)}-1{index}T10:2{index}:00.000Z',
+        }
+        for index in range(6)
+    ]
+    profile = {
+        'id': user_id, 'first_name': 'Camille', 'birth_date': '1994-03-21', 'birth_time': '14:32',
+        'birth_place': {'city': 'Lyon', 'country': 'France', 'lat': 45.764, 'lng': 4.8357, 'timezone': 'Europe/Paris'},
+        'gender': 'woman', 'looking_for': ['man', 'woman'],
+        'bio': "Lune en Scorpion, je cherche la profondeur plutôt que l'évidence. " * 4,
+        'current_city': 'Lyon', 'current_lat': 45.764, 'current_lng': 4.8357, 'search_radius_km': 50,
+        'photos': photos, 'avatar_url': photos[0]['url'],
+        'sun_sign': chart['sun']['sign'], 'moon_sign': chart['moon']['sign'],
+        'ascendant_sign': chart['ascendant']['sign'], 'natal_chart_data': chart,
+        **{f'energy_{element}': value for element, value in chart['elementEnergies'].items()},
+        'is_profile_complete': True, 'onboarding_completed': True, 'onboarding_step': 5,
+        'last_active_at': '2026-10-18T08:12:44.120Z', 'created_at': '2026-02-02T19:00:00.000Z',
+        'updated_at': '2026-10-18T08:12:44.120Z', 'is_verified': True, 'is_banned': False,
+    }
+    user = {
+        'id': user_id, 'aud': 'authenticated', 'role': 'authenticated', 'email': 'camille@example.com',
+        'email_confirmed_at': '2026-02-02T19:01:10.000Z', 'phone': '',
+        'confirmed_at': '2026-02-02T19:01:10.000Z', 'last_sign_in_at': '2026-10-18T08:12:40.000Z',
+        'app_metadata': {'provider': 'email', 'providers': ['email']},
+        'user_metadata': {'email': 'camille@example.com', 'email_verified': True, 'sub': user_id},
+        'identities': [{
+            'identity_id': 'b2d3c1f0-1111-4a2b-8c3d-9e8f7a6b5c4d', 'id': user_id, 'user_id': user_id,
+            'identity_data': {'email': 'camille@example.com', 'email_verified': True, 'sub': user_id},
+            'provider': 'email', 'last_sign_in_at': '2026-02-02T19:01:10.000Z',
+            'created_at': '2026-02-02T19:01:10.000Z', 'updated_at': '2026-02-02T19:01:10.000Z',
+        }],
+        'created_at': '2026-02-02T19:00:00.000Z', 'updated_at': '2026-10-18T08:12:40.000Z',
+        'is_anonymous': False,
+    }
+    return user, profile
+
+
+def emit_idle_storage(workdir: Path) -> Path:
+    """Génère utils/idleStorage.ts depuis les templates courants."""
+    subprocess.run(
+        [sys.executable, str(GENERATOR_PATH), '--base-dir', str(workdir / 'src'), '--only', 'utils', '-q'],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+    return workdir / 'src' / 'utils' / 'idleStorage.ts'
+
+
+def check_node(node: str) -> None:
+    version = subprocess.run([node, '--version'], capture_output=True, text=True, check=True).stdout.strip()
+    major, minor = (int(part) for part in version.lstrip('v').split('.')[:2])
+    if (major, minor) < (22, 6):
+        sys.exit(f"❌ Node {version} : --experimental-strip-types demande Node >= 22.6 (voir --node)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Coût d'écriture et d'hydratation d'authStore")
+    parser.add_argument('--node', default=shutil.which('node') or 'node', help="exécutable Node >= 22.6")
+    parser.add_argument('--sets', type=int, default=20, help="setProfile par rafale (défaut : 20)")
+    parser.add_argument('--runs', type=int, default=200, help="répétitions, médiane retenue (défaut : 200)")
+    parser.add_argument('--json', action='store_true', help="résultats JSON sur la sortie standard")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    check_node(args.node)
+    persist = json.loads(VARIABLES_PATH.read_text(encoding='utf-8'))['auth']['persist']
+    user, profile = realistic_profile()
+
+    with tempfile.TemporaryDirectory(prefix='astraloves-persist-') as tmp:
+        workdir = Path(tmp)
+        module = emit_idle_storage(workdir)
+        fixture = workdir / 'profile.json'
+        fixture.write_text(json.dumps({'user': user, 'profile': profile}), encoding='utf-8')
+        driver = workdir / 'driver.mjs'
+        driver.write_text(DRIVER, encoding='utf-8')
+        completed = subprocess.run(
+            [args.node, '--experimental-strip-types', '--no-warnings', str(driver), str(module),
+             str(fixture), json.dumps(persist['snapshot_fields']), str(args.sets), str(args.runs)],
+            capture_output=True, text=True,
+        )
+    if completed.returncode != 0:
+        sys.exit(f"❌ Node a échoué :\n{completed.stderr}")
+    results = json.loads(completed.stdout)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return results
+
+    before, after = results['before'], results['after']
+    print(f"💾 rafale de {args.sets} setProfile — médiane de {args.runs} répétition(s)")
+    print(f"   avant  {before['bytes']:>6} octets · fil principal {before['write_ms']:7.3f} ms "
+          f"· hydratation bloquante {before['hydrate_ms']:6.3f} ms")
+    print(f"   après  {after['bytes']:>6} octets · fil principal {after['write_ms']:7.3f} ms "
+          f"· écriture en temps libre {after['idle_ms']:6.3f} ms · hydratation asynchrone {after['hydrate_ms']:6.3f} ms")
+    if not after['hydrate_ok']:
+        sys.exit("❌ l'aperçu relu par getItem diffère de celui écrit")
+    print(f"⏱️ {before['write_ms'] / max(after['write_ms'] + after['idle_ms'], 1e-6):.0f}× moins de travail "
+          f"d'écriture, {before['bytes'] / after['bytes']:.0f}× moins d'octets à relire")
+    return results
+
+
+if __name__ == '__main__':
+    main()
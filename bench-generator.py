@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+ASTRALOVES - Benchmark du générateur de structure
+suite  : démarrage à froid, génération complète, no-op et changement d'un
+         template, sur le catalogue réel et des catalogues synthétiques,
+         résultats JSON comparés à une baseline versionnée
+emit   : passage à l'échelle de l'émission parallèle (--jobs)
+         et coût des modes de durabilité (--durability)
+render : débit du moteur de templates sur tout le catalogue
+"""
+
+import argparse
+import contextlib
+import datetime
+import importlib.util
+import io
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+BASELINE_PATH = ROOT / 'bench-generator.baseline.json'
+
+# Écart relatif au-delà duquel une mesure est signalée comme régression
+REGRESSION_THRESHOLD = 0.20
+
+
+def load_generator():
+    """Charge generate-structure.py (nom non importable directement)."""
+    spec = importlib.util.spec_from_file_location(
+        'generate_structure', ROOT / 'generate-structure.py'
+    )
+    module = importlib.util.module_from_spec(spec)
+    # Enregistré pour que le pool de validation puisse sérialiser ses fonctions
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def simulate_latency(gen, seconds: float):
+    """Ajoute une latence fixe à chaque écriture, comme sur un montage réseau."""
+    create_file = gen.create_file
+
+    def slow_create_file(*args, **kwargs):
+        time.sleep(seconds)
+        return create_file(*args, **kwargs)
+
+    gen.create_file = slow_create_file
+
+
+def synthetic_tasks(gen, files: int, dirs: int, size: int):
+    content = ('// synthetic\n' + 'x' * 64 + '\n') * max(1, size // 78)
+    return [
+        gen.Task('synthetic', gen.BASE_DIR / f'd{i % dirs}' / f'f{i}.ts', content)
+        for i in range(files)
+    ]
+
+
+def bench_jobs(gen, work_dir: Path, files: int, dirs: int, size: int, jobs: int, runs: int,
+               durability: str = 'off'):
+    """Meilleur temps (s) d'une génération complète dans un arbre vide."""
+    best = float('inf')
+    for _ in range(runs):
+        target = work_dir / 'run'
+        shutil.rmtree(target, ignore_errors=True)
+        gen.set_base_dir(target / 'src')
+        tasks = synthetic_tasks(gen, files, dirs, size)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.run_tasks(tasks, {}, jobs=jobs, durability=durability)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def catalog_sources(gen, scale: int):
+    """Sources du catalogue réel, dupliquées scale fois avec un suffixe unique."""
+    store = gen.TemplateStore()
+    sources = [
+        (f"{section['key']}/{name}", store.read(section['key'], name))
+        for section in store.sections()
+        for name in section.get('templates', [])
+    ]
+    return [
+        (f'{where}#{i}', f'{source}// {i}\n' if i else source)
+        for i in range(scale)
+        for where, source in sources
+    ]
+
+
+def bench_render(gen, scale: int, runs: int):
+    sources = catalog_sources(gen, scale)
+    variables = gen.load_variables()
+    total_bytes = sum(len(source.encode('utf-8')) for _, source in sources)
+
+    def timed(renderer):
+        start = time.perf_counter()
+        for where, source in sources:
+            renderer.render(source, where)
+        return time.perf_counter() - start
+
+    # À froid : compilation + rendu ; à chaud : même Renderer, rendu mémoïsé
+    cold = min(timed(gen.Renderer(variables)) for _ in range(runs))
+    renderer = gen.Renderer(variables)
+    timed(renderer)
+    warm = min(timed(renderer) for _ in range(runs))
+
+    print(f"📊 {len(sources)} templates, {total_bytes / 1024:.0f} Kio")
+    print(f"{'mode':>8} {'temps (ms)':>12} {'templates/s':>12} {'Mio/s':>8}")
+    for mode, elapsed in (('froid', cold), ('mémoïsé', warm)):
+        print(f"{mode:>8} {elapsed * 1000:>12.2f} {len(sources) / elapsed:>12.0f} "
+              f"{total_bytes / elapsed / 2**20:>8.1f}")
+
+
+def write_catalog(gen, target: Path, size: int | None):
+    """Écrit un dossier de templates : le réel (size=None), ou le réel plus size
+    templates synthétiques (le réel reste présent pour que leurs imports '@/…'
+    se résolvent à la validation)."""
+    real = gen.TemplateStore()
+    shutil.copytree(real.root, target)
+    if size is None:
+        return len([name for section in real.sections() for name in section.get('templates', [])])
+
+    sources = [
+        (name, real.read(section['key'], name))
+        for section in real.sections()
+        for name in section.get('templates', [])
+    ]
+    sections = []
+    per_section = 500
+    for start in range(0, size, per_section):
+        key = f's{start // per_section:03d}'
+        names = []
+        (target / key).mkdir(parents=True)
+        for i in range(start, min(size, start + per_section)):
+            origin, source = sources[i % len(sources)]
+            # Même extension que la source : une page .tsx reste validée en JSX
+            name = f't{i:05d}{Path(origin).suffix}'
+            comment = '--' if name.endswith('.sql') else '//'
+            source += f'{comment} synthetic {i}\n'
+            (target / key / f'{name}.tpl').write_text(source, encoding='utf-8')
+            names.append(name)
+        sections.append({'key': key, 'label': key, 'dest': f'synthetic/{key}', 'templates': names})
+    index = json.loads((target / 'index.json').read_text(encoding='utf-8'))
+    index['sections'] = [*sections, *index['sections']]
+    (target / 'index.json').write_text(json.dumps(index), encoding='utf-8')
+    return size
+
+
+def timed_subprocess(argv: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(argv, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def bench_startup(runs: int) -> dict:
+    """Interpréteur nu, puis interpréteur + import du générateur (sans génération)."""
+    load = (
+        "import importlib.util as u;"
+        f"s=u.spec_from_file_location('g', {str(ROOT / 'generate-structure.py')!r});"
+        "m=u.module_from_spec(s);s.loader.exec_module(m)"
+    )
+    interpreter = [timed_subprocess([sys.executable, '-c', 'pass']) for _ in range(runs)]
+    with_import = [timed_subprocess([sys.executable, '-c', load]) for _ in range(runs)]
+    return {
+        'interpreter_ms': statistics.median(interpreter) * 1000,
+        'import_ms': (statistics.median(with_import) - statistics.median(interpreter)) * 1000,
+    }
+
+
+def bench_catalog(gen, work_dir: Path, size: int | None, runs: int, jobs: int) -> dict:
+    templates = work_dir / 'templates'
+    count = write_catalog(gen, templates, size)
+    store = gen.TemplateStore(templates)
+    section = store.sections()[0]
+    changed = store.source_path(section['key'], section['templates'][0])
+    original = changed.read_text(encoding='utf-8')
+
+    def run() -> float:
+        argv = ['--base-dir', str(work_dir / 'out' / 'src'), '--templates-dir', str(templates),
+                '--jobs', str(jobs)]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            gen.main(argv)
+        return time.perf_counter() - start
+
+    full, noop, single = [], [], []
+    for i in range(runs):
+        shutil.rmtree(work_dir / 'out', ignore_errors=True)
+        full.append(run())
+        noop.append(run())
+        changed.write_text(original + f'// bench {i}\n', encoding='utf-8')
+        single.append(run())
+    return {
+        'templates': count,
+        'full_ms': statistics.median(full) * 1000,
+        'noop_ms': statistics.median(noop) * 1000,
+        'single_ms': statistics.median(single) * 1000,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Affiche le tableau de comparaison et retourne les régressions."""
+    regressions = []
+    print(f"\n{'mesure':<28} {'baseline':>10} {'actuel':>10} {'écart':>8}")
+    for catalog, metrics in results['results'].items():
+        for metric, value in metrics.items():
+            if not metric.endswith('_ms'):
+                continue
+            name = f'{catalog}.{metric}'
+            before = baseline.get('results', {}).get(catalog, {}).get(metric)
+            if not before:
+                print(f"{name:<28} {'—':>10} {value:>10.1f} {'':>8}")
+                continue
+            delta = (value - before) / before
+            flag = ' ⚠️' if delta > threshold else ''
+            print(f"{name:<28} {before:>10.1f} {value:>10.1f} {delta:>+7.0%}{flag}")
+            if delta > threshold:
+                regressions.append(name)
+    return regressions
+
+
+def bench_suite(args):
+    gen = load_generator()
+    sizes = [None if size == 'real' else int(size) for size in args.sizes.split(',')]
+    work_root = args.dir or (Path('/dev/shm') if Path('/dev/shm').is_dir() else None)
+    if args.dir:
+        args.dir.mkdir(parents=True, exist_ok=True)
+
+    results = {
+        'meta': {
+            'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': args.runs,
+            'jobs': args.jobs,
+        },
+        'results': {'startup': bench_startup(args.runs)},
+    }
+    print(f"📊 startup: {results['results']['startup']}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory(dir=work_root) as tmp:
+            key = 'real' if size is None else f'synthetic_{size}'
+            results['results'][key] = bench_catalog(gen, Path(tmp), size, args.runs, args.jobs)
+            print(f"📊 {key}: {results['results'][key]}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+        print(f"💾 Baseline enregistrée dans {args.baseline.name}")
+        return
+
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} régression(s) > {args.threshold:.0%} : "
+                  f"{', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+def bench_emit(args):
+    gen = load_generator()
+    if args.latency_ms:
+        simulate_latency(gen, args.latency_ms / 1000)
+    jobs_list = [int(j) for j in args.jobs.split(',')]
+    if args.dir:
+        args.dir.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        work_dir = Path(tmp)
+        print(f"📊 {args.files} fichiers, {args.dirs} dossiers, {args.size} o/fichier, "
+              f"latence {args.latency_ms} ms")
+        print(f"{'durabilité':>10} {'jobs':>6} {'temps (ms)':>12} {'fichiers/s':>12} "
+              f"{'speedup':>9}")
+        baseline = None
+        for durability in args.durability.split(','):
+            for jobs in jobs_list:
+                elapsed = bench_jobs(gen, work_dir, args.files, args.dirs, args.size, jobs,
+                                     args.runs, durability)
+                baseline = baseline or elapsed
+                print(f"{durability:>10} {jobs:>6} {elapsed * 1000:>12.1f} "
+                      f"{args.files / elapsed:>12.0f} {baseline / elapsed:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de generate-structure.py")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    suite = commands.add_parser('suite', help="démarrage, complet, no-op, un template")
+    suite.add_argument('--sizes', default='real,1000,10000',
+                       help="catalogues : 'real' et/ou nombres de templates synthétiques")
+    suite.add_argument('--runs', type=int, default=3)
+    suite.add_argument('--jobs', type=int, default=8)
+    suite.add_argument('--dir', type=Path, default=None,
+                       help="dossier de travail, créé au besoin (défaut : /dev/shm si disponible)")
+    suite.add_argument('--output', type=Path, default=None, help="résultats JSON")
+    suite.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    suite.add_argument('--save-baseline', action='store_true',
+                       help="remplace la baseline par les résultats de ce run")
+    suite.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    suite.add_argument('--fail-on-regression', action='store_true',
+                       help="code de sortie 1 en cas de régression")
+
+    emit = commands.add_parser('emit', help="écriture parallèle et durabilité")
+    emit.add_argument('--files', type=int, default=2000)
+    emit.add_argument('--dirs', type=int, default=50)
+    emit.add_argument('--size', type=int, default=2048, help="octets par fichier")
+    emit.add_argument('--jobs', default='1,2,4,8,16')
+    emit.add_argument('--runs', type=int, default=3)
+    emit.add_argument('--durability', default='off',
+                      help="modes à comparer, ex : off,batch,strict")
+    emit.add_argument('--dir', type=Path, default=None,
+                      help="dossier de travail, créé au besoin (ex : un montage réseau ou overlay)")
+    emit.add_argument('--latency-ms', type=float, default=0.0,
+                      help="latence simulée par écriture (FS réseau)")
+
+    render = commands.add_parser('render', help="débit du moteur de templates")
+    render.add_argument('--scale', type=int, default=100,
+                        help="nombre de copies du catalogue à rendre")
+    render.add_argument('--runs', type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == 'suite':
+        bench_suite(args)
+    elif args.command == 'emit':
+        bench_emit(args)
+    else:
+        bench_render(load_generator(), args.scale, args.runs)
+
+
+if __name__ == '__main__':
+    main()
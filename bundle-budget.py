@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+ASTRALOVES - Budget du bundle Vite, hors ligne
+Lit le manifest du build (dist/.vite/manifest.json, build.manifest de
+vite.config.ts) et dist/assets, calcule en parallèle les tailles brute,
+gzip et brotli de chaque chunk, et les rattache à la section de
+templates/index.json qui a produit leur module source (pages, services, ...).
+
+Le coût d'une route (routes.paths de variables.json) est celui de l'entrée
+et de la page, avec leurs imports statiques et leur CSS : c'est ce que le
+navigateur télécharge pour afficher la route. Il est comparé aux budgets de
+bundle-budget.json, puis à la baseline bundle-budget.baseline.json.
+
+  npm run build && python3 bundle-budget.py
+  python3 bundle-budget.py --save-baseline
+
+brotli est optionnel (pip install brotli) : sans lui la colonne reste vide
+et les budgets exprimés en brotli retombent sur gzip.
+"""
+
+import argparse
+import gzip
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).parent
+
+CONFIG_PATH = ROOT / 'bundle-budget.json'
+BASELINE_PATH = ROOT / 'bundle-budget.baseline.json'
+DIST_DIR = ROOT / 'dist'
+
+# Vite 5 : .vite/manifest.json ; Vite 4 : manifest.json
+MANIFEST_NAMES = ('.vite/manifest.json', 'manifest.json')
+
+ENTRY_ROUTE = '(entrée)'
+SHARED_SECTION = 'partagé'
+OUTSIDE_SECTION = 'hors templates'
+
+# Écart relatif au-delà duquel une taille est signalée comme régression
+REGRESSION_THRESHOLD = 0.05
+
+
+def load_script(name: str):
+    """Charge un script voisin (nom avec tirets, non importable directement)."""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_')[:-3], ROOT / name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_manifest(dist: Path) -> dict:
+    for name in MANIFEST_NAMES:
+        path = dist / name
+        if path.exists():
+            return json.loads(path.read_text(encoding='utf-8'))
+    sys.exit(f"❌ Manifest Vite introuvable dans {dist} (build.manifest: true, puis npm run build)")
+
+
+def sizes(path: Path) -> dict:
+    data = path.read_bytes()
+    return {
+        'raw': len(data),
+        'gzip': len(gzip.compress(data, compresslevel=9, mtime=0)),
+        'brotli': len(brotli.compress(data, quality=11)) if brotli else None,
+    }
+
+
+def measure(dist: Path, files: list[str], jobs: int) -> dict[str, dict]:
+    """Tailles de chaque fichier ; zlib et brotli relâchent le GIL, des threads suffisent."""
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return dict(zip(files, pool.map(lambda name: sizes(dist / name), files)))
+
+
+def section_owners(gen) -> dict[str, str]:
+    """Chemin de sortie (relatif à la racine) → clé de la section qui l'émet."""
+    owners = {}
+    for section in gen.TemplateStore().sections():
+        directory = gen.section_dir(section)
+        for name in [*section.get('templates', []), *section.get('generated', {})]:
+            owners[(directory / name).relative_to(gen.ROOT_DIR).as_posix()] = section['key']
+    return owners
+
+
+def chunk_files(manifest: dict, key: str) -> set[str]:
+    """Fichiers chargés avec le chunk key : lui, ses imports statiques et leur CSS."""
+    files, stack, seen = set(), [key], set()
+    while stack:
+        current = stack.pop()
+        if current in seen or current not in manifest:
+            continue
+        seen.add(current)
+        chunk = manifest[current]
+        files.add(chunk['file'])
+        files.update(chunk.get('css', []))
+        stack.extend(chunk.get('imports', []))
+    return files
+
+
+def totals(chunks: list[dict]) -> dict:
+    return {
+        metric: None if any(chunk[metric] is None for chunk in chunks) else sum(chunk[metric] for chunk in chunks)
+        for metric in ('raw', 'gzip', 'brotli')
+    }
+
+
+def analyse(manifest: dict, measured: dict[str, dict], owners: dict[str, str],
+            routes: dict[str, str], pages_dir: str) -> dict:
+    chunks = {}
+    for key, chunk in manifest.items():
+        if key.startswith('_'):
+            # Chunk commun sans module source (manualChunks, code partagé entre pages)
+            section = f"{SHARED_SECTION}:{chunk.get('name', key[1:])}"
+        else:
+            section = owners.get(chunk.get('src', key), OUTSIDE_SECTION)
+        for name in [chunk['file'], *chunk.get('css', [])]:
+            chunks.setdefault(name, {'section': section, 'src': chunk.get('src', key), **measured[name]})
+
+    sections = {}
+    for chunk in chunks.values():
+        sections.setdefault(chunk['section'], []).append(chunk)
+    sections = {label: totals(members) for label, members in sections.items()}
+
+    entries = [key for key, chunk in manifest.items() if chunk.get('isEntry')]
+    initial = set().union(*(chunk_files(manifest, key) for key in entries))
+    route_files = {ENTRY_ROUTE: initial}
+    for page, path in routes.items():
+        key = next((k for k in manifest if k.startswith(f'{pages_dir}/{page}.')), None)
+        if key is not None:
+            route_files[path] = initial | chunk_files(manifest, key)
+    routes = {route: totals([chunks[name] for name in files]) for route, files in route_files.items()}
+    return {'chunks': chunks, 'sections': sections, 'routes': routes}
+
+
+def kib(size: int | None) -> str:
+    return '—' if size is None else f'{size / 1024:.1f}'
+
+
+def print_report(result: dict):
+    print(f"\n{'chunk':<44} {'section':<22} {'brut':>8} {'gzip':>8} {'brotli':>8}  (Kio)")
+    for name, chunk in sorted(result['chunks'].items(), key=lambda item: -item[1]['raw']):
+        print(f"{name:<44} {chunk['section']:<22} {kib(chunk['raw']):>8} "
+              f"{kib(chunk['gzip']):>8} {kib(chunk['brotli']):>8}")
+    print(f"\n{'section':<44} {'brut':>8} {'gzip':>8} {'brotli':>8}")
+    for label, total in sorted(result['sections'].items(), key=lambda item: -item[1]['raw']):
+        print(f"{label:<44} {kib(total['raw']):>8} {kib(total['gzip']):>8} {kib(total['brotli']):>8}")
+
+
+def check_budgets(result: dict, budgets: dict[str, float], metric: str, out=sys.stdout) -> list[str]:
+    """Tableau route / taille / budget ; retourne les routes hors budget."""
+    over = []
+    print(f"\n{'route':<20} {metric + ' (Kio)':>14} {'budget':>8} {'marge':>8}", file=out)
+    for route, total in result['routes'].items():
+        size = total[metric]
+        budget = budgets.get(route, budgets.get('*'))
+        if budget is None:
+            print(f"{route:<20} {kib(size):>14} {'—':>8}", file=out)
+            continue
+        margin = budget * 1024 - size
+        flag = ' ❌' if margin < 0 else ''
+        print(f"{route:<20} {kib(size):>14} {budget:>8.1f} {margin / 1024:>+8.1f}{flag}", file=out)
+        if margin < 0:
+            over.append(route)
+    return over
+
+
+def compare(result: dict, baseline: dict, metric: str, threshold: float, out=sys.stdout) -> list[str]:
+    """Tableau baseline / actuel par route et par section ; retourne les régressions."""
+    regressions = []
+    print(f"\n{'mesure (' + metric + ', Kio)':<36} {'baseline':>10} {'actuel':>10} {'écart':>8}", file=out)
+    for group in ('routes', 'sections'):
+        for name, total in result[group].items():
+            label = f'{group[:-1]} {name}'
+            before = baseline.get(group, {}).get(name, {}).get(metric)
+            value = total[metric]
+            if not before:
+                print(f"{label:<36} {'—':>10} {kib(value):>10}", file=out)
+                continue
+            delta = (value - before) / before
+            flag = ' ⚠️' if delta > threshold else ''
+            print(f"{label:<36} {kib(before):>10} {kib(value):>10} {delta:>+7.1%}{flag}", file=out)
+            if delta > threshold:
+                regressions.append(label)
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Budget du bundle Vite par route et par section")
+    parser.add_argument('--dist', type=Path, default=DIST_DIR, help="sortie du build (défaut : dist/)")
+    parser.add_argument('--config', type=Path, default=CONFIG_PATH)
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="remplace la baseline par les tailles de ce build")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--json', action='store_true', help="résultats JSON sur la sortie standard")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    config = json.loads(args.config.read_text(encoding='utf-8'))
+    metric = config.get('metric', 'gzip')
+    if metric == 'brotli' and brotli is None:
+        print("⚠️ module brotli absent : budgets évalués en gzip", file=sys.stderr)
+        metric = 'gzip'
+
+    gen = load_script('generate-structure.py')
+    variables = gen.load_variables()
+    pages_dest, _ = gen.catalog_pages(gen.TemplateStore())
+    pages_dir = (gen.BASE_DIR / pages_dest).relative_to(gen.ROOT_DIR).as_posix()
+    manifest = read_manifest(args.dist)
+    files = sorted({name for chunk in manifest.values() for name in [chunk['file'], *chunk.get('css', [])]})
+    missing = [name for name in files if not (args.dist / name).exists()]
+    if missing:
+        sys.exit(f"❌ {len(missing)} fichier(s) du manifest absent(s) de {args.dist} : {', '.join(missing[:5])}")
+
+    result = analyse(
+        manifest, measure(args.dist, files, args.jobs), section_owners(gen),
+        variables.get('routes', {}).get('paths', {}), pages_dir,
+    )
+
+    # Avec --json, les tableaux passent sur stderr
+    out = sys.stderr if args.json else sys.stdout
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(result)
+    if args.save_baseline:
+        baseline = {'routes': result['routes'], 'sections': result['sections']}
+        args.baseline.write_text(json.dumps(baseline, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+        print(f"💾 Baseline enregistrée dans {args.baseline.name}", file=sys.stderr)
+        return result
+
+    over = check_budgets(result, config.get('budgets_kib', {}), metric, out)
+    regressions = []
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        regressions = compare(result, baseline, metric, args.threshold, out)
+
+    if over or regressions:
+        if over:
+            print(f"\n❌ {len(over)} route(s) hors budget : {', '.join(over)}", file=out)
+        if regressions:
+            print(f"❌ {len(regressions)} régression(s) > {args.threshold:.0%} : {', '.join(regressions)}", file=out)
+        sys.exit(1)
+    print(f"\n✅ {len(result['routes'])} route(s) dans le budget ({metric})", file=out)
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+ASTRALOVES - Test de concurrence de get_or_create_quota
+Applique migration-quota-rpc.sql sur une base Postgres locale JETABLE, puis
+lance, pour chaque tour, plusieurs sessions psql qui appellent la fonction au
+même instant pour un nouvel utilisateur (comme plusieurs onglets ouverts).
+
+Vérifie que chaque tour ne crée qu'une ligne quotas, que toutes les sessions
+reçoivent le même quota, et que chaque appel tient en une seule requête
+(l'équivalent d'un rpc() PostgREST). Les sessions se comportent comme
+useQuery : une requête en erreur est relancée (jusqu'à MAX_ATTEMPTS) ; les
+allers-retours comptés sont les requêtes réellement envoyées par psql (une
+ligne \timing chacune), relances comprises.
+
+Sur une base sans Supabase, le schéma auth, auth.uid() (lu dans
+request.jwt.claim.sub, comme PostgREST) et les rôles anon / authenticated
+sont créés s'ils manquent, ainsi que des tables profiles, subscriptions et
+quotas minimales.
+
+Exemple :
+  createdb astraloves_check
+  python3 check-quota-rpc.py --dsn postgresql:///astraloves_check
+"""
+
+import argparse
+import datetime
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+MIGRATION_PATH = ROOT / 'migration-quota-rpc.sql'
+
+DEFAULT_CALLERS = 8
+DEFAULT_ROUNDS = 20
+
+# Délai laissé aux sessions pour se connecter avant l'appel simultané
+START_DELAY = 0.5
+
+# Essais par appel, comme useQuery (1 + 3 relances par défaut)
+MAX_ATTEMPTS = 4
+
+SETUP_SQL = """
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+    CREATE ROLE anon NOLOGIN;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+    CREATE ROLE authenticated NOLOGIN;
+  END IF;
+END $$;
+
+CREATE SCHEMA IF NOT EXISTS auth;
+
+DO $$
+BEGIN
+  IF to_regprocedure('auth.uid()') IS NULL THEN
+    CREATE FUNCTION auth.uid() RETURNS uuid AS
+      'SELECT nullif(current_setting(''request.jwt.claim.sub'', true), '''')::uuid'
+      LANGUAGE sql STABLE;
+  END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS profiles (
+  id uuid PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS subscriptions (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id uuid NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  tier text NOT NULL,
+  ends_at timestamptz,
+  created_at timestamptz DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS quotas (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id uuid NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+  astra_messages_used int DEFAULT 0,
+  astra_messages_limit int NOT NULL,
+  univers_clicks_used int DEFAULT 0,
+  univers_clicks_limit int NOT NULL,
+  resets_at timestamptz NOT NULL,
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now()
+);
+
+-- Ancienne clé unique par jour de supabase-schema-complete.sql, sous une forme
+-- IMMUTABLE que Postgres accepte : la migration doit la remplacer
+CREATE UNIQUE INDEX IF NOT EXISTS idx_quotas_user_date
+  ON quotas (user_id, ((resets_at AT TIME ZONE 'UTC')::date));
+"""
+
+# Une session = un onglet : attente commune, puis l'appel mesuré, relancé
+# tant qu'il échoue ; chaque requête envoyée affiche une ligne Time:
+CALLER_SQL = """
+SET request.jwt.claim.sub = '{user}';
+SELECT pg_sleep_until('{start}');
+\\set ON_ERROR_STOP 0
+\\timing on
+SELECT id FROM get_or_create_quota('{user}');
+""" + """\\if :ERROR
+SELECT id FROM get_or_create_quota('{user}');
+""" * (MAX_ATTEMPTS - 1) + "\\endif\n" * (MAX_ATTEMPTS - 1)
+
+# Seules clés uniques admises : la clé primaire et la cible du ON CONFLICT
+EXPECTED_UNIQUE_KEYS = {'quotas_pkey', 'idx_quotas_user_id_resets_at_unique'}
+UNIQUE_KEYS_SQL = """
+SELECT indexrelid::regclass FROM pg_index WHERE indrelid = 'quotas'::regclass AND indisunique;
+"""
+
+TIMING_RE = re.compile(r'^Time: ([\d.]+) ms', re.M)
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f-]{27}$', re.M)
+
+
+def psql(dsn: str, script: str) -> str:
+    """Exécute un script psql et retourne sa sortie (arrêt à la première erreur)."""
+    result = subprocess.run(
+        ['psql', '-X', '-q', '-A', '-t', '-v', 'ON_ERROR_STOP=1', '-d', dsn, '-f', '-'],
+        input=script, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout
+
+
+def call(dsn: str, user: str, start: str) -> tuple[str | None, list[float]]:
+    """(id du quota reçu ou None, durée de chaque aller-retour en ms) pour une session."""
+    out = psql(dsn, CALLER_SQL.format(user=user, start=start))
+    ids, timings = UUID_RE.findall(out), TIMING_RE.findall(out)
+    if len(ids) > 1 or not timings:
+        raise RuntimeError(f"sortie inattendue : {out!r}")
+    return (ids[0] if ids else None), [float(timing) for timing in timings]
+
+
+def run_round(dsn: str, pool: ThreadPoolExecutor, callers: int) -> dict:
+    user = str(uuid.uuid4())
+    psql(dsn, f"INSERT INTO profiles (id) VALUES ('{user}');")
+    start = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=START_DELAY)
+    results = list(pool.map(lambda _: call(dsn, user, start.isoformat()), range(callers)))
+    rows = int(psql(dsn, f"SELECT count(*) FROM quotas WHERE user_id = '{user}';"))
+    return {
+        'rows': rows,
+        'ids': [quota_id for quota_id, _ in results],
+        'round_trips': [len(timings) for _, timings in results],
+        'timings': [sum(timings) for _, timings in results],
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Test de concurrence de get_or_create_quota")
+    parser.add_argument(
+        '--dsn', required=True,
+        help="base Postgres locale jetable (ex. postgresql:///astraloves_check)",
+    )
+    parser.add_argument(
+        '--callers', type=int, default=DEFAULT_CALLERS,
+        help=f"sessions simultanées par utilisateur (défaut : {DEFAULT_CALLERS})",
+    )
+    parser.add_argument(
+        '--rounds', type=int, default=DEFAULT_ROUNDS,
+        help=f"utilisateurs testés, un par tour (défaut : {DEFAULT_ROUNDS})",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if shutil.which('psql') is None:
+        sys.exit("❌ psql est requis")
+    if not MIGRATION_PATH.exists():
+        sys.exit("❌ migration-quota-rpc.sql absent : lancer generate-structure.py")
+
+    psql(args.dsn, SETUP_SQL + MIGRATION_PATH.read_text(encoding='utf-8'))
+    print(f"🗄️ {MIGRATION_PATH.name} appliquée")
+
+    # Un conflit sur une clé unique autre que celle du ON CONFLICT lève une erreur
+    keys = set(psql(args.dsn, UNIQUE_KEYS_SQL).split())
+    if keys != EXPECTED_UNIQUE_KEYS:
+        sys.exit(f"❌ clés uniques de quotas : {', '.join(sorted(keys))} "
+                 f"(attendu : {', '.join(sorted(EXPECTED_UNIQUE_KEYS))})")
+
+    failures, timings, round_trips = 0, [], []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.callers) as pool:
+        for number in range(1, args.rounds + 1):
+            result = run_round(args.dsn, pool, args.callers)
+            timings += result['timings']
+            round_trips += result['round_trips']
+            received = set(result['ids']) - {None}
+            missing = result['ids'].count(None)
+            retried = sum(count > 1 for count in result['round_trips'])
+            if result['rows'] != 1 or len(received) != 1 or missing or retried:
+                failures += 1
+                print(f"❌ tour {number} : {result['rows']} ligne(s) quotas, "
+                      f"{len(received)} quota(s) distinct(s) reçus, {missing} appel(s) sans quota, "
+                      f"{retried} appel(s) relancé(s)")
+
+    elapsed = time.perf_counter() - started
+    status = '✅' if not failures else '❌'
+    print(f"{status} {args.rounds} tour(s) × {args.callers} appel(s) simultané(s) — "
+          f"{failures} tour(s) en échec")
+    print(f"🔁 {sum(round_trips) / len(round_trips):.2f} requête(s) par appel en moyenne "
+          f"(max {max(round_trips)}, {sum(round_trips)} pour {len(round_trips)} appels)")
+    print(f"⏱️ médiane {statistics.median(timings):.2f} ms · "
+          f"max {max(timings):.2f} ms ({elapsed:.1f} s au total)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
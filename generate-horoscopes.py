@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+ASTRALOVES - Horoscopes partagés par combinaison de signes
+Le prompt de horoscopeGenerator ne dépend que des signes soleil, lune et
+ascendant et de la période : tous les profils d'une même combinaison
+reçoivent le même horoscope. Ce job groupe les profils par (combinaison,
+période), fait un seul appel LLM par groupe (au plus 12³ = 1728 par
+période), en parallèle sous un sémaphore, et écrit toutes les lignes de la
+table horoscopes en un seul fichier COPY.
+
+Les textes générés sont mis en cache par (combinaison, type, period_start) :
+relancer le job sur la même période n'appelle le modèle que pour les
+combinaisons nouvelles.
+
+Entrée : le même export que score-matches.py (colonnes id, sun_sign,
+moon_sign, ascendant_sign au minimum).
+Import :
+  \\copy horoscopes (user_id, horoscope_type, period_start, period_end, content) FROM 'horoscopes.copy'
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+CACHE_DIR = ROOT / '.horoscope-cache'
+
+SIGNS = (
+    'aries', 'taurus', 'gemini', 'cancer', 'leo', 'virgo',
+    'libra', 'scorpio', 'sagittarius', 'capricorn', 'aquarius', 'pisces',
+)
+KEY_COLUMNS = ('sun_sign', 'moon_sign', 'ascendant_sign')
+
+# Miroir de src/services/astro/horoscopeGenerator.ts
+MODEL = 'gpt-4-turbo-preview'
+SYSTEM_PROMPT = (
+    'Tu es un astrologue expert qui génère des horoscopes personnalisés basés sur '
+    'les thèmes natals. Sois direct, précis, et actionnable.'
+)
+MAX_TOKENS = 300
+TEMPERATURE = 0.7
+PERIOD_LABELS = {'daily': "aujourd'hui", 'weekly': 'cette semaine', 'monthly': 'ce mois-ci'}
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_RETRIES = 3
+REQUEST_TIMEOUT = 60
+
+HOROSCOPES_COPY = (
+    'COPY horoscopes (user_id, horoscope_type, period_start, period_end, content) FROM stdin;'
+)
+
+
+def load_script(name: str):
+    """Charge un script voisin (nom avec tirets, non importable directement)."""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_')[:-3], ROOT / name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_prompt(key: tuple[str, str, str], horoscope_type: str) -> str:
+    sun, moon, ascendant = key
+    return f"""Génère un horoscope {PERIOD_LABELS[horoscope_type]} pour:
+- Soleil {sun}
+- Lune {moon}
+- Ascendant {ascendant}
+
+Format:
+1. Focus principal (1 phrase)
+2. Conseil actionnable (1 phrase)
+3. Domaine à surveiller (1 phrase)
+
+Max 150 mots, ton direct."""
+
+
+def period_bounds(horoscope_type: str, day: datetime.date) -> tuple[datetime.date, datetime.date]:
+    """(period_start, period_end) : le jour, la semaine du lundi, ou le mois."""
+    if horoscope_type == 'daily':
+        return day, day
+    if horoscope_type == 'weekly':
+        start = day - datetime.timedelta(days=day.weekday())
+        return start, start + datetime.timedelta(days=6)
+    start = day.replace(day=1)
+    following = (start + datetime.timedelta(days=32)).replace(day=1)
+    return start, following - datetime.timedelta(days=1)
+
+
+def group_profiles(rows) -> tuple[dict[tuple, list[str]], int]:
+    """{combinaison de signes: [ids]} et nombre de profils ignorés (signe manquant)."""
+    groups, skipped = {}, 0
+    for row in rows:
+        key = tuple((row.get(column) or '').strip().lower() for column in KEY_COLUMNS)
+        if not all(key):
+            skipped += 1
+            continue
+        groups.setdefault(key, []).append(row['id'])
+    return groups, skipped
+
+
+def synthetic_rows(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    for number in range(count):
+        yield {
+            'id': f'00000000-0000-4000-8000-{number:012d}',
+            **{column: rng.choice(SIGNS) for column in KEY_COLUMNS},
+        }
+
+
+class ContentCache:
+    """Textes générés d'une période, par combinaison : un fichier JSON par (type, period_start)."""
+
+    def __init__(self, directory: Path, horoscope_type: str, period_start: datetime.date):
+        self.path = directory / f'{horoscope_type}-{period_start.isoformat()}.json'
+        try:
+            self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def name(key: tuple) -> str:
+        return '/'.join(key)
+
+    def get(self, key: tuple) -> str | None:
+        return self.entries.get(self.name(key))
+
+    def put(self, key: tuple, content: str):
+        self.entries[self.name(key)] = content
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.entries, ensure_ascii=False, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+
+class CompletionClient:
+    """POST /chat/completions compatible OpenAI, sans dépendance."""
+
+    def __init__(self, base_url: str, api_key: str | None, model: str, retries: int):
+        self.url = base_url.rstrip('/') + '/chat/completions'
+        self.api_key = api_key
+        self.model = model
+        self.retries = retries
+        self.calls = 0
+
+    def complete(self, prompt: str) -> str:
+        body = json.dumps({
+            'model': self.model,
+            'messages': [
+                {'role': 'system', 'content': SYSTEM_PROMPT},
+                {'role': 'user', 'content': prompt},
+            ],
+            'max_tokens': MAX_TOKENS,
+            'temperature': TEMPERATURE,
+        }).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f'Bearer {self.api_key}'
+
+        attempt = 0
+        while True:
+            self.calls += 1
+            request = urllib.request.Request(self.url, body, headers)
+            try:
+                with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                    data = json.loads(response.read())
+                return data['choices'][0]['message']['content'] or ''
+            except urllib.error.HTTPError as error:
+                # Limite de débit ou erreur serveur : on retente avec un recul exponentiel
+                if (error.code != 429 and error.code < 500) or attempt == self.retries:
+                    raise
+            except OSError:  # connexion refusée, coupée ou délai dépassé
+                if attempt == self.retries:
+                    raise
+            time.sleep(2 ** attempt + random.random())
+            attempt += 1
+
+
+async def generate_contents(
+    keys: list[tuple], horoscope_type: str, client: CompletionClient,
+    cache: ContentCache, concurrency: int,
+) -> dict[tuple, str]:
+    """Un appel par combinaison absente du cache, au plus concurrency en vol."""
+    semaphore = asyncio.Semaphore(concurrency)
+    # Les appels bloquants tournent dans des threads : autant que d'appels en vol
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+
+    async def generate(key: tuple):
+        async with semaphore:
+            content = await asyncio.to_thread(client.complete, build_prompt(key, horoscope_type))
+        cache.put(key, content)
+
+    missing = [key for key in keys if cache.get(key) is None]
+    try:
+        await asyncio.gather(*(generate(key) for key in missing))
+    finally:
+        # Ce qui a été généré reste acquis même si un appel échoue
+        cache.save()
+    return {key: cache.get(key) for key in keys}
+
+
+def copy_escape(value: str) -> str:
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def write_rows(out, groups: dict[tuple, list[str]], contents: dict[tuple, str],
+               horoscope_type: str, start: datetime.date, end: datetime.date) -> int:
+    rows = 0
+    prefix = f"\t{horoscope_type}\t{start.isoformat()}\t{end.isoformat()}\t"
+    for key, ids in groups.items():
+        content = copy_escape(contents[key])
+        out.writelines(f"{user_id}{prefix}{content}\n" for user_id in ids)
+        rows += len(ids)
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Génère les horoscopes partagés par combinaison de signes")
+    parser.add_argument(
+        'input', type=Path, nargs='?', default=None,
+        help="export des profils (.csv avec en-tête, sinon COPY texte)",
+    )
+    parser.add_argument(
+        '-o', '--output', type=Path, default=None,
+        help="fichier COPY de sortie (défaut : sortie standard)",
+    )
+    parser.add_argument('--type', choices=tuple(PERIOD_LABELS), default='daily', dest='horoscope_type')
+    parser.add_argument(
+        '--date', type=datetime.date.fromisoformat, default=datetime.date.today(),
+        help="jour inclus dans la période (défaut : aujourd'hui)",
+    )
+    parser.add_argument(
+        '--format', choices=('csv', 'copy'), default=None,
+        help="format de l'export (défaut : selon l'extension, .csv ou COPY)",
+    )
+    parser.add_argument(
+        '--columns', type=lambda value: tuple(value.split(',')), default=None,
+        help="colonnes d'un export COPY, dans l'ordre (défaut : celles de score-matches.py)",
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+        help=f"appels LLM simultanés au plus (défaut : {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        '--retries', type=int, default=DEFAULT_RETRIES,
+        help=f"nouvelles tentatives sur 429 / 5xx (défaut : {DEFAULT_RETRIES})",
+    )
+    parser.add_argument(
+        '--base-url', default=os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
+        help="API compatible OpenAI (défaut : $OPENAI_BASE_URL ou api.openai.com)",
+    )
+    parser.add_argument('--model', default=MODEL, help=f"modèle (défaut : {MODEL})")
+    parser.add_argument('--cache-dir', type=Path, default=CACHE_DIR, help="cache des textes générés")
+    parser.add_argument(
+        '--stub', type=float, default=None, metavar='MS',
+        help="bouchon local de bench-astra-stream.py, réponse en MS millisecondes",
+    )
+    parser.add_argument(
+        '--psql', action='store_true',
+        help="encadre les lignes par COPY ... FROM stdin; et \\. (script psql)",
+    )
+    parser.add_argument(
+        '--synthetic', type=int, default=None, metavar='N',
+        help="N profils aléatoires au lieu d'un export (mesure)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    if (args.input is None) == (args.synthetic is None):
+        sys.exit("❌ Indiquer un export de profils ou --synthetic N")
+
+    started = time.perf_counter()
+    if args.synthetic is not None:
+        rows = synthetic_rows(args.synthetic)
+    else:
+        scorer = load_script('score-matches.py')
+        fmt = args.format or ('csv' if args.input.suffix == '.csv' else 'copy')
+        rows = scorer.read_rows(args.input, fmt, args.columns or scorer.DEFAULT_COLUMNS)
+    groups, skipped = group_profiles(rows)
+    start, end = period_bounds(args.horoscope_type, args.date)
+    cache = ContentCache(args.cache_dir, args.horoscope_type, start)
+    cached = sum(cache.get(key) is not None for key in groups)
+
+    with contextlib.ExitStack() as stack:
+        base_url, api_key = args.base_url, os.environ.get('OPENAI_API_KEY')
+        if cached == len(groups):
+            pass  # tout est en cache : aucun appel, ni clé ni bouchon nécessaires
+        elif args.stub is not None:
+            stub = load_script('bench-astra-stream.py').start_server(0, args.stub, 0, 40)
+            stack.callback(stub.shutdown)
+            base_url, api_key = f'http://127.0.0.1:{stub.server_address[1]}/v1', None
+        elif not api_key:
+            sys.exit("❌ OPENAI_API_KEY est requis (ou --stub MS pour le bouchon local)")
+        client = CompletionClient(base_url, api_key, args.model, args.retries)
+        contents = asyncio.run(generate_contents(
+            list(groups), args.horoscope_type, client, cache, args.concurrency,
+        ))
+    generated = time.perf_counter()
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else contextlib.nullcontext(sys.stdout)
+    with output as out:
+        if args.psql:
+            out.write(HOROSCOPES_COPY + '\n')
+        written = write_rows(out, groups, contents, args.horoscope_type, start, end)
+        if args.psql:
+            out.write('\\.\n')
+
+    done = time.perf_counter()
+    stats = {
+        'profiles': written, 'skipped': skipped, 'keys': len(groups),
+        'cached': cached, 'calls': client.calls,
+    }
+    print(f"🔮 {args.horoscope_type} {start.isoformat()} → {end.isoformat()} : {written} profil(s), "
+          f"{len(groups)} combinaison(s) de signes, {skipped} profil(s) sans signes ignoré(s)",
+          file=sys.stderr)
+    print(f"🤖 {client.calls} appel(s) LLM (au lieu de {written}), {cached} combinaison(s) "
+          f"déjà en cache — {args.concurrency} en parallèle au plus", file=sys.stderr)
+    print(f"⏱️ génération {(generated - started) * 1000:.0f} ms · écriture "
+          f"{(done - generated) * 1000:.0f} ms", file=sys.stderr)
+    return stats
+
+
+if __name__ == '__main__':
+    main()
@@ -2,787 +2,2903 @@
 """
 ASTRALOVES - Générateur de structure complète
 Génère tous les fichiers manquants avec du code réel et fonctionnel
+
+Les templates vivent dans templates/ (index.json + un fichier .tpl par sortie)
+et ne sont lus que pour les sections/fichiers sélectionnés (--only, --glob).
+Les valeurs {{ chemin.de.variable }} viennent de templates/variables.json.
+
+src/ est maintenu à la main et diverge des templates : générer dans un
+--base-dir neuf. Une sortie n'est copiée dans src/ que si le code écrit à
+la main l'importe (routes/manifest.ts pour la navigation).
 """
 
+import argparse
+import contextlib
+import difflib
+import fnmatch
+import hashlib
+import json
 import os
+import posixpath
+import re
+import secrets
+import select
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
+from typing import NamedTuple
+
+ROOT_DIR = Path(__file__).parent
+BASE_DIR = ROOT_DIR / 'src'
+
+# Templates : templates/index.json décrit les sections, un .tpl par fichier
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
+
+# Variables injectées dans les templates ({{ quota.reset_ms }}, ...)
+VARIABLES_PATH = TEMPLATES_DIR / 'variables.json'
+
+# Manifest des fichiers générés (chemin → sha256, taille, version template)
+MANIFEST_PATH = BASE_DIR.parent / '.generate-structure-manifest.json'
+
+# Caches des analyses (schéma SQL parsé, ...) clés par hash des sources
+CACHE_DIR = BASE_DIR.parent / '.generate-structure-cache'
+
+# À incrémenter quand les templates changent de façon incompatible
+TEMPLATE_VERSION = 1
+
+# Nombre d'écritures en parallèle par défaut (surchargeable via --jobs)
+DEFAULT_JOBS = 8
 
-BASE_DIR = Path(__file__).parent / 'src'
+# Verrou : deux générations simultanées s'exécutent l'une après l'autre
+LOCK_PATH = BASE_DIR.parent / '.generate-structure.lock'
+
+# Suffixe des fichiers temporaires (ignorés par Vite et tsc)
+TMP_SUFFIX = '.gen-tmp'
+
+# Fenêtre de regroupement des rafales d'éditions en mode --watch
+WATCH_DEBOUNCE_S = 0.05
+
+# Intervalle de scrutation quand inotify n'est pas disponible
+WATCH_POLL_INTERVAL_S = 0.25
+
+# off : rename atomique sans fsync
+# batch : un sync du FS + un fsync du dossier par lot de dossier
+# strict : fsync de chaque fichier puis du dossier (naïf, pour comparaison)
+DURABILITY_MODES = ('off', 'batch', 'strict')
 
 # ===================================================================
-# STORES ZUSTAND
+# GÉNÉRATION
 # ===================================================================
 
-STORES = {
-    'authStore.ts': '''import { create } from 'zustand';
-import { persist } from 'zustand/middleware';
-import type { User } from '@supabase/supabase-js';
-import type { Profile } from '@/types';
-
-interface AuthState {
-  user: User | null;
-  profile: Profile | null;
-  isLoading: boolean;
-  setUser: (user: User | null) => void;
-  setProfile: (profile: Profile | null) => void;
-  setIsLoading: (loading: boolean) => void;
-  reset: () => void;
-}
+def load_manifest() -> dict:
+    try:
+        data = json.loads(MANIFEST_PATH.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        return {}
+    return data.get('files', {}) if isinstance(data, dict) else {}
 
-export const useAuthStore = create<AuthState>()(
-  persist(
-    (set) => ({
-      user: null,
-      profile: null,
-      isLoading: true,
-      setUser: (user) => set({ user }),
-      setProfile: (profile) => set({ profile }),
-      setIsLoading: (isLoading) => set({ isLoading }),
-      reset: () => set({ user: null, profile: null, isLoading: false }),
-    }),
-    {
-      name: 'astraloves-auth',
-      partialize: (state) => ({ user: state.user, profile: state.profile }),
-    }
-  )
-);
-''',
-
-    'subscriptionStore.ts': '''import { create } from 'zustand';
-import type { Subscription, Quota, SubscriptionTier } from '@/types';
-
-interface SubscriptionState {
-  subscription: Subscription | null;
-  quota: Quota | null;
-  tier: SubscriptionTier;
-  setSubscription: (sub: Subscription | null) => void;
-  setQuota: (quota: Quota | null) => void;
-  setTier: (tier: SubscriptionTier) => void;
-  reset: () => void;
-}
+def save_manifest(manifest: dict, durability: str = 'off'):
+    data = json.dumps({'files': manifest}, indent=2, sort_keys=True) + '\n'
+    tmp = stage_file(MANIFEST_PATH, data.encode('utf-8'), fsync=durability != 'off')
+    os.replace(tmp, MANIFEST_PATH)
+    if durability != 'off':
+        fsync_dir(MANIFEST_PATH.parent)
 
-export const useSubscriptionStore = create<SubscriptionState>((set) => ({
-  subscription: null,
-  quota: null,
-  tier: 'free',
-  setSubscription: (subscription) => {
-    set({ subscription });
-    if (subscription) {
-      set({ tier: subscription.tier });
+# ===================================================================
+# ÉCRITURES ATOMIQUES
+# ===================================================================
+
+def stage_file(path: Path, data: bytes, fsync: bool = False) -> Path:
+    """Écrit data dans un fichier temporaire du même dossier (même FS que la cible)."""
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.{secrets.token_hex(4)}{TMP_SUFFIX}')
+    # O_EXCL + mode 0o666 : le umask s'applique comme pour un write_bytes classique
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp
+
+def fsync_dir(directory: Path):
+    """Rend durables les renames d'un dossier (no-op là où c'est impossible)."""
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+_syncfs = None
+
+def sync_filesystem(directory: Path):
+    """Flush toutes les données en attente du FS de directory en un seul appel.
+
+    syncfs(2) sous Linux, sync() global ailleurs.
+    """
+    global _syncfs
+    if _syncfs is None:
+        _syncfs = False
+        if sys.platform.startswith('linux'):
+            try:
+                import ctypes
+                _syncfs = ctypes.CDLL(None, use_errno=True).syncfs
+            except (OSError, AttributeError):
+                pass
+    if _syncfs:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            if _syncfs(fd) == 0:
+                return
+        finally:
+            os.close(fd)
+    if hasattr(os, 'sync'):
+        os.sync()
+
+def commit_staged(staged: list[tuple[Path, Path]], durability: str):
+    """Renomme les fichiers stagés en place, dossier par dossier.
+
+    En mode batch : un sync du FS puis un fsync du dossier par lot,
+    au lieu d'un fsync par fichier.
+    """
+    by_dir: dict[Path, list[tuple[Path, Path]]] = {}
+    for tmp, path in staged:
+        by_dir.setdefault(path.parent, []).append((tmp, path))
+    for directory, pairs in sorted(by_dir.items()):
+        if durability == 'batch':
+            sync_filesystem(directory)
+        for tmp, path in pairs:
+            os.replace(tmp, path)
+        if durability == 'batch':
+            fsync_dir(directory)
+
+def cleanup_stale_temps(directories):
+    """Supprime les temporaires laissés par un run interrompu."""
+    for directory in directories:
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.name.endswith(TMP_SUFFIX):
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(entry.path)
+
+@contextlib.contextmanager
+def generation_lock():
+    """Verrou exclusif : les invocations concurrentes se sérialisent."""
+    LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_PATH, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+
+        import fcntl
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print("⏳ Une autre génération est en cours, attente du verrou...")
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def is_unchanged(path: Path, data: bytes, digest: str, entry: dict | None, st) -> bool:
+    """Compare en mémoire via le manifest, ne relit le disque que si le stat diverge."""
+    if st is None or st.st_size != len(data):
+        return False
+    if (
+        entry
+        and entry.get('template_version') == TEMPLATE_VERSION
+        and entry.get('sha256') == digest
+        and entry.get('size') == st.st_size
+        and entry.get('mtime_ns') == st.st_mtime_ns
+    ):
+        return True
+    return hashlib.sha256(path.read_bytes()).hexdigest() == digest
+
+def file_status(path: Path, data: bytes, digest: str, entry: dict | None):
+    """Retourne ('create' | 'unchanged' | 'overwrite', stat actuel ou None)."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return 'create', None
+    if is_unchanged(path, data, digest, entry, st):
+        return 'unchanged', st
+    return 'overwrite', st
+
+def create_file(
+    path: Path,
+    content: str,
+    manifest: dict,
+    durability: str = 'off',
+    render_key: str | None = None,
+) -> tuple[bool, dict, Path | None, dict]:
+    """Écrit le fichier seulement si son contenu a changé, via temporaire + rename.
+
+    Le dossier parent doit déjà exister (créé une seule fois par run_tasks).
+    render_key identifie (template, variables utilisées) : s'il n'a pas bougé
+    depuis le dernier run et que le stat concorde, le contenu n'est même pas hashé.
+    En mode batch le fichier reste stagé : son rename est fait par commit_staged.
+    Retourne (écrit ?, nouvelle entrée du manifest, temporaire en attente,
+    {phase: (mur, cpu)} pour 'check' et 'write').
+    """
+    started = clock()
+    rel = path.relative_to(BASE_DIR.parent).as_posix()
+    entry = manifest.get(rel)
+
+    # Même template + mêmes variables que la dernière fois et fichier intact :
+    # rien à encoder ni à hasher
+    if render_key and entry and entry.get('render_key') == render_key:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            st = None
+        if (
+            st is not None
+            and entry.get('template_version') == TEMPLATE_VERSION
+            and entry.get('size') == st.st_size
+            and entry.get('mtime_ns') == st.st_mtime_ns
+        ):
+            return False, entry, None, {'check': elapsed(started)}
+
+    data = content.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+
+    status, st = file_status(path, data, digest, entry)
+    written = status != 'unchanged'
+    pending = None
+    phases = {'check': elapsed(started)}
+    if written:
+        started = clock()
+        tmp = stage_file(path, data, fsync=durability == 'strict')
+        # Le rename conserve l'inode : ce stat reste valable une fois en place
+        st = tmp.stat()
+        if durability == 'batch':
+            pending = tmp
+        else:
+            os.replace(tmp, path)
+            if durability == 'strict':
+                fsync_dir(path.parent)
+        phases['write'] = elapsed(started)
+
+    new_entry = {
+        'sha256': digest,
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'template_version': TEMPLATE_VERSION,
     }
-  },
-  setQuota: (quota) => set({ quota }),
-  setTier: (tier) => set({ tier }),
-  reset: () => set({ subscription: null, quota: null, tier: 'free' }),
-}));
-''',
-
-    'uiStore.ts': '''import { create } from 'zustand';
-
-interface Modal {
-  isOpen: boolean;
-  component: React.ComponentType<any> | null;
-  props: any;
-}
+    if render_key:
+        new_entry['render_key'] = render_key
+    return written, new_entry, pending, phases
 
-interface UIState {
-  modal: Modal;
-  sidebar: {
-    isOpen: boolean;
-  };
-  openModal: (component: React.ComponentType<any>, props?: any) => void;
-  closeModal: () => void;
-  toggleSidebar: () => void;
-}
+# ===================================================================
+# INSTRUMENTATION
+# ===================================================================
 
-export const useUIStore = create<UIState>((set) => ({
-  modal: {
-    isOpen: false,
-    component: null,
-    props: {},
-  },
-  sidebar: {
-    isOpen: true,
-  },
-  openModal: (component, props = {}) =>
-    set({ modal: { isOpen: true, component, props } }),
-  closeModal: () =>
-    set({ modal: { isOpen: false, component: null, props: {} } }),
-  toggleSidebar: () =>
-    set((state) => ({ sidebar: { isOpen: !state.sidebar.isOpen } })),
-}));
-''',
-}
+def clock() -> tuple[float, float]:
+    return time.perf_counter(), time.thread_time()
+
+def elapsed(started: tuple[float, float]) -> tuple[float, float]:
+    """(mur, cpu du thread) écoulés depuis started, en secondes."""
+    return time.perf_counter() - started[0], time.thread_time() - started[1]
+
+class Event(NamedTuple):
+    section: str
+    path: str
+    bytes_rendered: int
+    bytes_written: int
+    skipped: bool
+    phases: dict[str, tuple[float, float]]
+
+    def as_dict(self) -> dict:
+        data = self._asdict()
+        data['phases'] = {
+            name: {'wall_ms': wall * 1000, 'cpu_ms': cpu * 1000}
+            for name, (wall, cpu) in self.phases.items()
+        }
+        return data
+
+class RunReport:
+    """Flux d'événements d'un run : agrégats par phase/section + sinks optionnels.
+
+    La console n'est qu'un consommateur parmi d'autres ; ses lignes sont
+    bufferisées et écrites une fois par section pour ne pas peser sur les gros runs.
+    """
+
+    def __init__(
+        self,
+        labels: dict[str, str] | None = None,
+        console: bool = True,
+        events_out=None,
+        out=None,
+    ):
+        self.labels = labels or {}
+        self.console = console
+        self.events_out = events_out
+        self.out = out or sys.stdout
+        self.events: list[Event] = []
+        self.phases: dict[str, list[float]] = {}
+        self._section = None
+        self._lines: list[str] = []
+
+    def phase(self, name: str, timing: tuple[float, float]):
+        totals = self.phases.setdefault(name, [0.0, 0.0])
+        totals[0] += timing[0]
+        totals[1] += timing[1]
+
+    def emit(self, event: Event):
+        self.events.append(event)
+        for name, timing in event.phases.items():
+            self.phase(name, timing)
+        if self.events_out is not None:
+            self.events_out.write(json.dumps(event.as_dict()) + '\n')
+        if not self.console:
+            return
+        if event.section != self._section:
+            self.flush()
+            self._section = event.section
+            self._lines.append(f"\n{self.labels.get(event.section, event.section)}...\n")
+        if not event.skipped:
+            self._lines.append(f"✅ {event.path}\n")
+
+    def flush(self):
+        if self._lines:
+            self.out.write(''.join(self._lines))
+            self._lines = []
+
+    def summary(self) -> dict:
+        sections: dict[str, dict] = {}
+        for event in self.events:
+            counts = sections.setdefault(
+                event.section,
+                {'files': 0, 'written': 0, 'skipped': 0, 'bytes_rendered': 0, 'bytes_written': 0},
+            )
+            counts['files'] += 1
+            counts['skipped' if event.skipped else 'written'] += 1
+            counts['bytes_rendered'] += event.bytes_rendered
+            counts['bytes_written'] += event.bytes_written
+        totals = {
+            key: sum(counts[key] for counts in sections.values())
+            for key in ('files', 'written', 'skipped', 'bytes_rendered', 'bytes_written')
+        }
+        return {
+            'totals': totals,
+            'sections': sections,
+            'phases': {
+                name: {'wall_ms': wall * 1000, 'cpu_ms': cpu * 1000}
+                for name, (wall, cpu) in self.phases.items()
+            },
+        }
 
 # ===================================================================
-# HOOKS
+# RENDU DES TEMPLATES
 # ===================================================================
 
-HOOKS = {
-    'useAuth.ts': '''import { useAuthStore } from '@/store/authStore';
-import { authService } from '@/services/auth/authService';
-import { useNavigate } from 'react-router-dom';
-import { toast } from 'react-hot-toast';
-
-export function useAuth() {
-  const { user, profile, setUser, setProfile, reset } = useAuthStore();
-  const navigate = useNavigate();
-
-  const login = async (email: string, password: string) => {
-    try {
-      const { user: authUser, profile: userProfile } = await authService.login({
-        email,
-        password,
-      });
-      setUser(authUser);
-      setProfile(userProfile);
-      
-      if (!userProfile?.onboarding_completed) {
-        navigate('/onboarding');
-      } else {
-        navigate('/univers');
-      }
-      
-      toast.success('Connexion réussie');
-    } catch (error: any) {
-      toast.error(error.message || 'Erreur de connexion');
-      throw error;
-    }
-  };
-
-  const logout = async () => {
-    try {
-      await authService.logout();
-      reset();
-      navigate('/login');
-      toast.success('Déconnexion réussie');
-    } catch (error: any) {
-      toast.error(error.message || 'Erreur de déconnexion');
-      throw error;
-    }
-  };
-
-  return {
-    user,
-    profile,
-    login,
-    logout,
-    isAuthenticated: !!user,
-  };
+VARIABLE_RE = re.compile(r'\{\{\s*([A-Za-z_][\w.]*)\s*\}\}')
+
+class TemplateError(Exception):
+    pass
+
+class CompiledTemplate(NamedTuple):
+    digest: str
+    literals: tuple[str, ...]
+    names: tuple[str, ...]
+
+def compile_template(source: str) -> CompiledTemplate:
+    """Découpe le source une fois pour toutes en littéraux / variables."""
+    pieces = VARIABLE_RE.split(source)
+    return CompiledTemplate(
+        hashlib.sha256(source.encode('utf-8')).hexdigest(),
+        tuple(pieces[0::2]),
+        tuple(pieces[1::2]),
+    )
+
+def format_value(value) -> str:
+    # Les chaînes sont injectées telles quelles, le reste en littéral JSON/TS
+    return value if isinstance(value, str) else json.dumps(value)
+
+def load_variables(path: Path = VARIABLES_PATH) -> dict:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return {}
+
+class Renderer:
+    """Rend les templates compilés, mémoïsés par hash (template, variables utilisées).
+
+    Seules les variables référencées par un template entrent dans sa clé :
+    changer une valeur de config ne re-rend que les fichiers qui l'utilisent.
+    """
+
+    def __init__(self, variables: dict):
+        self.variables = variables
+        self._compiled: dict[str, CompiledTemplate] = {}
+        self._rendered: dict[str, str] = {}
+
+    def compile(self, source: str) -> CompiledTemplate:
+        # Clé = le source lui-même : son hash Python est mis en cache par l'objet str
+        compiled = self._compiled.get(source)
+        if compiled is None:
+            compiled = self._compiled[source] = compile_template(source)
+        return compiled
+
+    def lookup(self, name: str, where: str = ''):
+        value = self.variables
+        for part in name.split('.'):
+            if not isinstance(value, dict) or part not in value:
+                raise TemplateError(f"Variable inconnue {{{{ {name} }}}} dans {where or 'template'}")
+            value = value[part]
+        return value
+
+    def render(self, source: str, where: str = '') -> tuple[str, str]:
+        """Retourne (contenu rendu, clé de rendu)."""
+        compiled = self.compile(source)
+        values = [format_value(self.lookup(name, where)) for name in compiled.names]
+        key = hashlib.sha256(
+            (compiled.digest + json.dumps(dict(zip(compiled.names, values)), sort_keys=True))
+            .encode('utf-8')
+        ).hexdigest()
+        content = self._rendered.get(key)
+        if content is None:
+            out = [''] * (len(compiled.literals) + len(values))
+            out[0::2] = compiled.literals
+            out[1::2] = values
+            content = self._rendered[key] = ''.join(out)
+        return content, key
+
+# ===================================================================
+# SCHÉMA SQL → TYPES TYPESCRIPT
+# ===================================================================
+
+# À incrémenter quand le parseur ou le rendu des types change
+SCHEMA_PARSER_VERSION = 1
+
+SQL_WORD_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_$]*')
+SQL_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+SQL_DOLLAR_RE = re.compile(r'\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$')
+
+# Mots qui terminent le type d'une colonne
+SQL_COLUMN_CONSTRAINTS = {
+    'not', 'null', 'default', 'primary', 'references', 'check', 'unique',
+    'constraint', 'generated', 'collate',
 }
-''',
-
-    'useSubscription.ts': '''import { useSubscriptionStore } from '@/store/subscriptionStore';
-import { useQuery } from '@tanstack/react-query';
-import { supabase } from '@/config/supabase';
-import type { Subscription, Quota } from '@/types';
-
-export function useSubscription(userId: string | undefined) {
-  const { subscription, quota, tier, setSubscription, setQuota } =
-    useSubscriptionStore();
-
-  const { data: subscriptionData } = useQuery({
-    queryKey: ['subscription', userId],
-    queryFn: async () => {
-      if (!userId) return null;
-
-      const { data, error } = await supabase
-        .from('subscriptions')
-        .select('*')
-        .eq('user_id', userId)
-        .or('ends_at.is.null,ends_at.gt.now()')
-        .single();
-
-      if (error && error.code !== 'PGRST116') throw error;
-      return data as Subscription | null;
+SQL_TABLE_CONSTRAINTS = {'constraint', 'primary', 'unique', 'check', 'foreign', 'exclude'}
+
+def sql_tokens(lines):
+    """Tokenizer DDL en flux : ligne par ligne, état conservé entre les lignes.
+
+    Produit des couples (type, texte) : 'word' (minuscule, sauf identifiant
+    entre guillemets), 'number', 'string', 'op'. Commentaires et corps
+    $$ ... $$ sont sautés sans jamais remonter en arrière.
+    """
+    state = None  # None | '/*' | "'" | '"' | balise $tag$
+    buffer: list[str] = []
+    for line in lines:
+        pos, end = 0, len(line)
+        while pos < end:
+            if state == '/*':
+                close = line.find('*/', pos)
+                if close < 0:
+                    pos = end
+                else:
+                    pos, state = close + 2, None
+                continue
+            if state in ("'", '"'):
+                close = line.find(state, pos)
+                if close < 0:
+                    buffer.append(line[pos:])
+                    pos = end
+                elif line.startswith(state * 2, close):
+                    # '' ou "" : guillemet échappé
+                    buffer.append(line[pos:close + 1])
+                    pos = close + 2
+                else:
+                    buffer.append(line[pos:close])
+                    yield ('string' if state == "'" else 'word'), ''.join(buffer)
+                    buffer, pos, state = [], close + 1, None
+                continue
+            if state is not None:
+                close = line.find(state, pos)
+                if close < 0:
+                    pos = end
+                else:
+                    yield 'string', ''
+                    pos, state = close + len(state), None
+                continue
+
+            char = line[pos]
+            if char.isspace():
+                pos += 1
+            elif line.startswith('--', pos):
+                pos = end
+            elif line.startswith('/*', pos):
+                pos, state = pos + 2, '/*'
+            elif char in ("'", '"'):
+                pos, state = pos + 1, char
+            elif char == '$' and (match := SQL_DOLLAR_RE.match(line, pos)):
+                pos, state = match.end(), match.group()
+            elif match := SQL_WORD_RE.match(line, pos):
+                yield 'word', match.group().lower()
+                pos = match.end()
+            elif match := SQL_NUMBER_RE.match(line, pos):
+                yield 'number', match.group()
+                pos = match.end()
+            elif line.startswith('::', pos):
+                yield 'op', '::'
+                pos += 2
+            else:
+                yield 'op', char
+                pos += 1
+
+def sql_statements(tokens):
+    """Regroupe les tokens en instructions (séparées par ';' hors parenthèses)."""
+    statement = []
+    depth = 0
+    for token in tokens:
+        if token == ('op', ';') and depth == 0:
+            if statement:
+                yield statement
+            statement = []
+            continue
+        if token == ('op', '('):
+            depth += 1
+        elif token == ('op', ')'):
+            depth = max(0, depth - 1)
+        statement.append(token)
+    if statement:
+        yield statement
+
+def split_top_level(tokens, start: int) -> tuple[list[list], int]:
+    """Découpe le contenu de la parenthèse ouvrante à start sur les virgules de 1er niveau.
+
+    Retourne (éléments, index après la parenthèse fermante).
+    """
+    items, current, depth = [], [], 0
+    pos = start + 1
+    while pos < len(tokens):
+        token = tokens[pos]
+        if token == ('op', '('):
+            depth += 1
+        elif token == ('op', ')'):
+            if depth == 0:
+                break
+            depth -= 1
+        elif token == ('op', ',') and depth == 0:
+            items.append(current)
+            current = []
+            pos += 1
+            continue
+        current.append(token)
+        pos += 1
+    if current:
+        items.append(current)
+    return items, pos + 1
+
+def sql_text(tokens) -> str:
+    """Reconstitue une expression SQL normalisée depuis ses tokens."""
+    out = []
+    previous = None
+    for kind, text in tokens:
+        if kind == 'string':
+            text = "'" + text.replace("'", "''") + "'"
+        glued = (
+            previous is None
+            or previous[1] in ('(', '.', '::', '[')
+            or text in (')', ',', '.', '::', '[', ']')
+            or (text == '(' and previous[0] == 'word')
+        )
+        if not glued:
+            out.append(' ')
+        out.append(text)
+        previous = (kind, text)
+    return ''.join(out)
+
+def qualified_name(tokens, pos: int) -> tuple[str, int]:
+    """Lit schema.nom ou nom ; retourne le dernier segment et la position suivante."""
+    name = tokens[pos][1]
+    pos += 1
+    while pos + 1 < len(tokens) and tokens[pos] == ('op', '.'):
+        name = tokens[pos + 1][1]
+        pos += 2
+    return name, pos
+
+def skip_words(tokens, pos: int, *words: str) -> int:
+    """Avance au-delà de la suite de mots donnée si elle est présente."""
+    if all(
+        pos + i < len(tokens) and tokens[pos + i] == ('word', word)
+        for i, word in enumerate(words)
+    ):
+        return pos + len(words)
+    return pos
+
+def parse_column(item) -> dict:
+    name = item[0][1]
+    type_words, is_array, pos = [], False, 1
+    while pos < len(item):
+        kind, text = item[pos]
+        if kind == 'word' and text in SQL_COLUMN_CONSTRAINTS:
+            break
+        if text == '(':
+            # Précision : decimal(10, 8), varchar(255)...
+            _, pos = split_top_level(item, pos)
+            continue
+        if text == '[':
+            is_array = True
+        elif kind == 'word':
+            type_words.append(text)
+        pos += 1
+    rest = [text for kind, text in item[pos:] if kind == 'word']
+    not_null = any(
+        a == 'not' and b == 'null' for a, b in zip(rest, rest[1:])
+    ) or 'primary' in rest
+    return {
+        'name': name,
+        'type': ' '.join(type_words),
+        'array': is_array,
+        'nullable': not not_null,
+        'has_default': 'default' in rest or 'generated' in rest,
+        'primary': 'primary' in rest,
+        'unique': 'unique' in rest,
+    }
+
+def index_elements(items) -> list[list]:
+    """Éléments d'index : [expression, desc ?] (asc/desc/nulls retirés de l'expression)."""
+    elements = []
+    for item in items:
+        desc = False
+        while item and item[-1][0] == 'word' and item[-1][1] in ('asc', 'desc', 'first', 'last', 'nulls'):
+            desc = desc or item[-1][1] == 'desc'
+            item = item[:-1]
+        elements.append([sql_text(item), desc])
+    return elements
+
+def apply_statement(schema: dict, statement, source: str):
+    """Applique une instruction DDL au schéma avec la sémantique de Postgres (IF NOT EXISTS)."""
+    words = [text for kind, text in statement[:4] if kind == 'word']
+    tables = schema['tables']
+    indexes = schema['indexes']
+
+    if words[:2] == ['create', 'table']:
+        pos = skip_words(statement, 2, 'if', 'not', 'exists')
+        table, pos = qualified_name(statement, pos)
+        if table in tables or pos >= len(statement) or statement[pos] != ('op', '('):
+            return
+        items, _ = split_top_level(statement, pos)
+        columns = []
+        for item in items:
+            if not item:
+                continue
+            if item[0][0] == 'word' and item[0][1] in SQL_TABLE_CONSTRAINTS:
+                apply_table_constraint(schema, table, item, columns, source)
+                continue
+            column = parse_column(item)
+            columns.append(column)
+            if column['primary'] or column['unique']:
+                suffix = 'pkey' if column['primary'] else f"{column['name']}_key"
+                indexes.setdefault(f'{table}_{suffix}', {
+                    'table': table, 'columns': [[column['name'], False]],
+                    'unique': True, 'where': None, 'method': None, 'source': source,
+                })
+        tables[table] = {'columns': columns, 'source': source}
+
+    elif words[:2] == ['alter', 'table']:
+        pos = skip_words(statement, 2, 'if', 'exists')
+        pos = skip_words(statement, pos, 'only')
+        table, pos = qualified_name(statement, pos)
+        if table not in tables:
+            return
+        actions, current, depth = [], [], 0
+        for token in statement[pos:]:
+            if token == ('op', ',') and depth == 0:
+                actions.append(current)
+                current = []
+                continue
+            depth += token == ('op', '(')
+            depth -= token == ('op', ')')
+            current.append(token)
+        actions.append(current)
+        columns = tables[table]['columns']
+        for action in actions:
+            if not action or action[0] != ('word', 'add'):
+                continue
+            at = skip_words(action, 1, 'column')
+            at = skip_words(action, at, 'if', 'not', 'exists')
+            if at >= len(action) or action[at][1] in SQL_TABLE_CONSTRAINTS:
+                continue
+            column = parse_column(action[at:])
+            if all(existing['name'] != column['name'] for existing in columns):
+                columns.append(column)
+
+    elif words[:2] == ['create', 'index'] or words[:3] == ['create', 'unique', 'index']:
+        unique = words[1] == 'unique'
+        pos = 3 if unique else 2
+        pos = skip_words(statement, pos, 'concurrently')
+        pos = skip_words(statement, pos, 'if', 'not', 'exists')
+        name, pos = qualified_name(statement, pos)
+        if pos >= len(statement) or statement[pos] != ('word', 'on'):
+            return
+        table, pos = qualified_name(statement, skip_words(statement, pos + 1, 'only'))
+        method = None
+        if pos < len(statement) and statement[pos] == ('word', 'using'):
+            method = statement[pos + 1][1]
+            pos += 2
+        items, pos = split_top_level(statement, pos)
+        if pos < len(statement) and statement[pos] == ('word', 'include'):
+            _, pos = split_top_level(statement, pos + 1)
+        where = None
+        if pos < len(statement) and statement[pos] == ('word', 'where'):
+            where = sql_text(statement[pos + 1:])
+        if name not in indexes:
+            indexes[name] = {
+                'table': table, 'columns': index_elements(items), 'unique': unique,
+                'where': where, 'method': method, 'source': source,
+            }
+
+def apply_table_constraint(schema: dict, table: str, item, columns: list[dict], source: str):
+    words = [text for kind, text in item if kind == 'word']
+    pos = 2 if words[0] == 'constraint' else 0
+    name = words[1] if pos else None
+    keyword = item[pos][1] if pos < len(item) else None
+    if keyword not in ('primary', 'unique'):
+        return
+    start = next(i for i, token in enumerate(item) if token == ('op', '('))
+    members, _ = split_top_level(item, start)
+    cols = [sql_text(member) for member in members]
+    if keyword == 'primary':
+        for column in columns:
+            if column['name'] in cols:
+                column['nullable'] = False
+    suffix = 'pkey' if keyword == 'primary' else '_'.join(cols) + '_key'
+    schema['indexes'].setdefault(name or f'{table}_{suffix}', {
+        'table': table, 'columns': [[col, False] for col in cols],
+        'unique': True, 'where': None, 'method': None, 'source': source,
+    })
+
+def parse_schema(sources: list[Path]) -> dict:
+    """Parse toutes les variantes dans l'ordre, en une passe par fichier."""
+    schema = {'tables': {}, 'indexes': {}}
+    for path in sources:
+        with open(path, encoding='utf-8') as f:
+            for statement in sql_statements(sql_tokens(f)):
+                if statement and statement[0] in (('word', 'create'), ('word', 'alter')):
+                    apply_statement(schema, statement, path.name)
+    return schema
+
+# Faux le temps d'un --plan / --diff : les caches sont lus, jamais réécrits
+CACHE_WRITES = True
+
+@contextlib.contextmanager
+def read_only_caches(enabled: bool = True):
+    """Pendant le bloc, write_cache n'écrit rien si enabled."""
+    global CACHE_WRITES
+    previous, CACHE_WRITES = CACHE_WRITES, CACHE_WRITES and not enabled
+    try:
+        yield
+    finally:
+        CACHE_WRITES = previous
+
+def write_cache(path: Path, data: dict):
+    """Remplace atomiquement un fichier de CACHE_DIR, sauf en lecture seule."""
+    if not CACHE_WRITES:
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    os.replace(stage_file(path, json.dumps(data).encode('utf-8')), path)
+
+def load_schema(sources: list[Path]) -> tuple[dict, str]:
+    """Schéma parsé + sa clé, mis en cache selon le hash des fichiers sources.
+
+    Comme pour le manifest : si (taille, mtime) concordent on ne relit rien ;
+    sinon on re-hashe, et on ne re-parse que si un hash a vraiment changé.
+    """
+    cache_path = CACHE_DIR / 'schema.json'
+    try:
+        cached = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        cached = {}
+    if cached.get('version') != SCHEMA_PARSER_VERSION:
+        cached = {}
+
+    stats = []
+    for path in sources:
+        st = path.stat()
+        stats.append({'path': path.name, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns})
+    previous = cached.get('sources', [])
+    if previous and [
+        {key: entry[key] for key in ('path', 'size', 'mtime_ns')} for entry in previous
+    ] == stats:
+        return cached['schema'], cached['key']
+
+    for entry, path in zip(stats, sources):
+        entry['sha256'] = hashlib.sha256(path.read_bytes()).hexdigest()
+    key = hashlib.sha256(json.dumps(
+        [SCHEMA_PARSER_VERSION, [(entry['path'], entry['sha256']) for entry in stats]]
+    ).encode('utf-8')).hexdigest()
+    schema = cached['schema'] if cached.get('key') == key else parse_schema(sources)
+
+    write_cache(cache_path, {'version': SCHEMA_PARSER_VERSION, 'key': key, 'sources': stats, 'schema': schema})
+    return schema, key
+
+def schema_sources(variables: dict) -> list[Path]:
+    names = variables.get('schema', {}).get('sources', [])
+    return [ROOT_DIR / name for name in names if (ROOT_DIR / name).exists()]
+
+SQL_TS_TYPES = {
+    'string': {
+        'uuid', 'text', 'varchar', 'character varying', 'character', 'char', 'citext',
+        'date', 'time', 'timestamp', 'timestamptz', 'timestamp with time zone',
+        'timestamp without time zone', 'time with time zone', 'interval', 'inet', 'bytea',
     },
-    enabled: !!userId,
-  });
-
-  const { data: quotaData } = useQuery({
-    queryKey: ['quota', userId],
-    queryFn: async () => {
-      if (!userId) return null;
-
-      const today = new Date().toISOString().split('T')[0];
-
-      const { data, error } = await supabase
-        .from('quotas')
-        .select('*')
-        .eq('user_id', userId)
-        .gte('resets_at', today)
-        .single();
-
-      if (error && error.code !== 'PGRST116') {
-        // Create quota if doesn't exist
-        const limits = tier === 'free' ? { astra: 5, clicks: 1 } 
-          : tier === 'premium' ? { astra: 40, clicks: 999 }
-          : { astra: 65, clicks: 999 };
-
-        const { data: newQuota } = await supabase
-          .from('quotas')
-          .insert({
-            user_id: userId,
-            astra_messages_limit: limits.astra,
-            univers_clicks_limit: limits.clicks,
-            resets_at: new Date(Date.now() + 86400000).toISOString(),
-          })
-          .select()
-          .single();
-
-        return newQuota as Quota;
-      }
-
-      return data as Quota | null;
+    'number': {
+        'int', 'integer', 'int2', 'int4', 'int8', 'smallint', 'bigint', 'serial',
+        'bigserial', 'float', 'float4', 'float8', 'real', 'double precision', 'decimal',
+        'numeric',
     },
-    enabled: !!userId,
-  });
-
-  if (subscriptionData && subscriptionData !== subscription) {
-    setSubscription(subscriptionData);
-  }
-
-  if (quotaData && quotaData !== quota) {
-    setQuota(quotaData);
-  }
-
-  return {
-    subscription,
-    quota,
-    tier,
-    isPremium: tier === 'premium' || tier === 'elite',
-    isElite: tier === 'elite',
-  };
-}
-''',
+    'boolean': {'boolean', 'bool'},
+    'Json': {'json', 'jsonb'},
 }
 
+def ts_type(column: dict) -> str:
+    base = next(
+        (ts for ts, sql_types in SQL_TS_TYPES.items() if column['type'] in sql_types),
+        'unknown',
+    )
+    return f'{base}[]' if column['array'] else base
+
+def render_supabase_types(schema: dict, sources: list[Path]) -> str:
+    lines = [
+        f"// Généré par generate-structure.py depuis {', '.join(p.name for p in sources)}",
+        "// Ne pas éditer à la main : modifier le schéma SQL puis relancer le générateur",
+        "export type Json =",
+        "  | string",
+        "  | number",
+        "  | boolean",
+        "  | null",
+        "  | { [key: string]: Json | undefined }",
+        "  | Json[]",
+        "",
+        "export interface Database {",
+        "  public: {",
+        "    Tables: {",
+    ]
+    for table in sorted(schema['tables']):
+        columns = schema['tables'][table]['columns']
+        lines.append(f"      {table}: {{")
+        for kind in ('Row', 'Insert', 'Update'):
+            lines.append(f"        {kind}: {{")
+            for column in columns:
+                value = ts_type(column)
+                if column['nullable']:
+                    value += ' | null'
+                optional = kind == 'Update' or (
+                    kind == 'Insert' and (column['nullable'] or column['has_default'])
+                )
+                lines.append(f"          {column['name']}{'?' if optional else ''}: {value}")
+            lines.append("        }")
+        lines.append("      }")
+    lines += [
+        "    }",
+        "  }",
+        "}",
+        "",
+        "type PublicTables = Database['public']['Tables']",
+        "",
+        "export type Tables<T extends keyof PublicTables> = PublicTables[T]['Row']",
+        "export type TablesInsert<T extends keyof PublicTables> = PublicTables[T]['Insert']",
+        "export type TablesUpdate<T extends keyof PublicTables> = PublicTables[T]['Update']",
+        "",
+    ]
+    return '\n'.join(lines)
+
+def generate_supabase_types(variables: dict, store) -> tuple[str, str]:
+    sources = schema_sources(variables)
+    schema, key = load_schema(sources)
+    return render_supabase_types(schema, sources), f'supabase_types:{key}'
+
 # ===================================================================
-# SERVICES
+# TABLES DE SYNASTRIE
 # ===================================================================
 
-SERVICES = {
-    'astra/astraService.ts': '''import { openai, ASTRA_MODEL, ASTRA_SYSTEM_PROMPT } from '@/config/openai';
-import { supabase } from '@/config/supabase';
-import type { Profile, AstraMemory } from '@/types';
-
-export class AstraService {
-  async generateResponse(
-    userId: string,
-    message: string,
-    profile: Profile,
-    recentMessages: any[],
-    memories: AstraMemory[]
-  ): Promise<string> {
-    const context = this.buildContext(profile, recentMessages, memories);
-
-    const completion = await openai.chat.completions.create({
-      model: ASTRA_MODEL,
-      messages: [
-        { role: 'system', content: ASTRA_SYSTEM_PROMPT },
-        { role: 'system', content: context },
-        ...recentMessages.map((msg) => ({
-          role: msg.message_type === 'user' ? 'user' as const : 'assistant' as const,
-          content: msg.content,
-        })),
-        { role: 'user', content: message },
-      ],
-      temperature: 0.8,
-      max_tokens: 300,
-    });
-
-    return completion.choices[0].message.content || 'ASTRA ne répond pas.';
-  }
-
-  private buildContext(
-    profile: Profile,
-    recentMessages: any[],
-    memories: AstraMemory[]
-  ): string {
-    return `
-PROFIL UTILISATEUR:
-- Prénom: ${profile.first_name}
-- Signes: Soleil ${profile.sun_sign}, Lune ${profile.moon_sign}, Ascendant ${profile.ascendant_sign}
-- Énergies: Feu ${profile.energy_fire}, Terre ${profile.energy_earth}, Air ${profile.energy_air}, Eau ${profile.energy_water}
-
-MÉMOIRE ASTRA (insights passés):
-${memories.map((m) => `- [${m.memory_type}] ${m.content}`).join('\\n')}
-
-CONTEXTE CONVERSATION:
-${recentMessages.length} messages récents dans l'historique.
-
-RAPPEL: Reste direct, profond, maximum 2-3 phrases.
-    `.trim();
-  }
-
-  async saveMemory(
-    userId: string,
-    type: string,
-    content: string,
-    importance: number = 5
-  ) {
-    const { data, error } = await supabase
-      .from('astra_memory')
-      .insert({
-        user_id: userId,
-        memory_type: type,
-        content,
-        importance,
-      })
-      .select()
-      .single();
-
-    if (error) throw error;
-    return data;
-  }
-
-  async getMemories(userId: string, limit: number = 5): Promise<AstraMemory[]> {
-    const { data, error } = await supabase
-      .from('astra_memory')
-      .select('*')
-      .eq('user_id', userId)
-      .order('importance', { ascending: false })
-      .order('last_referenced', { ascending: false })
-      .limit(limit);
-
-    if (error) throw error;
-    return data as AstraMemory[];
-  }
+# Miroir de src/utils/astroHelpers.ts (getSignElement / getElementalCompatibility)
+ZODIAC_SIGNS = (
+    'aries', 'taurus', 'gemini', 'cancer', 'leo', 'virgo',
+    'libra', 'scorpio', 'sagittarius', 'capricorn', 'aquarius', 'pisces',
+)
+SIGN_ELEMENTS = {
+    'aries': 'fire', 'leo': 'fire', 'sagittarius': 'fire',
+    'taurus': 'earth', 'virgo': 'earth', 'capricorn': 'earth',
+    'gemini': 'air', 'libra': 'air', 'aquarius': 'air',
+    'cancer': 'water', 'scorpio': 'water', 'pisces': 'water',
 }
+# Signe inconnu → air : lu comme le premier signe d'air
+UNKNOWN_SIGN = 'gemini'
+COMPATIBLE_ELEMENTS = {('fire', 'air'), ('air', 'fire'), ('earth', 'water'), ('water', 'earth')}
+
+# Termes de synastrieService.calculateCompatibility, dans l'ordre de la somme :
+# (table, détail, planète du thème 1, planète du thème 2, poids)
+SYNASTRY_TERMS = (
+    ('SUN_SUN', 'elementalHarmony', 'sun', 'sun', 0.2),
+    ('SUN_MOON', 'sunMoonAspect', 'sun', 'moon', 0.25),
+    ('VENUS_VENUS', 'venusAspect', 'venus', 'venus', 0.25),
+    ('MARS_MARS', 'marsAspect', 'mars', 'mars', 0.15),
+    ('ASC_ASC', 'ascendantCompatibility', 'ascendant', 'ascendant', 0.15),
+)
+
+def elemental_compatibility(sign1: str, sign2: str) -> int:
+    element1, element2 = SIGN_ELEMENTS[sign1], SIGN_ELEMENTS[sign2]
+    if element1 == element2:
+        return 100
+    return 80 if (element1, element2) in COMPATIBLE_ELEMENTS else 50
+
+def ts_array(kind: str, values: list, per_line: int = 12) -> str:
+    rows = [
+        '  ' + ', '.join(map(str, values[i:i + per_line])) + ','
+        for i in range(0, len(values), per_line)
+    ]
+    return f"new {kind}([\n" + '\n'.join(rows) + "\n])"
+
+def render_synastry_tables() -> str:
+    """Module TS : tables 12×12 par terme et calculateCompatibility en lectures.
+
+    Chaque table pondérée contient score × poids calculé en double comme le
+    fait le client ; repr() donne le littéral le plus court qui se relit
+    à l'identique en JS, donc la somme et l'arrondi sont bit à bit les mêmes.
+    """
+    elemental = [elemental_compatibility(s1, s2) for s1 in ZODIAC_SIGNS for s2 in ZODIAC_SIGNS]
+    lines = [
+        "// Généré par generate-structure.py depuis getElementalCompatibility et les poids",
+        "// de synastrieService.calculateCompatibility : ne pas éditer à la main",
+        "import type { CompatibilityScore, NatalChartData } from '@/types';",
+        "import { synastrieService } from './synastrieService';",
+        "",
+        "const SIGN_INDEX = new Map<string, number>([",
+        *(f"  ['{sign}', {i}]," for i, sign in enumerate(ZODIAC_SIGNS)),
+        "]);",
+        "",
+        "// Signe inconnu : traité comme air, comme getSignElement",
+        f"const UNKNOWN_SIGN = {ZODIAC_SIGNS.index(UNKNOWN_SIGN)};",
+        "",
+        "const signIndex = (sign: string): number => SIGN_INDEX.get(sign) ?? UNKNOWN_SIGN;",
+        "",
+        "// Compatibilité élémentaire [signe 1 × 12 + signe 2] (détails du score)",
+        f"export const ELEMENTAL = {ts_array('Uint8Array', elemental)};",
+    ]
+    for table, _, planet1, planet2, weight in SYNASTRY_TERMS:
+        lines += [
+            "",
+            f"// {planet1} × {planet2}, pondéré par {weight!r}",
+            f"const {table} = {ts_array('Float64Array', [repr(v * weight) for v in elemental])};",
+        ]
+    planets = list(dict.fromkeys(p for term in SYNASTRY_TERMS for p in term[2:4]))
+    shifts = {planet: 4 * i for i, planet in enumerate(planets)}
+
+    def lookup(table: str, planet1: str, planet2: str) -> str:
+        sign1 = f"((packed1 >> {shifts[planet1]}) & 15)" if shifts[planet1] else "(packed1 & 15)"
+        sign2 = f"((packed2 >> {shifts[planet2]}) & 15)" if shifts[planet2] else "(packed2 & 15)"
+        return f"{table}[{sign1} * 12 + {sign2}]"
+
+    index_lines = [
+        f"  const {planet}{number} = signIndex(chart{number}.{planet}.sign);"
+        for number in (1, 2)
+        for planet in dict.fromkeys(p for term in SYNASTRY_TERMS for p in term[1 + number:2 + number])
+    ]
+    terms = [f"{table}[{p1}1 * 12 + {p2}2]" for table, _, p1, p2, _ in SYNASTRY_TERMS]
+    packed_terms = [lookup(table, p1, p2) for table, _, p1, p2, _ in SYNASTRY_TERMS]
+    lines += [
+        "",
+        "/** Signes d'un thème empaquetés sur 4 bits par planète, à calculer une fois par profil. */",
+        "export function packChart(chart: NatalChartData): number {",
+        "  return (",
+        *(
+            f"    {'| ' if i else ''}{f'(signIndex(chart.{planet}.sign) << {shifts[planet]})' if shifts[planet] else f'signIndex(chart.{planet}.sign)'}"
+            for i, planet in enumerate(planets)
+        ),
+        "  );",
+        "}",
+        "",
+        "/** Score global de deux thèmes empaquetés : cinq lectures, aucune allocation. */",
+        "export function scorePacked(packed1: number, packed2: number): number {",
+        "  return Math.round(",
+        *(f"    {term}{' +' if i < len(packed_terms) - 1 else ''}" for i, term in enumerate(packed_terms)),
+        "  );",
+        "}",
+        "",
+        "export function scoreCompatibility(chart1: NatalChartData, chart2: NatalChartData): number {",
+        "  return scorePacked(packChart(chart1), packChart(chart2));",
+        "}",
+        "",
+        "/** Même résultat que synastrieService.calculateCompatibility, par lectures de tables. */",
+        "export function calculateCompatibility(",
+        "  chart1: NatalChartData,",
+        "  chart2: NatalChartData",
+        "): CompatibilityScore {",
+        *index_lines,
+        "  const overall = Math.round(",
+        *(f"    {term}{' +' if i < len(terms) - 1 else ''}" for i, term in enumerate(terms)),
+        "  );",
+        "",
+        "  return {",
+        "    overall,",
+        "    details: {",
+        *(f"      {detail}: ELEMENTAL[{p1}1 * 12 + {p2}2]," for _, detail, p1, p2, _ in SYNASTRY_TERMS),
+        "    },",
+        "    strengths: synastrieService.getStrengths(overall),",
+        "    challenges: synastrieService.getChallenges(overall),",
+        "    synastryAspects: [],",
+        "  };",
+        "}",
+        "",
+    ]
+    return '\n'.join(lines)
+
+def generate_synastry_tables(variables: dict, store) -> tuple[str, str]:
+    content = render_synastry_tables()
+    return content, 'synastry_tables:' + hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+# ===================================================================
+# ROUTES ET DÉCOUPAGE EN CHUNKS
+# ===================================================================
 
-export const astraService = new AstraService();
-''',
+def catalog_pages(store) -> tuple[str, list[str]]:
+    """(dossier d'import, noms des pages) de la section pages de index.json."""
+    section = next((s for s in store.sections() if s['key'] == 'pages'), None)
+    if section is None:
+        raise TemplateError("Section pages absente de index.json")
+    names = [Path(name).stem for name in section.get('templates', [])]
+    return section['dest'], names
+
+def render_route_manifest(dest: str, pages: list[str], routes: dict) -> str:
+    """Module TS : une frontière React.lazy par page et le préchargement des routes.
+
+    Le loader d'une page est partagé par lazy() et prefetchRoute() : un
+    chunk préchargé au survol est celui que le rendu demandera ensuite.
+    """
+    paths = routes.get('paths', {})
+    missing = [page for page in pages if page not in paths]
+    if missing:
+        raise TemplateError(f"Chemin de route manquant (routes.paths) pour {', '.join(missing)}")
+    lines = [
+        "// Généré par generate-structure.py depuis la section pages de templates/index.json",
+        "// et routes.paths de variables.json : ne pas éditer à la main",
+        "import { lazy, type ComponentType } from 'react';",
+        "",
+        "type PageModule = { default: ComponentType };",
+        "",
+        "const loaders = {",
+        *(f"  {page}: (): Promise<PageModule> => import('@/{dest}/{page}')," for page in pages),
+        "};",
+        "",
+        "export type PageName = keyof typeof loaders;",
+        "",
+        "export const pages = {",
+        *(f"  {page}: lazy(loaders.{page})," for page in pages),
+        "};",
+        "",
+        "export const routes: { path: string; page: PageName }[] = [",
+        *(f"  {{ path: '{paths[page]}', page: '{page}' }}," for page in pages),
+        "];",
+        "",
+        "const PAGE_BY_PATH = new Map(routes.map((route) => [route.path, route.page]));",
+        "",
+        "// Délai max avant un préchargement en temps libre",
+        f"const IDLE_TIMEOUT_MS = {int(routes.get('prefetch', {}).get('idle_timeout_ms', 3000))};",
+        "",
+        "const prefetched = new Map<PageName, Promise<unknown>>();",
+        "",
+        "// Connexion lente ou mode économie de données : pas de préchargement spéculatif",
+        "function constrained(): boolean {",
+        "  const connection = (navigator as { connection?: { saveData?: boolean; effectiveType?: string } }).connection;",
+        "  return !!connection && (connection.saveData === true || /2g/.test(connection.effectiveType ?? ''));",
+        "}",
+        "",
+        "export function prefetchRoute(path: string) {",
+        "  const page = PAGE_BY_PATH.get(path);",
+        "  if (!page || prefetched.has(page) || constrained()) return;",
+        "  // Échec réseau : la page sera simplement chargée au rendu",
+        "  prefetched.set(page, loaders[page]().catch(() => prefetched.delete(page)));",
+        "}",
+        "",
+        "// Précharge les routes en temps libre, une par callback ; renvoie l'annulation",
+        "export function prefetchWhenIdle(paths: string[]): () => void {",
+        "  const queue = [...paths];",
+        "  let handle: number | ReturnType<typeof setTimeout>;",
+        "  const idle = typeof requestIdleCallback === 'function';",
+        "  const next = () => {",
+        "    const path = queue.shift();",
+        "    if (path === undefined) return;",
+        "    prefetchRoute(path);",
+        "    handle = idle ? requestIdleCallback(next, { timeout: IDLE_TIMEOUT_MS }) : setTimeout(next, 200);",
+        "  };",
+        "  handle = idle ? requestIdleCallback(next, { timeout: IDLE_TIMEOUT_MS }) : setTimeout(next, 200);",
+        "  return () => (idle ? cancelIdleCallback(handle as number) : clearTimeout(handle));",
+        "}",
+        "",
+    ]
+    return '\n'.join(lines)
+
+def render_vite_chunks(chunks: dict[str, list[str]]) -> str:
+    """Module TS pour vite.config.ts : paquet node_modules → chunk nommé.
+
+    "@scope/*" couvre tout un scope. Les paquets non listés restent répartis
+    par Rollup, au plus près des pages qui les importent.
+    """
+    exact, scopes = {}, {}
+    for chunk, packages in chunks.items():
+        for package in packages:
+            target = scopes if package.endswith('/*') else exact
+            target[package.removesuffix('/*')] = chunk
+    lines = [
+        "// Généré par generate-structure.py depuis routes.chunks de templates/variables.json",
+        "// Ne pas éditer à la main",
+        "const PACKAGES: Record<string, string> = {",
+        *(f"  '{package}': '{chunk}'," for package, chunk in sorted(exact.items())),
+        "};",
+        "",
+        "const SCOPES: Record<string, string> = {",
+        *(f"  '{scope}': '{chunk}'," for scope, chunk in sorted(scopes.items())),
+        "};",
+        "",
+        "// .* gourmand : dernier node_modules du chemin, dépendances imbriquées comprises",
+        "const PACKAGE_RE = /.*[\\\\/]node_modules[\\\\/]((@[^\\\\/]+)[\\\\/][^\\\\/]+|[^\\\\/]+)/;",
+        "",
+        "export function manualChunks(id: string): string | undefined {",
+        "  const match = PACKAGE_RE.exec(id);",
+        "  if (!match) return undefined;",
+        "  return PACKAGES[match[1]] ?? (match[2] ? SCOPES[match[2]] : undefined);",
+        "}",
+        "",
+    ]
+    return '\n'.join(lines)
+
+def generate_route_manifest(variables: dict, store) -> tuple[str, str]:
+    dest, pages = catalog_pages(store)
+    content = render_route_manifest(dest, pages, variables.get('routes', {}))
+    return content, 'route_manifest:' + hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def generate_vite_chunks(variables: dict, store) -> tuple[str, str]:
+    content = render_vite_chunks(variables.get('routes', {}).get('chunks', {}))
+    return content, 'vite_chunks:' + hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+# Sorties calculées (sections "generated" de l'index) : nom → fonction(variables, store)
+GENERATORS = {
+    'supabase_types': generate_supabase_types,
+    'synastry_tables': generate_synastry_tables,
+    'route_manifest': generate_route_manifest,
+    'vite_chunks': generate_vite_chunks,
 }
 
 # ===================================================================
-# COMPOSANTS UI
+# MOTEUR D'ÉMISSION
 # ===================================================================
 
-UI_COMPONENTS = {
-    'Button.tsx': '''import { ButtonHTMLAttributes, forwardRef } from 'react';
-import { cn } from '@/utils/cn';
+class TemplateStore:
+    """Catalogue de templates sur disque, chargé paresseusement.
+
+    Seul index.json est lu au démarrage ; le contenu d'un template n'est lu
+    que lorsqu'une tâche le sélectionne.
+    """
+
+    def __init__(self, root: Path = TEMPLATES_DIR):
+        self.root = root
+        self._index = None
+        self._cache: dict[tuple[str, str], str] = {}
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = json.loads((self.root / 'index.json').read_text(encoding='utf-8'))
+        return self._index
+
+    def sections(self) -> list[dict]:
+        return self.index['sections']
+
+    def section_keys(self) -> list[str]:
+        return [section['key'] for section in self.sections()]
+
+    def labels(self) -> dict[str, str]:
+        return {section['key']: section['label'] for section in self.sections()}
+
+    def source_path(self, section: str, name: str) -> Path:
+        return self.root / section / f'{name}.tpl'
+
+    def read(self, section: str, name: str) -> str:
+        key = (section, name)
+        if key not in self._cache:
+            self._cache[key] = self.source_path(section, name).read_bytes().decode('utf-8')
+        return self._cache[key]
+
+    def invalidate(self, section: str, name: str):
+        self._cache.pop((section, name), None)
+
+    def reload_index(self):
+        self._index = None
+
+    def template_for(self, path: Path) -> tuple[str, str] | None:
+        """(section, nom) du template dont path est le source, sinon None."""
+        try:
+            rel = path.relative_to(self.root)
+        except ValueError:
+            return None
+        if len(rel.parts) < 2 or rel.suffix != '.tpl':
+            return None
+        return rel.parts[0], rel.relative_to(rel.parts[0]).as_posix()[:-len('.tpl')]
+
+def section_dir(section: dict) -> Path:
+    """Dossier de sortie : dest relatif à src/, ou à la racine si "root" (migrations SQL)."""
+    return (BASE_DIR.parent if section.get('root') else BASE_DIR) / section['dest']
+
+class Task(NamedTuple):
+    section: str
+    path: Path
+    content: str
+    render_key: str | None = None
+    render_time: tuple[float, float] = (0.0, 0.0)
+
+def build_tasks(
+    store: TemplateStore,
+    renderer: Renderer,
+    only: set[str] | None = None,
+    globs: list[str] | None = None,
+    templates: set[tuple[str, str]] | None = None,
+    notes: list[str] | None = None,
+    read_only: bool = False,
+) -> list[Task]:
+    """Construit les tâches sélectionnées ; seuls leurs templates sont lus et rendus.
+
+    templates restreint encore la sélection à des couples (section, nom).
+    Les sorties "generated" de l'index sont calculées par GENERATORS.
+    Les requêtes Supabase des templates passent par Projector ; ses
+    remarques sont ajoutées à notes. read_only : aucun cache n'est réécrit.
+    """
+    with read_only_caches(read_only):
+        return _build_tasks(store, renderer, only, globs, templates, notes)
+
+def _build_tasks(
+    store: TemplateStore,
+    renderer: Renderer,
+    only: set[str] | None,
+    globs: list[str] | None,
+    templates: set[tuple[str, str]] | None,
+    notes: list[str] | None,
+) -> list[Task]:
+    tasks = []
+    projector = None
+    for section in store.sections():
+        key = section['key']
+        if only and key not in only:
+            continue
+        generated = section.get('generated', {})
+        for name in [*section.get('templates', []), *generated]:
+            if templates is not None and (key, name) not in templates:
+                continue
+            path = section_dir(section) / name
+            if globs:
+                rel = path.relative_to(BASE_DIR.parent).as_posix()
+                if not any(fnmatch.fnmatch(rel, pattern) for pattern in globs):
+                    continue
+            started = clock()
+            if name in generated:
+                content, render_key = GENERATORS[generated[name]](renderer.variables, store)
+            else:
+                content, render_key = renderer.render(store.read(key, name), f'{key}/{name}')
+                if name.endswith(('.ts', '.tsx')) and 'supabase' in content:
+                    projector = projector or Projector.load(renderer.variables, store.root)
+                    content, remarks = projector.project_cached(content, f'templates/{key}/{name}.tpl')
+                    render_key = hashlib.sha256(f'{render_key}:{projector.key}'.encode()).hexdigest()
+                    if notes is not None:
+                        notes.extend(remarks)
+            tasks.append(Task(key, path, content, render_key, elapsed(started)))
+    if projector is not None:
+        projector.save()
+    return tasks
+
+def run_tasks(
+    tasks: list[Task],
+    manifest: dict,
+    jobs: int = DEFAULT_JOBS,
+    durability: str = 'off',
+    report: 'RunReport | None' = None,
+) -> dict:
+    """Émet les tâches sur un pool borné, publie un événement par fichier dans l'ordre.
+
+    Les dossiers sont une dépendance de toutes les écritures : on calcule leur
+    ensemble unique et on les crée une seule fois avant de lancer le pool.
+    Retourne un résumé {section: {'written': n, 'unchanged': n}}.
+    """
+    report = report or RunReport(console=False)
+    started = clock()
+    directories = sorted({task.path.parent for task in tasks})
+    for directory in directories:
+        directory.mkdir(parents=True, exist_ok=True)
+    cleanup_stale_temps(directories)
+    report.phase('mkdir', elapsed(started))
+
+    def emit(chunk: list[Task]):
+        return [
+            create_file(task.path, task.content, manifest, durability, task.render_key)
+            for task in chunk
+        ]
+
+    # Lots de quelques tâches par worker pour amortir le coût du pool
+    size = max(1, len(tasks) // (jobs * 4))
+    chunks = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+    if jobs > 1 and len(chunks) > 1:
+        pool = ThreadPoolExecutor(max_workers=jobs)
+        results = chain.from_iterable(pool.map(emit, chunks))
+    else:
+        pool = None
+        results = chain.from_iterable(map(emit, chunks))
+
+    summary = {}
+    staged = []
+    try:
+        # map() rend les résultats dans l'ordre des tâches : sortie déterministe
+        for task, (written, entry, pending, phases) in zip(tasks, results):
+            if pending is not None:
+                staged.append((pending, task.path))
+            rel = task.path.relative_to(BASE_DIR.parent).as_posix()
+            manifest[rel] = entry
+            counts = summary.setdefault(task.section, {'written': 0, 'unchanged': 0})
+            counts['written' if written else 'unchanged'] += 1
+            report.emit(Event(
+                section=task.section,
+                path=rel,
+                bytes_rendered=entry['size'],
+                bytes_written=entry['size'] if written else 0,
+                skipped=not written,
+                phases={'render': task.render_time, **phases},
+            ))
+        started = clock()
+        commit_staged(staged, durability)
+        staged = []
+        report.phase('commit', elapsed(started))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        # Interruption avant le commit : on ne laisse pas de temporaires derrière
+        for tmp, _ in staged:
+            tmp.unlink(missing_ok=True)
+    return summary
 
-interface ButtonProps extends ButtonHTMLAttributes<HTMLButtonElement> {
-  variant?: 'primary' | 'secondary' | 'ghost';
-  size?: 'sm' | 'md' | 'lg';
-}
+# ===================================================================
+# VALIDATION STRUCTURELLE DES SORTIES TS
+# ===================================================================
 
-export const Button = forwardRef<HTMLButtonElement, ButtonProps>(
-  ({ className, variant = 'primary', size = 'md', children, ...props }, ref) => {
-    return (
-      <button
-        ref={ref}
-        className={cn(
-          'inline-flex items-center justify-center rounded-medium font-semibold',
-          'transition-all duration-200 disabled:opacity-50 disabled:cursor-not-allowed',
-          {
-            'bg-cosmic-purple hover:bg-cosmic-purple/90 text-white':
-              variant === 'primary',
-            'bg-white/10 hover:bg-white/20 text-white border border-white/20':
-              variant === 'secondary',
-            'bg-transparent hover:bg-white/10 text-white': variant === 'ghost',
-          },
-          {
-            'text-sm px-3 py-2': size === 'sm',
-            'text-base px-4 py-3': size === 'md',
-            'text-lg px-6 py-4': size === 'lg',
-          },
-          className
-        )}
-        {...props}
-      >
-        {children}
-      </button>
-    );
-  }
-);
-
-Button.displayName = 'Button';
-''',
-
-    'Card.tsx': '''import { HTMLAttributes, forwardRef } from 'react';
-import { cn } from '@/utils/cn';
-
-interface CardProps extends HTMLAttributes<HTMLDivElement> {}
-
-export const Card = forwardRef<HTMLDivElement, CardProps>(
-  ({ className, children, ...props }, ref) => {
-    return (
-      <div
-        ref={ref}
-        className={cn(
-          'glass-effect rounded-medium p-6',
-          className
-        )}
-        {...props}
-      >
-        {children}
-      </div>
-    );
-  }
-);
-
-Card.displayName = 'Card';
-''',
-}
+# En dessous de ce nombre de sorties à valider, le pool coûte plus qu'il ne rapporte
+VALIDATE_POOL_MIN = 64
+
+# Extensions essayées pour un import '@/chemin' sans extension
+IMPORT_SUFFIXES = ('', '.ts', '.tsx', '.d.ts', '.js', '.jsx', '/index.ts', '/index.tsx')
+
+# Après ces mots, '/' ouvre une regex et '<' un élément JSX
+EXPRESSION_KEYWORDS = frozenset({
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await',
+})
+
+ALIAS_IMPORT_RE = re.compile(r"""(?:\bfrom\s*|\bimport\s*\(\s*|\bimport\s+)(['"])(@/[^'"]+)\1""")
+
+CLOSERS = {')': '(', ']': '[', '}': '{'}
+
+# Prochain jeton en mode code. 'run' avale d'un coup tout ce qui n'ouvre ni ne
+# ferme rien ; 'quote' = chaîne ouverte non terminée sur sa ligne
+TS_CODE_RE = re.compile(r"""
+    (?P<end>\Z)
+  | (?P<comment>//[^\n]*)
+  | (?P<block>/\*)
+  | (?P<run>[^/'"`()\[\]{}<]+)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")
+  | (?P<quote>['"])
+  | (?P<template>`)
+  | (?P<open>[(\[{])
+  | (?P<close>[)\]}])
+  | (?P<slash>/)
+  | (?P<angle><)
+""", re.X)
+TS_TAIL_WORD_RE = re.compile(r'[\w$]+\Z')
+TS_REGEX_RE = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+TS_TEMPLATE_RE = re.compile(r'\\.|`|\$\{', re.S)
+TS_TAG_START_RE = re.compile(r'[A-Za-z_$>]')
+TS_TAG_NAME_RE = re.compile(r'[\w$.:-]*')
+TS_ATTRIBUTE_RE = re.compile(r"/>|>|\{|['\"]")
+TS_CHILD_RE = re.compile(r'\{|</|<(?=[A-Za-z_$>])')
+TS_CLOSING_RE = re.compile(r'\s*([\w$.:-]*)\s*>')
+# En TSX, <T,> et <T extends U> ouvrent les paramètres de type d'une fonction
+# fléchée générique, pas un élément (<Foo extends /> reste un attribut booléen)
+TS_TYPE_PARAMS_RE = re.compile(r'\s*[A-Za-z_$][\w$]*\s*(?:,|extends\s+[^\s=/>])')
+TS_ANGLE_RE = re.compile(r"=>|[<>]|'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"")
+
+class SourceError(Exception):
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+
+class TsScanner:
+    """Lexeur minimal TS/TSX : équilibre des (), [], {}, des chaînes, des
+    template literals (avec ${} imbriqués), des commentaires et des balises JSX.
+
+    Pas d'analyse syntaxique : seulement ce qui casse le parseur de tsc/esbuild,
+    signalé à la première ligne fautive. '/' et '<' sont tranchés par le jeton
+    précédent (valeur → opérateur, sinon regex / JSX). Les sauts se font par
+    regex ; les numéros de ligne ne sont calculés qu'en cas d'erreur.
+    """
+
+    def __init__(self, text: str, jsx: bool):
+        self.text = text
+        self.jsx = jsx
+        self.pos = 0
+        # Le dernier jeton significatif est-il une valeur (identifiant, nombre, fermant) ?
+        self.value = False
+
+    def error(self, message: str, pos: int | None = None):
+        raise SourceError(self.text.count('\n', 0, self.pos if pos is None else pos) + 1, message)
+
+    def line_of(self, pos: int) -> int:
+        return self.text.count('\n', 0, pos) + 1
+
+    def scan_code(self, stop: str | None = None, opened: int = 0):
+        """Code jusqu'au fermant stop non apparié (fin de ${…} ou de {…} JSX)."""
+        text = self.text
+        stack: list[tuple[str, int]] = []
+        while True:
+            match = TS_CODE_RE.match(text, self.pos)
+            kind = match.lastgroup
+            start, self.pos = self.pos, match.end()
+            if kind == 'end':
+                if stack:
+                    self.error(f"'{stack[-1][0]}' jamais fermé", stack[-1][1])
+                if stop:
+                    self.error(f"'{stop}' attendu avant la fin du fichier", opened)
+                return
+            if kind == 'comment':
+                continue
+            if kind == 'run':
+                # Le dernier mot du segment décide : valeur, ou mot-clé suivi d'une expression
+                tail = match.group().rstrip()
+                if tail:
+                    # Fenêtre bornée : au-delà, ce n'est de toute façon pas un mot-clé
+                    word = TS_TAIL_WORD_RE.search(tail, max(0, len(tail) - 16))
+                    self.value = word is not None and word.group() not in EXPRESSION_KEYWORDS
+                continue
+            if kind == 'block':
+                end = text.find('*/', self.pos)
+                if end < 0:
+                    self.error("commentaire /* non terminé", start)
+                self.pos = end + 2
+            elif kind == 'string':
+                self.value = True
+            elif kind == 'quote':
+                self.error(f"chaîne {match.group()}…{match.group()} non terminée", start)
+            elif kind == 'template':
+                self.scan_template(start)
+                self.value = True
+            elif kind == 'open':
+                stack.append((match.group(), start))
+                self.value = False
+            elif kind == 'close':
+                char = match.group()
+                if not stack:
+                    if char == stop:
+                        self.value = True
+                        return
+                    self.error(f"'{char}' sans ouvrant", start)
+                opener, where = stack.pop()
+                if opener != CLOSERS[char]:
+                    self.error(f"'{char}' ferme '{opener}' ouvert ligne {self.line_of(where)}", start)
+                self.value = True
+            elif kind == 'slash':
+                if not self.value:
+                    regex = TS_REGEX_RE.match(text, start)
+                    if regex is None:
+                        self.error("regex /…/ non terminée", start)
+                    self.pos = regex.end()
+                    self.value = True
+                else:
+                    self.value = False
+            elif self.jsx and not self.value and TS_TYPE_PARAMS_RE.match(text, self.pos):
+                self.scan_type_arguments(start)
+                self.value = False
+            elif self.jsx and not self.value and TS_TAG_START_RE.match(text, self.pos):
+                self.scan_element(start)
+                self.value = True
+            else:
+                self.value = False
+
+    def scan_template(self, opened: int):
+        text = self.text
+        while True:
+            match = TS_TEMPLATE_RE.search(text, self.pos)
+            if match is None:
+                self.error("template literal `…` non terminé", opened)
+            self.pos = match.end()
+            if match.group() == '`':
+                return
+            if match.group() == '${':
+                self.value = False
+                self.scan_code('}', match.start())
+
+    def scan_type_arguments(self, opened: int):
+        """<…> de types (le '<' ouvrant déjà lu), chevrons imbriqués compris."""
+        depth = 1
+        while depth:
+            match = TS_ANGLE_RE.search(self.text, self.pos)
+            if match is None:
+                self.error("'<' de paramètres de type jamais fermé", opened)
+            self.pos = match.end()
+            token = match.group()
+            if token == '<':
+                depth += 1
+            elif token == '>':
+                depth -= 1
+
+    def scan_element(self, opened: int):
+        """<Tag …>enfants</Tag>, <Tag />, <>…</>, et <Tag<T> …> (arguments de type)."""
+        text = self.text
+        name = TS_TAG_NAME_RE.match(text, self.pos).group()
+        self.pos += len(name)
+        if name and text.startswith('<', self.pos):
+            self.pos += 1
+            self.scan_type_arguments(opened)
+        while True:
+            match = TS_ATTRIBUTE_RE.search(text, self.pos)
+            if match is None:
+                self.error(f"balise <{name}> non terminée", opened)
+            self.pos = match.end()
+            token = match.group()
+            if token == '/>':
+                return
+            if token == '>':
+                break
+            if token == '{':
+                self.value = False
+                self.scan_code('}', match.start())
+            else:
+                end = text.find(token, self.pos)
+                if end < 0:
+                    self.error(f"attribut {token}…{token} non terminé", match.start())
+                self.pos = end + 1
+        self.scan_children(name, opened)
+
+    def scan_children(self, name: str, opened: int):
+        text = self.text
+        while True:
+            match = TS_CHILD_RE.search(text, self.pos)
+            if match is None:
+                self.error(f"<{name}> jamais fermé", opened)
+            self.pos = match.end()
+            token = match.group()
+            if token == '{':
+                self.value = False
+                self.scan_code('}', match.start())
+            elif token == '</':
+                closing = TS_CLOSING_RE.match(text, self.pos)
+                if closing is None:
+                    self.error("balise fermante mal formée", match.start())
+                self.pos = closing.end()
+                if closing.group(1) != name:
+                    self.error(
+                        f"</{closing.group(1)}> ferme <{name}> ouvert ligne {self.line_of(opened)}",
+                        match.start(),
+                    )
+                return
+            else:
+                self.scan_element(match.start())
+
+def alias_targets(text: str) -> list[tuple[int, str]]:
+    """(ligne, spécificateur) des imports '@/…' statiques et dynamiques."""
+    return [
+        (text.count('\n', 0, match.start()) + 1, match.group(2))
+        for match in ALIAS_IMPORT_RE.finditer(text)
+    ]
+
+def check_source(where: str, text: str, jsx: bool) -> str | None:
+    """Premier défaut structurel de text, formaté fichier:ligne, ou None."""
+    try:
+        TsScanner(text, jsx).scan_code()
+    except SourceError as e:
+        return f"{where}:{e.line}: {e}"
+    return None
+
+def check_chunk(chunk: list[tuple[str, str, bool]]) -> list[str]:
+    """Travail d'un worker du pool : une erreur au plus par fichier."""
+    return [error for error in (check_source(*item) for item in chunk) if error]
+
+def resolves(specifier: str, roots: tuple[Path, ...], emitted: set[str]) -> bool:
+    rel = specifier[2:]
+    for suffix in IMPORT_SUFFIXES:
+        candidate = rel + suffix
+        if candidate in emitted or any((root / candidate).is_file() for root in roots):
+            return True
+    return False
+
+def validate_tasks(tasks: list[Task], store: TemplateStore, manifest: dict, jobs: int) -> int:
+    """Valide les sorties .ts/.tsx re-rendues avant toute écriture.
+
+    Une sortie dont render_key n'a pas bougé depuis le manifest a déjà été
+    validée. Les imports '@/…' doivent viser un fichier de BASE_DIR, du src/
+    du projet ou une sortie du catalogue. Lève TemplateError avec toutes
+    les erreurs (fichier:ligne) ; retourne le nombre de sorties vérifiées.
+    """
+    pending = []
+    for task in tasks:
+        if task.path.suffix not in ('.ts', '.tsx'):
+            continue
+        rel = task.path.relative_to(BASE_DIR.parent).as_posix()
+        entry = manifest.get(rel)
+        if task.render_key and entry and entry.get('render_key') == task.render_key:
+            continue
+        pending.append((rel, task.content, task.path.suffix == '.tsx'))
+    if not pending:
+        return 0
+
+    emitted = {
+        (section_dir(section) / name).relative_to(BASE_DIR).as_posix()
+        for section in store.sections() if not section.get('root')
+        for name in [*section.get('templates', []), *section.get('generated', {})]
+    }
+    roots = tuple(dict.fromkeys((BASE_DIR, ROOT_DIR / 'src')))
+    imports = [(rel, line, specifier) for rel, text, _ in pending for line, specifier in alias_targets(text)]
+    # Un même module est importé partout : un seul jeu de stat() par spécificateur
+    found = {specifier: resolves(specifier, roots, emitted) for specifier in {item[2] for item in imports}}
+    errors = [
+        f"{rel}:{line}: import {specifier} introuvable"
+        for rel, line, specifier in imports
+        if not found[specifier]
+    ]
+
+    # Le scan est du Python pur (GIL) : des processus, jamais plus que de cœurs
+    workers = min(jobs, os.cpu_count() or 1)
+    if workers > 1 and len(pending) >= VALIDATE_POOL_MIN:
+        # Import différé : multiprocessing coûte ~30 ms au démarrage
+        from concurrent.futures import ProcessPoolExecutor
+
+        size = max(1, len(pending) // (workers * 4))
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            errors += chain.from_iterable(pool.map(check_chunk, chunks))
+    else:
+        errors += check_chunk(pending)
+
+    if errors:
+        raise TemplateError(
+            f"{len(errors)} sortie(s) invalide(s), rien n'a été écrit :\n" + '\n'.join(sorted(errors))
+        )
+    return len(pending)
 
 # ===================================================================
-# PAGES
+# PLAN / DIFF
 # ===================================================================
 
-PAGES = {
-    'LoginPage.tsx': '''import { useState } from 'react';
-import { useAuth } from '@/hooks/useAuth';
-import { Button } from '@/components/ui/Button';
-
-export default function LoginPage() {
-  const [email, setEmail] = useState('');
-  const [password, setPassword] = useState('');
-  const [isLoading, setIsLoading] = useState(false);
-  const { login } = useAuth();
-
-  const handleSubmit = async (e: React.FormEvent) => {
-    e.preventDefault();
-    setIsLoading(true);
-    try {
-      await login(email, password);
-    } catch (error) {
-      console.error(error);
-    } finally {
-      setIsLoading(false);
-    }
-  };
-
-  return (
-    <div className="min-h-screen bg-cosmic-black cosmic-gradient flex items-center justify-center p-4">
-      <div className="w-full max-w-md glass-effect p-8 rounded-large">
-        <div className="text-center mb-8">
-          <div className="text-4xl mb-4 animate-cosmic-pulse">⭐</div>
-          <h1 className="text-3xl font-display font-bold mb-2">ASTRA</h1>
-          <p className="text-white/60">Le dating conscient guidé par l'astrologie</p>
-        </div>
-
-        <form onSubmit={handleSubmit} className="space-y-4">
-          <div>
-            <label className="block text-sm font-medium mb-2">Email</label>
-            <input
-              type="email"
-              value={email}
-              onChange={(e) => setEmail(e.target.value)}
-              className="w-full px-4 py-3 bg-white/5 border border-white/10 rounded-medium
-                focus:outline-none focus:border-cosmic-purple transition-colors"
-              required
-            />
-          </div>
-
-          <div>
-            <label className="block text-sm font-medium mb-2">Mot de passe</label>
-            <input
-              type="password"
-              value={password}
-              onChange={(e) => setPassword(e.target.value)}
-              className="w-full px-4 py-3 bg-white/5 border border-white/10 rounded-medium
-                focus:outline-none focus:border-cosmic-purple transition-colors"
-              required
-            />
-          </div>
-
-          <Button
-            type="submit"
-            className="w-full"
-            disabled={isLoading}
-          >
-            {isLoading ? 'Connexion...' : 'Se connecter'}
-          </Button>
-        </form>
-      </div>
-    </div>
-  );
-}
-''',
-
-    'UniversPage.tsx': '''export default function UniversPage() {
-  return (
-    <div className="h-full cosmic-gradient">
-      <div className="p-6">
-        <h1 className="text-3xl font-display font-bold mb-4">🌌 Univers</h1>
-        <p className="text-white/60">Constellation view à implémenter</p>
-      </div>
-    </div>
-  );
-}
-''',
-
-    'MessagesPage.tsx': '''export default function MessagesPage() {
-  return (
-    <div className="h-full">
-      <div className="p-6">
-        <h1 className="text-3xl font-display font-bold mb-4">💬 Messages</h1>
-        <p className="text-white/60">Messages humains à implémenter</p>
-      </div>
-    </div>
-  );
-}
-''',
-
-    'AstraPage.tsx': '''export default function AstraPage() {
-  return (
-    <div className="h-full">
-      <div className="p-6">
-        <h1 className="text-3xl font-display font-bold mb-4">⭐ ASTRA</h1>
-        <p className="text-white/60">Chat ASTRA à implémenter</p>
-      </div>
-    </div>
-  );
-}
-''',
-
-    'AstroPage.tsx': '''export default function AstroPage() {
-  return (
-    <div className="h-full">
-      <div className="p-6">
-        <h1 className="text-3xl font-display font-bold mb-4">♈ Astro</h1>
-        <p className="text-white/60">Thème natal à implémenter</p>
-      </div>
-    </div>
-  );
-}
-''',
-
-    'ProfilePage.tsx': '''export default function ProfilePage() {
-  return (
-    <div className="h-full">
-      <div className="p-6">
-        <h1 className="text-3xl font-display font-bold mb-4">👤 Profil</h1>
-        <p className="text-white/60">Profil cosmique à implémenter</p>
-      </div>
-    </div>
-  );
-}
-''',
-
-    'SubscriptionPage.tsx': '''export default function SubscriptionPage() {
-  return (
-    <div className="h-full">
-      <div className="p-6">
-        <h1 className="text-3xl font-display font-bold mb-4">💎 Abonnement</h1>
-        <p className="text-white/60">Pricing à implémenter</p>
-      </div>
-    </div>
-  );
-}
-''',
-
-    'SettingsPage.tsx': '''export default function SettingsPage() {
-  return (
-    <div className="h-full">
-      <div className="p-6">
-        <h1 className="text-3xl font-display font-bold mb-4">⚙️ Paramètres</h1>
-        <p className="text-white/60">Settings à implémenter</p>
-      </div>
-    </div>
-  );
-}
-''',
-
-    'OnboardingPage.tsx': '''export default function OnboardingPage() {
-  return (
-    <div className="min-h-screen bg-cosmic-black cosmic-gradient flex items-center justify-center">
-      <div className="text-center">
-        <div className="text-6xl mb-4 animate-cosmic-pulse">⭐</div>
-        <h1 className="text-4xl font-display font-bold mb-4">Bienvenue</h1>
-        <p className="text-white/60">Onboarding à implémenter</p>
-      </div>
-    </div>
-  );
-}
-''',
-}
+PLAN_MARKS = {'create': '+', 'overwrite': '~', 'unchanged': '='}
+
+def plan_tasks(tasks: list[Task], manifest: dict, diff: bool = False, out=None) -> dict:
+    """Indique ce que la génération changerait, sans rien écrire.
+
+    Taille puis hash court-circuitent la comparaison : seuls les fichiers qui
+    diffèrent vraiment sont relus pour le diff, un à la fois.
+    Retourne {'create': n, 'overwrite': n, 'unchanged': n}.
+    """
+    out = out or sys.stdout
+    counts = {status: 0 for status in PLAN_MARKS}
+    for task in tasks:
+        rel = task.path.relative_to(BASE_DIR.parent).as_posix()
+        data = task.content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        status, _ = file_status(task.path, data, digest, manifest.get(rel))
+        counts[status] += 1
+        out.write(f"{PLAN_MARKS[status]} {status:<9} {rel}\n")
+        if diff and status != 'unchanged':
+            write_diff(task.path, task.content, rel, status, out)
+    return counts
+
+def write_diff(path: Path, content: str, rel: str, status: str, out):
+    if status == 'create':
+        current = []
+    else:
+        current = path.read_bytes().decode('utf-8', errors='replace').splitlines(keepends=True)
+    out.writelines(difflib.unified_diff(
+        current,
+        content.splitlines(keepends=True),
+        fromfile='/dev/null' if status == 'create' else f'a/{rel}',
+        tofile=f'b/{rel}',
+    ))
+    out.write('\n')
 
 # ===================================================================
-# LAYOUT
+# CONSEILLER D'INDEX
 # ===================================================================
 
-LAYOUT = {
-    'MainLayout.tsx': '''import { Outlet } from 'react-router-dom';
-import MobileTabBar from './MobileTabBar';
-import DesktopSidebar from './DesktopSidebar';
-
-export default function MainLayout() {
-  return (
-    <div className="h-screen flex flex-col md:flex-row bg-cosmic-black overflow-hidden">
-      {/* Desktop sidebar */}
-      <div className="hidden md:block">
-        <DesktopSidebar />
-      </div>
-
-      {/* Main content */}
-      <main className="flex-1 overflow-auto">
-        <Outlet />
-      </main>
-
-      {/* Mobile tab bar */}
-      <div className="md:hidden">
-        <MobileTabBar />
-      </div>
-    </div>
-  );
-}
-''',
-
-    'MobileTabBar.tsx': '''import { useLocation, useNavigate } from 'react-router-dom';
-
-export default function MobileTabBar() {
-  const location = useLocation();
-  const navigate = useNavigate();
-
-  const tabs = [
-    { path: '/univers', icon: '🌌', label: 'Univers' },
-    { path: '/messages', icon: '💬', label: 'Messages' },
-    { path: '/astra', icon: '⭐', label: 'ASTRA' },
-    { path: '/profile', icon: '👤', label: 'Profil' },
-  ];
-
-  return (
-    <nav className="fixed bottom-0 left-0 right-0 bg-cosmic-black/95 backdrop-blur-xl
-      border-t border-white/10 flex justify-around py-2 z-50">
-      {tabs.map((tab) => (
-        <button
-          key={tab.path}
-          onClick={() => navigate(tab.path)}
-          className={`flex flex-col items-center gap-1 px-4 py-2 transition-colors
-            ${location.pathname === tab.path ? 'text-cosmic-purple' : 'text-white/60'}`}
-        >
-          <span className="text-xl">{tab.icon}</span>
-          <span className="text-xs font-medium">{tab.label}</span>
-        </button>
-      ))}
-    </nav>
-  );
-}
-''',
-
-    'DesktopSidebar.tsx': '''import { useLocation, useNavigate } from 'react-router-dom';
-import { useAuth } from '@/hooks/useAuth';
-
-export default function DesktopSidebar() {
-  const location = useLocation();
-  const navigate = useNavigate();
-  const { logout } = useAuth();
-
-  const links = [
-    { path: '/univers', icon: '🌌', label: 'Univers' },
-    { path: '/messages', icon: '💬', label: 'Messages' },
-    { path: '/astra', icon: '⭐', label: 'ASTRA' },
-    { path: '/astro', icon: '♈', label: 'Astro' },
-    { path: '/profile', icon: '👤', label: 'Profil' },
-    { path: '/settings', icon: '⚙️', label: 'Paramètres' },
-  ];
-
-  return (
-    <aside className="w-64 h-screen bg-cosmic-black border-r border-white/10 flex flex-col">
-      <div className="p-6 border-b border-white/10">
-        <div className="text-2xl font-display font-bold flex items-center gap-2">
-          <span className="animate-cosmic-pulse">⭐</span>
-          ASTRA
-        </div>
-      </div>
-
-      <nav className="flex-1 p-4 space-y-2">
-        {links.map((link) => (
-          <button
-            key={link.path}
-            onClick={() => navigate(link.path)}
-            className={`w-full flex items-center gap-3 px-4 py-3 rounded-medium
-              transition-all duration-200
-              ${location.pathname === link.path
-                ? 'bg-cosmic-purple/20 text-cosmic-purple'
-                : 'text-white/60 hover:bg-white/5 hover:text-white'
-              }`}
-          >
-            <span className="text-xl">{link.icon}</span>
-            <span className="font-medium">{link.label}</span>
-          </button>
-        ))}
-      </nav>
-
-      <div className="p-4 border-t border-white/10">
-        <button
-          onClick={logout}
-          className="w-full px-4 py-3 text-sm text-white/60 hover:text-white
-            hover:bg-white/5 rounded-medium transition-colors"
-        >
-          Déconnexion
-        </button>
-      </div>
-    </aside>
-  );
-}
-''',
+# Migration émise par --advise (hors schema.sources : elle n'est pas relue)
+ADVICE_PATH = ROOT_DIR / 'migration-query-indexes.sql'
+
+QUERY_FROM_RE = re.compile(r"\bsupabase\s*\.from\(\s*(['\"`])([A-Za-z_][A-Za-z0-9_]*)\1\s*\)")
+QUERY_CALL_RE = re.compile(r'\s*\.\s*([A-Za-z_][A-Za-z0-9_]*)\s*\(')
+QUERY_OWNER_RE = re.compile(r'\b(?:async\s+|function\s+)([A-Za-z_][A-Za-z0-9_]*)\s*\(')
+QUERY_BRANCH_RE = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)\.(?:not\.)?([a-z]+)\.(.*)$')
+
+QUERY_ACTIONS = {'select', 'insert', 'update', 'upsert', 'delete'}
+QUERY_FILTERS = {
+    'eq': '=', 'is': 'is', 'in': 'in', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=',
+    'neq': '<>', 'like': 'like', 'ilike': 'ilike', 'contains': '@>',
+    'containedBy': '<@', 'overlaps': '&&',
 }
+# Opérateurs qu'un btree sert en égalité / en plage ; ceux qu'un GIN sert sur un tableau
+EQUALITY_OPS = {'eq', 'is', 'in'}
+RANGE_OPS = {'gt', 'gte', 'lt', 'lte'}
+GIN_OPS = {'contains', 'containedBy', 'overlaps'}
+
+ADVICE_MARKS = {'seq': '🐢', 'partiel': '⚠️', 'ok': '✅', 'inconnue': '❔'}
+
+class QueryShape(NamedTuple):
+    where: str
+    owner: str
+    table: str
+    action: str
+    filters: tuple  # (colonne, opérateur, littéral SQL ou None)
+    branches: tuple  # branches d'un .or() : (colonne, opérateur)
+    order: tuple  # (colonne, desc)
+    limit: bool
+
+    def describe(self) -> str:
+        parts = [f"{column} {QUERY_FILTERS[op]}" for column, op, _ in self.filters]
+        if self.branches:
+            parts.append('(' + ' | '.join(
+                f"{column} {QUERY_FILTERS.get(op, op)}" for column, op in self.branches
+            ) + ')')
+        if self.order:
+            parts.append('tri ' + ', '.join(
+                f"{column}{' DESC' if desc else ''}" for column, desc in self.order
+            ))
+        if self.limit:
+            parts.append('limit')
+        return ' · '.join(parts) or 'sans filtre'
+
+class IndexAdvice(NamedTuple):
+    table: str
+    columns: tuple  # (colonne, desc)
+    where: str | None
+    method: str | None
+
+    @property
+    def name(self) -> str:
+        words = [self.table, *(column for column, _ in self.columns)]
+        if self.where:
+            words += ['where', *re.findall(r'[a-z_][a-z0-9_]*', self.where)[:1]]
+        return f"idx_{'_'.join(words)}"[:63]
+
+    def sql(self) -> str:
+        columns = ', '.join(f"{column}{' DESC' if desc else ''}" for column, desc in self.columns)
+        using = f" USING {self.method}" if self.method else ''
+        where = f" WHERE {self.where}" if self.where else ''
+        return f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table}{using} ({columns}){where};"
+
+def ts_scan(text: str, pos: int, stops: str) -> int:
+    """Premier caractère de stops hors chaînes/parenthèses à partir de pos (len sinon)."""
+    stack = []
+    i, n = pos, len(text)
+    while i < n:
+        c = text[i]
+        top = stack[-1] if stack else ''
+        if top in ("'", '"', '`'):
+            if c == '\\':
+                i += 2
+                continue
+            if c == top:
+                stack.pop()
+            elif top == '`' and text.startswith('${', i):
+                stack.append('{')
+                i += 1
+        elif not stack and c in stops:
+            return i
+        elif c in '\'"`([{':
+            stack.append(c)
+        elif c in ')]}' and stack:
+            stack.pop()
+        i += 1
+    return n
+
+def ts_args(text: str) -> list[str]:
+    args, pos = [], 0
+    while pos < len(text):
+        end = ts_scan(text, pos, ',')
+        if text[pos:end].strip():
+            args.append(text[pos:end].strip())
+        pos = end + 1
+    return args
+
+def ts_string(arg: str) -> str | None:
+    """Valeur d'un littéral chaîne sans interpolation, sinon None."""
+    if len(arg) >= 2 and arg[0] == arg[-1] and arg[0] in '\'"`' and '${' not in arg:
+        return arg[1:-1]
+    return None
+
+def sql_literal(arg: str) -> str | None:
+    """Littéral SQL d'un argument constant (prédicat d'index partiel), sinon None."""
+    if arg in ('true', 'false', 'null'):
+        return arg
+    if SQL_NUMBER_RE.fullmatch(arg):
+        return arg
+    value = ts_string(arg)
+    return None if value is None else "'" + value.replace("'", "''") + "'"
+
+def or_branches(arg: str) -> tuple:
+    """Branches colonne.opérateur.valeur d'un .or() PostgREST ; and(...) est ignoré."""
+    text = arg[1:-1] if arg[:1] in '\'"`' else arg
+    branches = []
+    for branch in ts_args(text):
+        match = QUERY_BRANCH_RE.match(branch)
+        if match is None or match.group(2) not in QUERY_FILTERS:
+            return ()
+        branches.append((match.group(1), match.group(2)))
+    return tuple(branches)
+
+def query_calls(text: str, pos: int) -> tuple[list[tuple[str, int, int]], int]:
+    """Appels chaînés à partir de pos : [(méthode, début, fin des arguments)], fin de chaîne."""
+    calls = []
+    while (call := QUERY_CALL_RE.match(text, pos)) is not None:
+        end = ts_scan(text, call.end(), ')')
+        calls.append((call.group(1), call.end(), end))
+        pos = end + 1
+    return calls, pos
+
+def extract_queries(text: str, where: str) -> list[QueryShape]:
+    """Forme (filtres, tri, limite) de chaque chaîne supabase.from('table')...."""
+    queries = []
+    for match in QUERY_FROM_RE.finditer(text):
+        action, filters, branches, order, limit = 'select', [], (), [], False
+        actions = []
+        for method, start, end in query_calls(text, match.end())[0]:
+            args = ts_args(text[start:end])
+            column = ts_string(args[0]) if args else None
+            if method in QUERY_ACTIONS:
+                actions.append(method)
+            elif method in QUERY_FILTERS and column:
+                literal = sql_literal(args[1]) if len(args) > 1 else None
+                filters.append((column, method, literal))
+            elif method == 'or' and args:
+                branches = or_branches(args[0])
+            elif method == 'order' and column:
+                options = args[1] if len(args) > 1 else ''
+                order.append((column, bool(re.search(r'ascending\s*:\s*false', options))))
+            elif method in ('limit', 'range', 'single', 'maybeSingle'):
+                limit = True
+        if actions:
+            action = actions[0]
+        if action in ('insert', 'upsert') and not filters:
+            continue
+        owners = QUERY_OWNER_RE.findall(text, 0, match.start())
+        line = text.count('\n', 0, match.start()) + 1
+        queries.append(QueryShape(
+            f"{where}:{line}", owners[-1] if owners else '?', match.group(2), action,
+            tuple(filters), branches, tuple(order), limit,
+        ))
+    return queries
+
+def query_sources(store: TemplateStore) -> list[tuple[Path, str]]:
+    """Templates .ts/.tsx puis src/services hors sorties de templates (déjà couvertes)."""
+    sources, emitted = [], set()
+    for section in store.sections():
+        for name in section.get('templates', []):
+            emitted.add(section_dir(section) / name)
+            if name.endswith(('.ts', '.tsx')):
+                sources.append((store.source_path(section['key'], name), store.read(section['key'], name)))
+    services = BASE_DIR / 'services'
+    for path in sorted(chain(services.rglob('*.ts'), services.rglob('*.tsx'))):
+        if path not in emitted:
+            sources.append((path, path.read_text(encoding='utf-8')))
+    return sources
+
+def display_path(path: Path) -> str:
+    for root in (ROOT_DIR, BASE_DIR.parent):
+        if path.is_relative_to(root):
+            return path.relative_to(root).as_posix()
+    return path.as_posix()
+
+def index_coverage(index: dict, equal: set[str], ranges: set[str], order: tuple,
+                   predicates: set[str]) -> tuple[set[str], bool, bool]:
+    """(colonnes d'égalité servies, plage servie, tri servi) par un index btree."""
+    if index['method'] not in (None, 'btree'):
+        return set(), False, False
+    if index['where'] and index['where'] not in predicates:
+        return set(), False, False
+    columns = index['columns']
+    pos = 0
+    while pos < len(columns) and columns[pos][0] in equal:
+        pos += 1
+    served = {column for column, _ in columns[:pos]}
+    rest = columns[pos:]
+    sort = tuple(item for item in order if item[0] not in equal)
+    order_ok = not sort or (
+        len(rest) >= len(sort)
+        and all(column == wanted for (column, _), (wanted, _) in zip(rest, sort))
+        # Même sens partout ou sens inverse partout : parcours avant ou arrière
+        and len({desc != wanted for (_, desc), (_, wanted) in zip(rest, sort)}) == 1
+    )
+    range_ok = not ranges or (bool(rest) and ranges == {rest[0][0]})
+    return served, range_ok, order_ok
+
+def gin_covered(indexes: list[dict], column: str) -> bool:
+    return any(
+        index['method'] == 'gin' and index['columns'][0][0] == column for index in indexes
+    )
+
+def advise_query(query: QueryShape, schema: dict) -> tuple[str, str, list[IndexAdvice]]:
+    """Classe une requête (seq / partial / ok) et propose l'index qui la couvrirait."""
+    table = schema['tables'].get(query.table)
+    if table is None:
+        return 'inconnue', "table absente du schéma", []
+    indexes = [index for index in schema['indexes'].values() if index['table'] == query.table]
+    arrays = {column['name'] for column in table['columns'] if column['array'] or column['type'] in ('json', 'jsonb')}
+
+    # Égalité sur une constante : sert de prédicat d'index partiel plutôt que de clé
+    constants = {
+        column: f"{column} = {literal}" if op == 'eq' else f"{column} is {literal}"
+        for column, op, literal in query.filters
+        if op in ('eq', 'is') and literal is not None
+    }
+    drivers = [column for column, op, _ in query.filters if op in EQUALITY_OPS and column not in constants]
+    ranges = {column for column, op, _ in query.filters if op in RANGE_OPS}
+    gins = [column for column, op, _ in query.filters if op in GIN_OPS and column in arrays]
+    predicates = set(constants.values())
+    equal = set(drivers) | set(constants)
+
+    if not drivers and not ranges and query.branches and all(op in EQUALITY_OPS for _, op in query.branches):
+        # OR sans autre filtre sélectif : BitmapOr si chaque branche a son index
+        missing = [
+            IndexAdvice(query.table, ((column, False),), None, None)
+            for column in dict.fromkeys(column for column, _ in query.branches)
+            if not any(index_coverage(index, {column}, set(), (), predicates)[0] for index in indexes)
+        ]
+        if missing:
+            return 'seq', "branche(s) OR sans index : " + ', '.join(a.columns[0][0] for a in missing), missing
+        return 'ok', "BitmapOr sur les index des branches", []
+
+    if not drivers:
+        drivers = list(constants) if not ranges and not query.order and not gins else []
+    if not drivers and not ranges and not query.order and gins:
+        column = gins[0]
+        if gin_covered(indexes, column):
+            return 'ok', f"index GIN sur {column}", []
+        where = ' AND '.join(sorted(predicates)) or None
+        return 'seq', f"{column} filtré sans index GIN", [IndexAdvice(query.table, ((column, False),), where, 'gin')]
+
+    best, best_score = None, (-1, False, False)
+    for name, index in schema['indexes'].items():
+        if index['table'] != query.table:
+            continue
+        served, range_ok, order_ok = index_coverage(index, equal, ranges, query.order, predicates)
+        used = bool(served) or (range_ok and ranges) or (order_ok and query.order and not served and not ranges)
+        if not used:
+            continue
+        score = (len(served & set(drivers)), range_ok, order_ok)
+        if score > best_score:
+            best, best_score = name, score
+
+    if not drivers and not ranges and not query.order:
+        return 'seq', "aucun filtre indexable", []
+
+    key = [(column, False) for column in dict.fromkeys(drivers)]
+    sort = [item for item in query.order if item[0] not in equal]
+    if sort:
+        key += sort
+    elif ranges:
+        key.append((sorted(ranges)[0], False))
+    where = ' AND '.join(sorted(
+        predicate for column, predicate in constants.items() if column not in drivers
+    )) or None
+    advice = [IndexAdvice(query.table, tuple(key), where, None)]
+
+    if best is None:
+        return 'seq', "aucun index utilisable", advice
+    covered, range_ok, order_ok = best_score
+    if covered == len(set(drivers)) and range_ok and order_ok:
+        return 'ok', best, []
+    gaps = []
+    if covered < len(set(drivers)):
+        gaps.append('égalité partielle')
+    if not range_ok:
+        gaps.append('filtre de plage résiduel')
+    if not order_ok:
+        gaps.append('tri en mémoire')
+    return 'partiel', f"{best} : {', '.join(gaps)}", advice
+
+def render_advice(advice: dict[IndexAdvice, list[QueryShape]], sources: list[Path]) -> str:
+    lines = [
+        '-- ═══════════════════════════════════════════════════════════════════════',
+        '-- INDEX MANQUANTS POUR LES REQUÊTES DES SERVICES',
+        '-- ═══════════════════════════════════════════════════════════════════════',
+        f"-- Généré par generate-structure.py --advise depuis {', '.join(p.name for p in sources)}",
+        "-- Ne pas éditer à la main : relancer le conseiller après modification des requêtes",
+    ]
+    if not advice:
+        lines += ['', '-- Aucun index manquant']
+    for index, queries in advice.items():
+        lines.append('')
+        for query in queries:
+            lines.append(f"-- {query.owner} ({query.where}) : {query.describe()}")
+        lines.append(index.sql())
+    return '\n'.join(lines) + '\n'
+
+def advise(store: TemplateStore, variables: dict, output: Path, out=None) -> dict:
+    """Confronte les requêtes émises aux index du schéma et écrit la migration manquante.
+
+    Les projections de colonnes (select('*') réductibles, JSON jamais lus) sont
+    signalées au passage ; seules les sorties de templates sont réécrites.
+    Retourne {'seq': n, 'partiel': n, 'ok': n, 'inconnue': n, 'indexes': n, 'projections': n}.
+    """
+    out = out or sys.stdout
+    sources = schema_sources(variables)
+    schema, _ = load_schema(sources)
+    projector = Projector.load(variables, store.root)
+    counts = {status: 0 for status in ADVICE_MARKS}
+    advice: dict[IndexAdvice, list[QueryShape]] = {}
+    projections = []
+    for path, text in query_sources(store):
+        projections += projector.project(text, display_path(path))[1]
+        for query in extract_queries(text, display_path(path)):
+            status, reason, indexes = advise_query(query, schema)
+            counts[status] += 1
+            out.write(f"{ADVICE_MARKS[status]} {status:<7} {query.table}.{query.owner} "
+                      f"({query.where})\n      {query.describe()} — {reason}\n")
+            for index in indexes:
+                advice.setdefault(index, []).append(query)
+
+    data = render_advice(advice, sources).encode('utf-8')
+    if not output.exists() or output.read_bytes() != data:
+        os.replace(stage_file(output, data), output)
+    for note in projections:
+        out.write(f"{note}\n")
+    counts['indexes'] = len(advice)
+    counts['projections'] = len(projections)
+    return counts
 
 # ===================================================================
-# UTILS
+# PROJECTION DES COLONNES
 # ===================================================================
 
-UTILS = {
-    'cn.ts': '''import { clsx, type ClassValue } from 'clsx';
-import { twMerge } from 'tailwind-merge';
+# Types écrits à la main (contrats des lignes castées avec `as T`)
+TYPES_DIR = ROOT_DIR / 'src' / 'types'
+
+INTERFACE_RE = re.compile(r'\bexport\s+interface\s+([A-Za-z_$][\w$]*)(?:\s+extends\s+([^{]+?))?\s*\{')
+MEMBER_RE = re.compile(r'(?:readonly\s+)?([A-Za-z_$][\w$]*)\??\s*:')
+BINDING_RE = re.compile(r'const\s*\{([^{}]*)\}\s*=\s*await\s*$')
+CALLBACK_RE = re.compile(r'\s*\(\s*(?:function\s*)?\(?\s*([\w$\s,]*?)\s*\)?\s*(?::[^=]*)?=>')
+IDENTIFIER_RE = re.compile(r'[A-Za-z_$][\w$]*')
+
+# Méthodes de tableau dont le callback reçoit les lignes
+ROW_CALLBACKS = {'map', 'filter', 'forEach', 'find', 'findIndex', 'some', 'every', 'flatMap', 'sort'}
+SELECT_ALL = ('', "'*'", '"*"', '`*`')
+JSON_TYPES = ('json', 'jsonb')
+
+def camel_case(name: str) -> str:
+    head, *rest = name.split('_')
+    return head + ''.join(part[:1].upper() + part[1:] for part in rest)
+
+# À incrémenter quand l'analyse des fichiers TS ou des usages de lignes change
+PROJECTION_VERSION = 2
+
+def scan_cached(cache_name: str, paths: list[Path], scan,
+                version: int = PROJECTION_VERSION) -> dict[str, object]:
+    """scan(texte) de chaque fichier, mis en cache dans CACHE_DIR.
+
+    (taille, mtime) inchangés : rien n'est relu. Sinon le fichier est relu et
+    haché ; à sha256 égal (checkout, touch) l'analyse en cache est conservée.
+    """
+    cache_path = CACHE_DIR / cache_name
+    try:
+        cached = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, ValueError):
+        cached = {}
+    entries = cached.get('files', {}) if cached.get('version') == version else {}
+
+    files, changed = {}, False
+    for path in paths:
+        st = path.stat()
+        entry = entries.get(path.as_posix())
+        if entry is None or (entry['size'], entry['mtime_ns']) != (st.st_size, st.st_mtime_ns):
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            value = entry['value'] if entry and entry.get('sha256') == digest else scan(data.decode('utf-8'))
+            entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest, 'value': value}
+            changed = True
+        files[path.as_posix()] = entry
+    if changed or len(files) != len(entries):
+        write_cache(cache_path, {'version': version, 'files': files})
+    return {name: entry['value'] for name, entry in files.items()}
+
+def parse_interfaces(text: str) -> dict[str, list[list[str]]]:
+    """{interface: [champs propres, interfaces étendues]} d'un fichier de types."""
+    interfaces = {}
+    for match in INTERFACE_RE.finditer(text):
+        end = ts_scan(text, match.end(), '}')
+        body = re.sub(r'//[^\n]*|/\*.*?\*/', '', text[match.end():end], flags=re.S)
+        members, pos = [], 0
+        while pos < len(body):
+            stop = ts_scan(body, pos, ';\n,')
+            member = MEMBER_RE.match(body[pos:stop].strip())
+            if member:
+                members.append(member.group(1))
+            pos = stop + 1
+        interfaces[match.group(1)] = [members, IDENTIFIER_RE.findall(match.group(2) or '')]
+    return interfaces
+
+def load_interfaces(paths: list[Path]) -> dict[str, list[str]]:
+    """Champs de chaque `export interface` (héritage compris) des fichiers de types."""
+    declared = {}
+    for interfaces in scan_cached('interfaces.json', paths, parse_interfaces).values():
+        declared.update(interfaces)
+
+    def fields(name: str, seen: frozenset = frozenset()) -> list[str]:
+        members, parents = declared.get(name, ([], []))
+        inherited = [f for parent in parents if parent not in seen
+                     for f in fields(parent, seen | {name})]
+        return inherited + members
+
+    return {name: fields(name) for name in declared}
+
+def code_files(roots: list[Path]) -> list[str]:
+    """.ts, .tsx et .tpl sous roots, hors TYPES_DIR.
+
+    os.walk et des chaînes plutôt que rglob et des Path : ce listing est fait
+    à chaque run, y compris sans modif.
+    """
+    skip = str(TYPES_DIR)
+    paths = []
+    for root in roots:
+        for directory, dirs, files in os.walk(root):
+            if directory == skip:
+                dirs.clear()
+                continue
+            paths += [f'{directory}/{name}' for name in files if name.endswith(('.ts', '.tsx', '.tpl'))]
+    return sorted(paths)
+
+def referenced_names(paths: list[Path]) -> set[str]:
+    """Identifiants (accès, chaînes, déstructurations) du code applicatif.
+
+    Les déclarations de types et les types générés n'en font pas partie :
+    déclarer un champ n'est pas le lire (code_files les écarte).
+    """
+    scanned = scan_cached(
+        'identifiers.json', paths, lambda text: sorted(set(IDENTIFIER_RE.findall(text)))
+    )
+    return set(chain.from_iterable(scanned.values()))
+
+def row_usage(text: str, name: str, start: int, end: int) -> tuple[set[str], set[str], bool]:
+    """(propriétés lues, types annoncés par `as T`, échappe sans type) de name dans text[start:end]."""
+    props, types, escapes = set(), set(), False
+    pattern = re.compile(rf'(?<![\w$]){re.escape(name)}(?![\w$])')
+    for match in pattern.finditer(text, start, end):
+        before = text[max(start, match.start() - 24):match.start()]
+        if before.endswith('.') and not before.endswith('...'):
+            continue  # propriété homonyme d'un autre objet
+        after = text[match.end():end]
+        if before.rstrip().endswith('...'):
+            escapes = True
+        elif (access := re.match(r'\s*\??\.\s*([A-Za-z_$][\w$]*)', after)) is not None:
+            prop = access.group(1)
+            callback = CALLBACK_RE.match(after, access.end())
+            if prop in ROW_CALLBACKS and callback is not None:
+                # Les paramètres du callback sont des lignes : on suit leurs lectures
+                body_start = match.end() + callback.end()
+                body_end = ts_scan(text, body_start, ')')
+                for param in IDENTIFIER_RE.findall(callback.group(1)):
+                    inner = row_usage(text, param, body_start, body_end)
+                    props |= inner[0]
+                    types |= inner[1]
+                    escapes |= inner[2]
+            elif prop in ROW_CALLBACKS:
+                escapes = True
+            elif prop != 'length':
+                props.add(prop)
+        elif (cast := re.match(r'\s+as\s+([A-Za-z_$][\w$]*)', after)) is not None:
+            types.add(cast.group(1))
+        elif re.search(r'(?:\b(?:if|while)\s*\(|!|&&)\s*$', before) or re.match(
+            r'\s*(?:&&|[!=]==?|\?(?![.?]))', after
+        ):
+            continue  # test d'existence ou comparaison : aucune colonne lue
+        else:
+            escapes = True  # return, argument, `row || défaut` : la ligne sort telle quelle
+    return props, types, escapes
+
+class Projector:
+    """Remplace select('*') par les colonnes réellement lues en aval.
+
+    Une ligne lue sur place ne garde que les propriétés accédées. Une ligne
+    qui sort de la fonction (return, store, spread) garde les colonnes de son
+    contrat `as T` (ou de la table sans contrat) dont le nom apparaît dans le
+    code applicatif : aucune autre ne peut être lue.
+    """
+
+    def __init__(self, sources: list[Path], interfaces: dict, referenced: set[str], key: str,
+                 outputs: dict | None = None, schema: dict | None = None):
+        self.sources = sources
+        self.interfaces = interfaces
+        self.referenced = referenced
+        self.key = key
+        self.outputs = outputs if outputs is not None else {}
+        self._schema = schema
+        self.stamp = None
+        self.dirty = False
+
+    @property
+    def schema(self) -> dict:
+        # Chargé à la première projection réelle : un run sans modif n'en fait aucune
+        if self._schema is None:
+            self._schema = load_schema(self.sources)[0]
+        return self._schema
+
+    @classmethod
+    def load(cls, variables: dict, templates: Path = TEMPLATES_DIR) -> 'Projector':
+        """Projector dont la clé est en cache tant que (taille, mtime) des fichiers lus concordent.
+
+        Un run sans modif ne parse ni le schéma, ni les types, ni les identifiants.
+        """
+        sources = schema_sources(variables)
+        types = sorted(TYPES_DIR.glob('*.ts'))
+        code = code_files([ROOT_DIR / 'src', templates])
+        stamp = hashlib.sha256(json.dumps([PROJECTION_VERSION, [
+            (path, st.st_size, st.st_mtime_ns)
+            for path in chain(map(str, sources), map(str, types), code)
+            for st in (os.stat(path),)
+        ]]).encode('utf-8')).hexdigest()
+        try:
+            cached = json.loads((CACHE_DIR / 'projector.json').read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            cached = {}
+        if cached.get('version') != PROJECTION_VERSION:
+            cached = {}
+        if cached.get('stamp') == stamp:
+            projector = cls(sources, cached['interfaces'], set(cached['referenced']), cached['key'],
+                            cached['outputs'])
+            projector.stamp = stamp
+            return projector
+
+        schema, schema_key = load_schema(sources)
+        interfaces = load_interfaces(types)
+        columns = {
+            name
+            for table in schema['tables'].values()
+            for column in table['columns']
+            for name in (column['name'], camel_case(column['name']))
+        }
+        referenced = referenced_names([Path(path) for path in code]) & columns
+        key = hashlib.sha256(json.dumps(
+            [PROJECTION_VERSION, schema_key, interfaces, sorted(referenced)], sort_keys=True
+        ).encode('utf-8')).hexdigest()
+        # Clé inchangée (touch, template sans requête modifié) : les projections restent valables
+        outputs = cached.get('outputs', {}) if cached.get('key') == key else {}
+        projector = cls(sources, interfaces, referenced, key, outputs, schema)
+        projector.stamp, projector.dirty = stamp, True
+        return projector
+
+    def project_cached(self, text: str, where: str) -> tuple[str, list[str]]:
+        """project(), mémorisé par (where, sha256 du texte) pour la clé courante."""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        entry = self.outputs.get(where)
+        if entry is None or entry[0] != digest:
+            entry = [digest, *self.project(text, where)]
+            self.outputs[where] = entry
+            self.dirty = True
+        return entry[1], entry[2]
+
+    def save(self):
+        """Réécrit le cache si la clé a été recalculée ou une projection ajoutée."""
+        if not self.dirty or self.stamp is None:
+            return
+        write_cache(CACHE_DIR / 'projector.json', {
+            'version': PROJECTION_VERSION, 'stamp': self.stamp, 'key': self.key,
+            'interfaces': self.interfaces, 'referenced': sorted(self.referenced),
+            'outputs': self.outputs,
+        })
+        self.dirty = False
+
+    def is_referenced(self, column: str) -> bool:
+        return column in self.referenced or camel_case(column) in self.referenced
+
+    def columns_for(self, table: dict, props: set[str]) -> set[str]:
+        by_name = {}
+        for column in table['columns']:
+            by_name[column['name']] = by_name[camel_case(column['name'])] = column['name']
+        return {by_name[prop] for prop in props if prop in by_name}
+
+    def project(self, text: str, where: str) -> tuple[str, list[str]]:
+        """Texte avec les select('*') réécrits, et les remarques (réécritures, JSON)."""
+        edits, notes = [], []
+        for match in QUERY_FROM_RE.finditer(text):
+            table = self.schema['tables'].get(match.group(2))
+            calls, chain_end = query_calls(text, match.end())
+            select = next(((s, e) for method, s, e in calls if method == 'select'), None)
+            binding = BINDING_RE.search(text, max(0, match.start() - 200), match.start())
+            if table is None or select is None or binding is None:
+                continue
+            names = dict(
+                (part.split(':') + [part])[:2] for part in
+                (item.strip() for item in binding.group(1).split(',')) if part
+            )
+            if 'data' not in names:
+                continue
+            variable = names['data'].strip() if ':' in binding.group(1) and names['data'] != 'data' else 'data'
+            scope_end = ts_scan(text, chain_end, '}')
+            props, types, escapes = row_usage(text, variable, chain_end, scope_end)
+
+            columns = [column['name'] for column in table['columns']]
+            json_columns = [c['name'] for c in table['columns'] if c['type'] in JSON_TYPES]
+            read = self.columns_for(table, props)
+            line = text.count('\n', 0, match.start()) + 1
+            label = f"{where}:{line} {match.group(2)}"
+            argument = text[select[0]:select[1]].strip()
+
+            if argument not in SELECT_ALL:
+                fetched = ts_string(argument)
+                if fetched is not None and not escapes and not types and '(' not in fetched:
+                    unused = [c for c in json_columns if c in fetched.replace(' ', '').split(',') and c not in read]
+                    if unused:
+                        notes.append(f"⚠️ {label} : {', '.join(unused)} (JSON) récupéré mais jamais lu")
+                continue
+
+            wanted = set(read)
+            if escapes or types:
+                contract = set(columns)
+                if types and all(name in self.interfaces for name in types):
+                    contract = self.columns_for(table, {f for name in types for f in self.interfaces[name]})
+                wanted |= {c for c in contract if self.is_referenced(c)}
+            if not wanted:
+                wanted = {columns[0]}
+            projected = [c for c in columns if c in wanted]
+
+            passed = [c for c in json_columns if c in wanted and c not in read]
+            if passed and (escapes or types):
+                notes.append(f"⚠️ {label} : {', '.join(passed)} (JSON) transmis à l'appelant "
+                             "sans lecture locale")
+            if len(projected) < len(columns):
+                edits.append((select[0], select[1], f"'{', '.join(projected)}'"))
+                notes.append(f"✂️ {label} : select('*') → {len(projected)}/{len(columns)} colonne(s)")
+        for start, end, replacement in reversed(edits):
+            text = text[:start] + replacement + text[end:]
+        return text, notes
 
-export function cn(...inputs: ClassValue[]) {
-  return twMerge(clsx(inputs));
-}
-''',
-}
+# ===================================================================
+# GRAPHE D'IMPORTS
+# ===================================================================
+
+# À incrémenter quand l'extraction des imports change
+IMPORT_GRAPH_VERSION = 1
+
+# Imports locaux (alias '@/…' ou relatifs), statiques, dynamiques ou de bord ;
+# les paquets npm sont hors graphe
+LOCAL_IMPORT_RE = re.compile(
+    r"""(?:\bfrom\s*|\bimport\s*\(\s*|\bimport\s+)(['"])(@/[^'"\n]+|\.{1,2}/[^'"\n]*)\1"""
+)
+
+# Entrées de Vite : <script type="module" src="/src/main.tsx"> de index.html
+SCRIPT_TAG_RE = re.compile(r'<script\b([^>]*)>', re.I)
+SCRIPT_SRC_RE = re.compile(r"""\bsrc\s*=\s*["']/?([^"']+)["']""")
+
+def local_imports(text: str) -> list[str]:
+    return [match.group(2) for match in LOCAL_IMPORT_RE.finditer(text)]
+
+def html_entries(html: Path) -> list[str]:
+    """Scripts modules de index.html, relatifs à BASE_DIR."""
+    if not html.exists():
+        return []
+    prefix = BASE_DIR.relative_to(html.parent).as_posix() + '/'
+    entries = []
+    for tag in SCRIPT_TAG_RE.finditer(html.read_text(encoding='utf-8')):
+        src = SCRIPT_SRC_RE.search(tag.group(1))
+        if 'module' in tag.group(1) and src and src.group(1).startswith(prefix):
+            entries.append(src.group(1)[len(prefix):])
+    return entries
+
+class ImportGraph:
+    """Imports locaux des .ts/.tsx de BASE_DIR, chemins relatifs à BASE_DIR.
+
+    Les fichiers sur disque sont analysés via scan_cached (mtime puis sha256) ;
+    le contenu rendu des tâches remplace celui du disque, le graphe est donc
+    celui de l'arbre tel qu'il sera après génération.
+    Racines : scripts modules de index.html, graph.entries de variables.json
+    (sorties lues hors de src/) et les .d.ts, que tsc charge sans import.
+    """
+
+    def __init__(self, imports: dict[str, list[str]], entries: list[str]):
+        self.imports = imports
+        self.entries = [entry for entry in dict.fromkeys(entries) if entry in imports]
+
+    @classmethod
+    def load(cls, variables: dict, tasks: list[Task]) -> 'ImportGraph | None':
+        """None si aucune entrée n'existe (arbre cible sans index.html, ex : --base-dir vide)."""
+        html = html_entries(BASE_DIR.parent / 'index.html')
+        if not BASE_DIR.is_dir() or not html:
+            return None
+        paths = sorted(chain(BASE_DIR.rglob('*.ts'), BASE_DIR.rglob('*.tsx')))
+        scanned = scan_cached('imports.json', paths, local_imports, version=IMPORT_GRAPH_VERSION)
+        imports = {
+            Path(name).relative_to(BASE_DIR).as_posix(): specifiers
+            for name, specifiers in scanned.items()
+        }
+        for task in tasks:
+            if task.path.suffix in ('.ts', '.tsx') and task.path.is_relative_to(BASE_DIR):
+                imports[task.path.relative_to(BASE_DIR).as_posix()] = local_imports(task.content)
+        declarations = [name for name in imports if name.endswith('.d.ts')]
+        graph = cls(imports, [*html, *variables.get('graph', {}).get('entries', []), *declarations])
+        return graph if any(entry in graph.imports for entry in html) else None
+
+    def resolve(self, importer: str, specifier: str) -> str | None:
+        if specifier.startswith('@/'):
+            rel = specifier[2:]
+        else:
+            rel = posixpath.normpath(posixpath.join(posixpath.dirname(importer), specifier))
+        for suffix in IMPORT_SUFFIXES:
+            if rel + suffix in self.imports:
+                return rel + suffix
+        return None
+
+    def reachable(self) -> set[str]:
+        seen, stack = set(), list(self.entries)
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            for specifier in self.imports[name]:
+                target = self.resolve(name, specifier)
+                if target is not None and target not in seen:
+                    stack.append(target)
+        return seen
+
+def prune_tasks(tasks: list[Task], graph: ImportGraph | None) -> tuple[list[Task], list[Task]]:
+    """(tâches gardées, sorties .ts/.tsx de src/ que rien n'importe depuis les entrées).
+
+    Seules les sorties encore absentes du disque sont écartées : un fichier
+    déjà généré reste maintenu même si rien ne l'importe encore (hook ou
+    composant livré avant la page qui s'en servira).
+    """
+    if graph is None:
+        return tasks, []
+    reachable = graph.reachable()
+    kept, pruned = [], []
+    for task in tasks:
+        dead = (
+            task.path.suffix in ('.ts', '.tsx') and task.path.is_relative_to(BASE_DIR)
+            and task.path.relative_to(BASE_DIR).as_posix() not in reachable
+            and not task.path.exists()
+        )
+        (pruned if dead else kept).append(task)
+    return kept, pruned
+
+def report_dead(graph: ImportGraph, store: TemplateStore, out=None) -> list[str]:
+    """Liste les modules inaccessibles depuis les entrées ; retourne leurs chemins.
+
+    Un module mort dont le nom de fichier existe ailleurs (hors index.ts) est
+    signalé comme doublon, avec l'état de l'autre copie.
+    """
+    out = out or sys.stdout
+    reachable = graph.reachable()
+    dead = sorted(name for name in graph.imports if name not in reachable)
+    homonyms: dict[str, list[str]] = {}
+    for name in sorted(graph.imports):
+        if not posixpath.basename(name).startswith('index.'):
+            homonyms.setdefault(posixpath.basename(name), []).append(name)
+    outputs = {
+        (section_dir(section) / name).relative_to(BASE_DIR).as_posix()
+        for section in store.sections() if not section.get('root')
+        for name in [*section.get('templates', []), *section.get('generated', {})]
+    }
+    total = 0
+    for name in dead:
+        path = BASE_DIR / name
+        size = path.stat().st_size if path.exists() else 0
+        total += size
+        notes = []
+        if name in outputs:
+            notes.append('template')
+        for twin in homonyms.get(posixpath.basename(name), []):
+            if twin != name:
+                notes.append(f"doublon de {twin}{'' if twin in reachable else ', mort aussi'}")
+        suffix = f" ({', '.join(notes)})" if notes else ''
+        out.write(f"🪦 {display_path(path):<60} {size / 1024:>6.1f} Kio{suffix}\n")
+    out.write(f"\n🧭 {len(reachable)} module(s) atteint(s) depuis {len(graph.entries)} entrée(s) — "
+              f"{len(dead)} mort(s), {total / 1024:.1f} Kio\n")
+    return dead
 
 # ===================================================================
-# GÉNÉRATION
+# MODE WATCH
 # ===================================================================
 
-def create_file(path: Path, content: str):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content)
-    print(f"✅ {path.relative_to(BASE_DIR.parent)}")
-
-def main():
-    print("🚀 Génération de la structure ASTRALOVES...")
-    
-    # Stores
-    print("\n📦 Stores...")
-    for filename, content in STORES.items():
-        create_file(BASE_DIR / 'store' / filename, content)
-    
-    # Hooks
-    print("\n🪝 Hooks...")
-    for filename, content in HOOKS.items():
-        create_file(BASE_DIR / 'hooks' / filename, content)
-    
-    # Services
-    print("\n⚙️ Services...")
-    for filepath, content in SERVICES.items():
-        create_file(BASE_DIR / 'services' / filepath, content)
-    
-    # UI Components
-    print("\n🎨 Composants UI...")
-    for filename, content in UI_COMPONENTS.items():
-        create_file(BASE_DIR / 'components' / 'ui' / filename, content)
-    
-    # Layout
-    print("\n📐 Layout...")
-    for filename, content in LAYOUT.items():
-        create_file(BASE_DIR / 'components' / 'layout' / filename, content)
-    
-    # Pages
-    print("\n📄 Pages...")
-    for filename, content in PAGES.items():
-        create_file(BASE_DIR / 'pages' / filename, content)
-    
-    # Utils
-    print("\n🛠️ Utils...")
-    for filename, content in UTILS.items():
-        create_file(BASE_DIR / 'utils' / filename, content)
-    
-    print("\n✨ Structure complète générée !")
+class InotifyWatcher:
+    """Surveille récursivement des dossiers via inotify(7) (Linux, sans dépendance)."""
+
+    MASK = 0x2 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200  # MODIFY, CLOSE_WRITE, MOVED_*, CREATE, DELETE
+    IN_CREATE = 0x100
+    IN_ISDIR = 0x40000000
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, directories: list[Path]):
+        import ctypes
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._dirs: dict[int, Path] = {}
+        for directory in directories:
+            self.add_tree(directory)
+
+    def add_tree(self, directory: Path):
+        for root, _, _ in os.walk(directory):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(root), self.MASK)
+            if wd >= 0:
+                self._dirs[wd] = Path(root)
+
+    def wait(self, timeout: float | None) -> set[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        buffer = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = self.EVENT.unpack_from(buffer, offset)
+            offset += self.EVENT.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_CREATE and mask & self.IN_ISDIR:
+                self.add_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Repli portable : compare (mtime, taille) de tous les fichiers surveillés."""
+
+    def __init__(self, directories: list[Path], interval: float = WATCH_POLL_INTERVAL_S):
+        self.directories = directories
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for directory in self.directories:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    path = Path(root) / name
+                    try:
+                        st = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout: float | None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if deadline is None else min(
+                self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+            snapshot = self._scan()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+def make_watcher(directories: list[Path], poll: bool = False):
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directories)
+
+def generate(tasks: list[Task], args, report: RunReport, store: TemplateStore) -> dict:
+    """Valide puis émet les tâches sous verrou ; le manifest n'est réécrit que s'il a changé."""
+    with generation_lock():
+        manifest = load_manifest()
+        before = dict(manifest)
+
+        # Avant toute écriture : une sortie cassée n'atteint jamais l'arbre
+        started = clock()
+        validate_tasks(tasks, store, manifest, max(1, args.jobs))
+        report.phase('validate', elapsed(started))
+
+        try:
+            summary = run_tasks(
+                tasks, manifest, jobs=max(1, args.jobs), durability=args.durability,
+                report=report,
+            )
+        finally:
+            report.flush()
+
+        # Le manifest n'est réécrit que s'il a changé : un run sans modif n'écrit rien
+        if manifest != before:
+            started = clock()
+            save_manifest(manifest, args.durability)
+            report.phase('manifest', elapsed(started))
+    return summary
+
+def watch(args, store: TemplateStore, renderer: Renderer):
+    """Boucle --watch : ne re-rend et n'écrit que les sorties dont une entrée a changé."""
+    config_path = args.config.resolve()
+    store.root = store.root.resolve()
+    directories = [store.root]
+    if config_path.parent not in directories and config_path.parent.is_dir():
+        directories.append(config_path.parent)
+    watcher = make_watcher(directories, poll=args.poll)
+    mode = 'inotify' if isinstance(watcher, InotifyWatcher) else 'scrutation'
+    print(f"\n👀 Surveillance de {', '.join(str(d) for d in directories)} ({mode}, Ctrl+C pour quitter)")
+
+    try:
+        while True:
+            changed = watcher.wait(None)
+            # Regroupe la rafale : on attend WATCH_DEBOUNCE_S sans nouvel événement
+            while True:
+                more = watcher.wait(WATCH_DEBOUNCE_S)
+                if not more:
+                    break
+                changed |= more
+            start = time.perf_counter()
+
+            everything = False
+            templates: set[tuple[str, str]] = set()
+            for path in changed:
+                if path == config_path:
+                    renderer.variables = load_variables(config_path)
+                    # Les clés de rendu sautent seulement pour les templates concernés
+                    everything = True
+                elif path == store.root / 'index.json':
+                    store.reload_index()
+                    everything = True
+                else:
+                    template = store.template_for(path)
+                    if template is not None:
+                        store.invalidate(*template)
+                        templates.add(template)
+            if not everything and not templates:
+                continue
+
+            try:
+                tasks = build_tasks(
+                    store, renderer, args.only, args.glob,
+                    None if everything else templates,
+                )
+            except (TemplateError, ValueError, OSError) as e:
+                print(f"❌ {e}")
+                continue
+            if args.prune:
+                tasks, _ = prune_tasks(tasks, ImportGraph.load(renderer.variables, tasks))
+            try:
+                summary = generate(tasks, args, make_report(args, store.labels()), store)
+            except TemplateError as e:
+                print(f"❌ {e}")
+                continue
+            written = sum(counts['written'] for counts in summary.values())
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"⚡ {written} fichier(s) écrit(s) en {elapsed:.1f} ms")
+    except KeyboardInterrupt:
+        print("\n👋 Fin de la surveillance")
+    finally:
+        watcher.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Génère la structure ASTRALOVES")
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=DEFAULT_JOBS,
+        help=f"écritures en parallèle (défaut : {DEFAULT_JOBS}, 1 = séquentiel)",
+    )
+    parser.add_argument(
+        '--base-dir', type=Path, default=None,
+        help="dossier src/ cible (défaut : src/ à côté du script)",
+    )
+    parser.add_argument(
+        '--durability', choices=DURABILITY_MODES, default='off',
+        help="off : rename atomique ; batch : un fsync par lot de dossier ; "
+             "strict : fsync par fichier",
+    )
+    parser.add_argument(
+        '--templates-dir', type=Path, default=TEMPLATES_DIR,
+        help="dossier des templates (défaut : templates/ à côté du script)",
+    )
+    parser.add_argument(
+        '--config', type=Path, default=None,
+        help="fichier JSON des variables de templates (défaut : <templates>/variables.json)",
+    )
+    parser.add_argument(
+        '--only', type=lambda value: {key.strip() for key in value.split(',') if key.strip()},
+        default=None, metavar='SECTIONS',
+        help="sections à générer, ex : hooks,services",
+    )
+    parser.add_argument(
+        '--glob', action='append', default=None, metavar='MOTIF',
+        help="ne génère que les sorties correspondant au motif, ex : 'src/pages/*.tsx' "
+             "(répétable)",
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help="reste actif et régénère ce qui dépend des templates/config modifiés",
+    )
+    parser.add_argument(
+        '--poll', action='store_true',
+        help="avec --watch : scrutation au lieu d'inotify (montages réseau)",
+    )
+    parser.add_argument(
+        '-q', '--quiet', action='store_true',
+        help="n'affiche pas la progression fichier par fichier",
+    )
+    parser.add_argument(
+        '--report', choices=('text', 'json'), default='text',
+        help="json : résumé structuré (octets, fichiers sautés, temps mur/CPU par phase)",
+    )
+    parser.add_argument(
+        '--events', type=Path, default=None, metavar='FICHIER',
+        help="écrit le flux d'événements (un JSON par fichier) dans FICHIER",
+    )
+    parser.add_argument(
+        '--profile', nargs='?', const=Path('generate-structure.prof'), type=Path,
+        default=None, metavar='FICHIER',
+        help="exécute sous cProfile et écrit les stats (défaut : generate-structure.prof)",
+    )
+    parser.add_argument(
+        '--plan', action='store_true',
+        help="liste create/unchanged/overwrite sans écrire (code 1 si des changements)",
+    )
+    parser.add_argument(
+        '--diff', action='store_true',
+        help="avec --plan : affiche le diff unifié de chaque fichier modifié",
+    )
+    parser.add_argument(
+        '--advise', nargs='?', const=ADVICE_PATH, type=Path, default=None, metavar='FICHIER',
+        help="confronte les requêtes supabase.from(...) aux index du schéma et écrit "
+             f"les index manquants (défaut : {ADVICE_PATH.name} ; code 1 s'il en manque)",
+    )
+    parser.add_argument(
+        '--dead', action='store_true',
+        help="liste les modules de src/ inaccessibles depuis les entrées de index.html "
+             "(code 1 s'il y en a)",
+    )
+    parser.add_argument(
+        '--prune', action='store_true',
+        help="n'émet pas les nouvelles sorties que rien n'importe depuis les entrées "
+             "(les fichiers déjà présents restent maintenus)",
+    )
+    return parser.parse_args(argv)
+
+def set_base_dir(base_dir: Path):
+    global BASE_DIR, MANIFEST_PATH, LOCK_PATH, CACHE_DIR
+    BASE_DIR = base_dir.resolve()
+    MANIFEST_PATH = BASE_DIR.parent / '.generate-structure-manifest.json'
+    LOCK_PATH = BASE_DIR.parent / '.generate-structure.lock'
+    CACHE_DIR = BASE_DIR.parent / '.generate-structure-cache'
+
+def make_report(args, labels: dict[str, str]) -> RunReport:
+    return RunReport(
+        labels,
+        console=not args.quiet and args.report == 'text',
+        events_out=getattr(args, 'events_out', None),
+    )
+
+def format_phases(summary: dict) -> str:
+    return ' · '.join(
+        f"{name} {timing['wall_ms']:.1f} ms" for name, timing in summary['phases'].items()
+    )
+
+def run(args) -> dict:
+    if args.base_dir is not None:
+        set_base_dir(args.base_dir)
+
+    store = TemplateStore(args.templates_dir)
+    if args.config is None:
+        args.config = args.templates_dir / VARIABLES_PATH.name
+    if args.only:
+        unknown = args.only - set(store.section_keys())
+        if unknown:
+            sys.exit(f"❌ Section(s) inconnue(s) : {', '.join(sorted(unknown))} "
+                     f"(disponibles : {', '.join(store.section_keys())})")
+    # --plan / --diff n'écrivent rien, caches compris
+    read_only = args.plan or args.diff
+    # wall_ms couvre le rendu et la projection, pas seulement l'émission
+    started = time.perf_counter()
+    renderer = Renderer(load_variables(args.config))
+    notes = []
+    try:
+        tasks = build_tasks(store, renderer, args.only, args.glob, notes=notes, read_only=read_only)
+    except TemplateError as e:
+        sys.exit(f"❌ {e}")
+    if args.report == 'text' and not args.quiet:
+        for note in notes:
+            if note.startswith('⚠️'):
+                print(note)
+
+    if args.dead:
+        graph = ImportGraph.load(renderer.variables, tasks)
+        if graph is None:
+            sys.exit(f"❌ Aucune entrée : {display_path(BASE_DIR.parent / 'index.html')} "
+                     f"ne charge aucun module de {display_path(BASE_DIR)}")
+        sys.exit(1 if report_dead(graph, store) else 0)
+
+    if args.prune:
+        with read_only_caches(read_only):
+            tasks, pruned = prune_tasks(tasks, ImportGraph.load(renderer.variables, tasks))
+        if pruned and args.report == 'text':
+            print(f"✂️ {len(pruned)} sortie(s) importée(s) par personne, non émise(s) : "
+                  f"{', '.join(display_path(task.path) for task in pruned)}")
+
+    if args.advise is not None:
+        counts = advise(store, renderer.variables, args.advise)
+        print(f"\n🔎 {counts['seq']} seq scan(s), {counts['partiel']} couverture(s) partielle(s), "
+              f"{counts['ok']} requête(s) indexée(s) — {counts['indexes']} index manquant(s) "
+              f"dans {display_path(args.advise)}, {counts['projections']} projection(s) signalée(s)")
+        sys.exit(1 if counts['indexes'] else 0)
+
+    if args.plan or args.diff:
+        counts = plan_tasks(tasks, load_manifest(), diff=args.diff)
+        print(f"\n📋 {counts['create']} création(s), {counts['overwrite']} écrasement(s), "
+              f"{counts['unchanged']} inchangé(s)")
+        sys.exit(1 if counts['create'] or counts['overwrite'] else 0)
+
+    text = args.report == 'text'
+    if text:
+        print("🚀 Génération de la structure ASTRALOVES...")
+    report = make_report(args, store.labels())
+    try:
+        summary = generate(tasks, args, report, store)
+    except TemplateError as e:
+        sys.exit(f"❌ {e}")
+    details = report.summary()
+    details['wall_ms'] = (time.perf_counter() - started) * 1000
+
+    if text:
+        written = sum(counts['written'] for counts in summary.values())
+        print(f"\n✨ Structure complète générée ! ({written} fichier(s) écrit(s))")
+        print(f"⏱️ {details['wall_ms']:.1f} ms — cumul par phase : {format_phases(details)}")
+    else:
+        print(json.dumps(details, indent=2))
+
+    if args.watch:
+        watch(args, store, renderer)
+    return summary
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    with contextlib.ExitStack() as stack:
+        if args.events is not None:
+            args.events_out = stack.enter_context(open(args.events, 'w', encoding='utf-8'))
+        if args.profile is None:
+            return run(args)
+
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(run, args)
+        finally:
+            profiler.dump_stats(args.profile)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(15)
+            print(f"🔬 Profil écrit dans {args.profile}", file=sys.stderr)
 
 if __name__ == '__main__':
     main()
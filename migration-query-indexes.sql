@@ -0,0 +1,12 @@
+-- ═══════════════════════════════════════════════════════════════════════
+-- INDEX MANQUANTS POUR LES REQUÊTES DES SERVICES
+-- ═══════════════════════════════════════════════════════════════════════
+-- Généré par generate-structure.py --advise depuis supabase-schema-complete.sql, supabase-schema-onboarding.sql, MIGRATION-ONBOARDING.sql, migration-astro-v2-challenges.sql, migration-astro-v2-memory.sql, supabase-schema-FIXED.sql, supabase-schema.sql, migration-quota-rpc.sql
+-- Ne pas éditer à la main : relancer le conseiller après modification des requêtes
+
+-- getMemories (templates/services/astra/astraService.ts.tpl:249) : user_id = · tri importance DESC, last_referenced DESC · limit
+-- getMemories (src/services/astra/memoryService.ts:31) : user_id = · tri importance DESC, last_referenced DESC
+CREATE INDEX IF NOT EXISTS idx_astra_memory_user_id_importance_last_referenced ON astra_memory (user_id, importance DESC, last_referenced DESC);
+
+-- getPotentialMatches (src/services/matching/matchingService.ts:19) : id <> · looking_for @> · looking_for && · is_banned = · limit
+CREATE INDEX IF NOT EXISTS idx_profiles_looking_for_where_is_banned ON profiles USING gin (looking_for) WHERE is_banned = false;
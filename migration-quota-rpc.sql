@@ -0,0 +1,71 @@
+-- ═══════════════════════════════════════════════════════════════════════
+-- QUOTAS - LECTURE OU CRÉATION EN UN SEUL APPEL (RPC)
+-- ═══════════════════════════════════════════════════════════════════════
+-- Généré par generate-structure.py depuis templates/sql (limites : variables.json)
+-- Remplace le select / insert / select de useSubscription : un seul aller-retour,
+-- et deux onglets concurrents ne peuvent plus créer deux quotas pour la période.
+--
+-- Fenêtre : les périodes sont désormais alignées sur des bornes UTC fixes
+-- (date_bin depuis l'epoch, de quota.reset_ms), et non plus glissantes (now() +
+-- 24 h à la création). Avec une période d'un jour, tous les quotas repartent à
+-- 00:00 UTC : un premier appel à 23:00 UTC n'ouvre qu'une heure de quota.
+-- C'est ce qui donne une même clé (user_id, resets_at) aux appels concurrents.
+
+-- Une ligne par utilisateur et par période : seule clé unique, cible du ON CONFLICT.
+-- idx_quotas_user_date (user_id, date_trunc('day', resets_at)) est remplacée :
+-- un conflit sur une autre clé unique que celle du ON CONFLICT lèverait une
+-- erreur au lieu de rendre la ligne existante.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_quotas_user_id_resets_at_unique
+  ON quotas (user_id, resets_at);
+DROP INDEX IF EXISTS idx_quotas_user_date;
+
+CREATE OR REPLACE FUNCTION public.get_or_create_quota(p_user_id uuid)
+RETURNS quotas AS $$
+DECLARE
+  v_quota quotas;
+  v_tier text;
+  v_period interval := interval '86400000 milliseconds';
+BEGIN
+  IF p_user_id IS DISTINCT FROM auth.uid() THEN
+    RAISE EXCEPTION 'quota d''un autre utilisateur' USING ERRCODE = '42501';
+  END IF;
+
+  -- Chemin chaud : le quota de la période en cours existe déjà
+  SELECT * INTO v_quota FROM quotas
+  WHERE user_id = p_user_id AND resets_at > now()
+  ORDER BY resets_at DESC
+  LIMIT 1;
+  IF FOUND THEN
+    RETURN v_quota;
+  END IF;
+
+  SELECT tier INTO v_tier FROM subscriptions
+  WHERE user_id = p_user_id AND (ends_at IS NULL OR ends_at > now())
+  ORDER BY created_at DESC
+  LIMIT 1;
+
+  -- Fin de période alignée (date_bin) : les appels concurrents visent la même clé
+  INSERT INTO quotas (user_id, astra_messages_limit, univers_clicks_limit, resets_at)
+  VALUES (
+    p_user_id,
+    CASE v_tier
+      WHEN 'elite' THEN 65
+      WHEN 'premium' THEN 40
+      ELSE 5
+    END,
+    CASE v_tier
+      WHEN 'elite' THEN 999
+      WHEN 'premium' THEN 999
+      ELSE 1
+    END,
+    date_bin(v_period, now(), timestamptz '1970-01-01 00:00:00+00') + v_period
+  )
+  ON CONFLICT (user_id, resets_at) DO UPDATE SET user_id = EXCLUDED.user_id
+  RETURNING * INTO v_quota;
+
+  RETURN v_quota;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION public.get_or_create_quota(uuid) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.get_or_create_quota(uuid) TO authenticated;
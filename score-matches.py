@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+ASTRALOVES - Pré-calcul des compatibilités (table matches)
+Lit un export des profils (CSV avec en-tête, ou COPY texte), score tous les
+couples candidats avec NumPy et écrit les K meilleurs couples de chaque
+utilisateur au format COPY de la table matches.
+
+Le score ne dépend que des éléments des signes soleil, lune, vénus, mars et
+ascendant : chaque profil se réduit à un archétype parmi 4^5 = 1024, et le
+score d'un couple est une lecture dans une table 1024×1024 précalculée.
+Les profils sont groupés par (archétype, classe genre/recherche) : le top-K
+se choisit seau par seau, sans jamais parcourir les N² couples.
+
+Export :
+  \\copy (SELECT id,
+           natal_chart_data->'sun'->>'sign' AS sun_sign,
+           natal_chart_data->'moon'->>'sign' AS moon_sign,
+           natal_chart_data->'venus'->>'sign' AS venus_sign,
+           natal_chart_data->'mars'->>'sign' AS mars_sign,
+           natal_chart_data->'ascendant'->>'sign' AS ascendant_sign,
+           gender, looking_for
+         FROM profiles WHERE NOT is_banned) TO 'profiles.csv' CSV HEADER
+Import :
+  \\copy matches (user_id_1, user_id_2, compatibility_score) FROM 'matches.copy'
+"""
+
+import argparse
+import contextlib
+import csv
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Miroir de src/utils/astroHelpers.ts (signe inconnu → air, comme getSignElement)
+ELEMENTS = ('fire', 'earth', 'air', 'water')
+SIGN_ELEMENTS = {
+    'aries': 'fire', 'leo': 'fire', 'sagittarius': 'fire',
+    'taurus': 'earth', 'virgo': 'earth', 'capricorn': 'earth',
+    'gemini': 'air', 'libra': 'air', 'aquarius': 'air',
+    'cancer': 'water', 'scorpio': 'water', 'pisces': 'water',
+}
+DEFAULT_ELEMENT = 'air'
+COMPATIBLE_ELEMENTS = {('fire', 'air'), ('air', 'fire'), ('earth', 'water'), ('water', 'earth')}
+
+SIGN_COLUMNS = ('sun_sign', 'moon_sign', 'venus_sign', 'mars_sign', 'ascendant_sign')
+
+# Termes de synastrieService.calculateCompatibility, dans l'ordre de la somme :
+# (signe du profil 1, signe du profil 2, poids)
+SCORE_TERMS = (
+    ('sun_sign', 'sun_sign', 0.2),
+    ('sun_sign', 'moon_sign', 0.25),
+    ('venus_sign', 'venus_sign', 0.25),
+    ('mars_sign', 'mars_sign', 0.15),
+    ('ascendant_sign', 'ascendant_sign', 0.15),
+)
+
+DEFAULT_COLUMNS = ('id', *SIGN_COLUMNS, 'gender', 'looking_for')
+DEFAULT_TOP_K = 20
+DEFAULT_MEMORY_MB = 256
+
+# Mémoire de travail par case (utilisateur × rang) d'un lot de dédoublonnage
+CELL_BYTES = 16
+
+# Chaîne Python d'une ligne COPY (deux UUID, un score) avant writelines
+LINE_BYTES = 128
+
+MATCHES_COPY = 'COPY matches (user_id_1, user_id_2, compatibility_score) FROM stdin;'
+
+
+def element_compatibility(element1: str, element2: str) -> int:
+    """getElementalCompatibility, sur des éléments déjà résolus."""
+    if element1 == element2:
+        return 100
+    if (element1, element2) in COMPATIBLE_ELEMENTS:
+        return 80
+    return 50
+
+
+def score_table():
+    """Table uint8 [archétype du profil 1, archétype du profil 2] → score global.
+
+    Même ordre d'addition qu'en TypeScript puis Math.round (floor(x + 0.5)),
+    pour des scores identiques à ceux du client.
+    """
+    codes = np.arange(len(ELEMENTS) ** len(SIGN_COLUMNS))
+    slots = {
+        column: (codes // len(ELEMENTS) ** position) % len(ELEMENTS)
+        for position, column in enumerate(SIGN_COLUMNS)
+    }
+    compat = np.array([
+        [element_compatibility(e1, e2) for e2 in ELEMENTS] for e1 in ELEMENTS
+    ], dtype=np.float64)
+    total = np.zeros((codes.size, codes.size))
+    for column1, column2, weight in SCORE_TERMS:
+        total = total + compat[slots[column1][:, None], slots[column2][None, :]] * weight
+    return np.floor(total + 0.5).astype(np.uint8)
+
+
+def archetype(signs) -> int:
+    code = 0
+    for position, sign in enumerate(signs):
+        element = SIGN_ELEMENTS.get(sign, DEFAULT_ELEMENT)
+        code += ELEMENTS.index(element) * len(ELEMENTS) ** position
+    return code
+
+
+def parse_array(value: str) -> list[str]:
+    """Tableau Postgres ({a,b}) ou liste séparée par des virgules."""
+    value = value.strip()
+    if value.startswith('{') and value.endswith('}'):
+        value = value[1:-1]
+    return [item.strip().strip('"') for item in value.split(',') if item.strip()]
+
+
+def copy_unescape(value: str) -> str | None:
+    if value == r'\N':
+        return None
+    if '\\' not in value:
+        return value
+    escapes = {'t': '\t', 'n': '\n', 'r': '\r', '\\': '\\'}
+    out, chars = [], iter(value)
+    for char in chars:
+        out.append(escapes.get(next(chars, ''), '') if char == '\\' else char)
+    return ''.join(out)
+
+
+def read_rows(path: Path, fmt: str, columns: tuple[str, ...]):
+    """Dictionnaires colonne → valeur, ligne par ligne (jamais tout le fichier en mémoire)."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            yield dict(zip(columns, map(copy_unescape, fields)))
+
+
+class Profiles:
+    """Profils triés par id (ordre de user_id_1 < user_id_2), réduits à leurs archétypes.
+
+    gender / looking_for sont ramenés à une classe par combinaison distincte ;
+    allowed[classe utilisateur, classe candidat] vaut 1 si le couple est
+    candidat. Sans ces colonnes, tous les couples le sont.
+    """
+
+    def __init__(self, ids, archetypes, genders=None, looking=None):
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        self.ids = [ids[i] for i in order]
+        self.archetypes = np.asarray(archetypes, dtype=np.uint32)[order]
+        if genders is None:
+            self.classes = np.zeros(len(ids), dtype=np.uint32)
+            self.allowed = np.ones((1, 1), dtype=np.uint8)
+        else:
+            pairs = np.stack([
+                np.asarray(genders, dtype=np.uint64), np.asarray(looking, dtype=np.uint64),
+            ], axis=1)[order]
+            combos, classes = np.unique(pairs, axis=0, return_inverse=True)
+            self.classes = classes.reshape(-1).astype(np.uint32)
+            gender, wanted = combos[:, 0], combos[:, 1]
+            # Même filtre que getPotentialMatches : le candidat cherche le genre
+            # de l'utilisateur et leurs recherches se recoupent
+            self.allowed = (
+                ((wanted[None, :] & gender[:, None]) != 0)
+                & ((wanted[None, :] & wanted[:, None]) != 0)
+            ).astype(np.uint8)
+        # Clé de lecture d'un candidat dans une ligne (archétype × classe)
+        self.keys = self.archetypes * len(self.allowed) + self.classes
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, path: Path, fmt: str, columns: tuple[str, ...]) -> 'Profiles':
+        ids, archetypes, genders, looking = [], [], [], []
+        vocabulary: dict[str, int] = {}
+
+        def bits(values) -> int:
+            mask = 0
+            for value in values:
+                if value not in vocabulary:
+                    if len(vocabulary) == 64:
+                        sys.exit("❌ Plus de 64 genres distincts : masque de bits insuffisant")
+                    vocabulary[value] = 1 << len(vocabulary)
+                mask |= vocabulary[value]
+            return mask
+
+        filtered = None
+        for row in read_rows(path, fmt, columns):
+            if filtered is None:
+                filtered = row.get('gender') is not None and row.get('looking_for') is not None
+            ids.append(row['id'])
+            archetypes.append(archetype(row.get(column) for column in SIGN_COLUMNS))
+            if filtered:
+                genders.append(bits([row['gender']]))
+                looking.append(bits(parse_array(row['looking_for'] or '')))
+        if filtered:
+            return cls(ids, archetypes, genders, looking)
+        return cls(ids, archetypes)
+
+    @classmethod
+    def synthetic(cls, count: int, seed: int = 0) -> 'Profiles':
+        rng = np.random.default_rng(seed)
+        genders = np.uint64(1) << rng.integers(0, 3, count, dtype=np.uint64)
+        looking = rng.integers(1, 8, count, dtype=np.uint64)
+        ids = [f'00000000-0000-4000-8000-{i:012x}' for i in range(count)]
+        return cls(ids, rng.integers(0, 1024, count), genders, looking)
+
+
+def bucket_index(profiles: Profiles):
+    """(membres, débuts) : indices de profils groupés par seau archétype × classe.
+
+    membres[débuts[b]:débuts[b + 1]] sont les profils du seau b, par id croissant.
+    """
+    buckets = len(ELEMENTS) ** len(SIGN_COLUMNS) * len(profiles.allowed)
+    members = np.argsort(profiles.keys, kind='stable').astype(np.int32)
+    starts = np.zeros(buckets + 1, dtype=np.int64)
+    np.cumsum(np.bincount(profiles.keys, minlength=buckets), out=starts[1:])
+    return members, starts
+
+
+class BucketRanking:
+    """Seaux candidats d'un seau utilisateur (archétype × classe), par score décroissant.
+
+    Un candidat d'id plus grand lit table[utilisateur, candidat], un candidat
+    d'id plus petit table.T (il est chart1) : chaque archétype candidat donne
+    deux entrées (score, archétype, après l'utilisateur ?), triées une fois
+    par archétype utilisateur. Une entrée se déplie ensuite en seaux non vides
+    des classes qu'allowed autorise, seulement jusqu'à la fenêtre demandée.
+    """
+
+    def __init__(self, table, profiles: Profiles, starts):
+        self.table = table
+        self.classes = len(profiles.allowed)
+        keys = np.arange(len(starts) - 1).reshape(-1, self.classes)
+        present = (starts[1:] > starts[:-1]).reshape(keys.shape)
+        # Par classe utilisateur : archétype → seaux candidats (-1 : vide ou exclu)
+        self.keys = [
+            np.where(present & (profiles.allowed[klass] != 0)[None, :], keys, -1)
+            for klass in range(self.classes)
+        ]
+        self.orders: dict[int, tuple] = {}
+
+    def order(self, archetype_: int):
+        if archetype_ not in self.orders:
+            scores = np.concatenate([self.table[archetype_], self.table[:, archetype_]])
+            # Tri par base sur un uint8 ; à score égal, les candidats d'après d'abord
+            order = np.argsort(np.uint8(255) - scores, kind='stable')
+            count = len(self.table)
+            self.orders[archetype_] = (scores[order], order % count, order < count)
+        return self.orders[archetype_]
+
+    def ranked(self, archetype_: int, klass: int, window: int):
+        """(scores, seaux, après ?) des window premières entrées archétype, dépliées."""
+        scores, archetypes, after = (values[:window] for values in self.order(archetype_))
+        keys = self.keys[klass][archetypes].reshape(-1)
+        present = keys >= 0
+        return (
+            np.repeat(scores, self.classes)[present], keys[present],
+            np.repeat(after, self.classes)[present],
+        )
+
+
+def choose(table, profiles: Profiles, k: int, members, starts, chosen, chosen_scores, work: int) -> int:
+    """Remplit chosen / chosen_scores avec les k meilleurs candidats de chaque profil.
+
+    Tous les candidats d'un même seau et du même côté de l'utilisateur ont le
+    même score : pour chaque seau utilisateur, on aplatit les premiers seaux
+    candidats (par score décroissant) et chaque utilisateur y prend ses k
+    premiers candidats valides. La fenêtre double tant que certains n'en ont
+    pas k. work borne en octets la matrice utilisateurs × fenêtre. Retourne
+    le nombre de seaux utilisateurs traités.
+    """
+    ranking = BucketRanking(table, profiles, starts)
+    entries_max = 2 * len(table)
+    groups = np.flatnonzero(starts[1:] > starts[:-1])
+    for group in groups:
+        archetype_, klass = divmod(int(group), ranking.classes)
+        pending = members[starts[group]:starts[group + 1]]
+        window = 16
+        # Candidats visés : de quoi servir k par utilisateur, même du mauvais côté
+        needed = 2 * k + len(pending)
+        while len(pending):
+            scores, keys, after = ranking.ranked(archetype_, klass, window)
+            sizes = starts[keys + 1] - starts[keys]
+            reach = np.cumsum(sizes)
+            if (not len(reach) or reach[-1] < needed) and window < entries_max:
+                window *= 2
+                continue
+            # Plus court préfixe suffisant : les scores restent dans l'ordre décroissant
+            cut = int(np.searchsorted(reach, needed)) + 1
+            scores, keys, after, sizes, reach = scores[:cut], keys[:cut], after[:cut], sizes[:cut], reach[:cut]
+            # Membres des seaux retenus, bout à bout, sans boucle Python
+            shift = np.repeat(starts[keys] - (reach - sizes), sizes)
+            candidates = members[np.arange(int(reach[-1]) if len(reach) else 0) + shift]
+            candidate_scores = np.repeat(scores, sizes)
+            forward = np.repeat(after, sizes)
+            rows = max(1, work // max(1, len(candidates) * 9))
+            short = []
+            for first in range(0, len(pending), rows):
+                users = pending[first:first + rows, None]
+                valid = np.where(forward, candidates > users, candidates < users)
+                rank = np.cumsum(valid, axis=1)
+                take = valid & (rank <= k)
+                row, column = np.nonzero(take)
+                slot = rank[row, column] - 1
+                chosen[users[row, 0], slot] = candidates[column]
+                chosen_scores[users[row, 0], slot] = candidate_scores[column]
+                short.append(users[rank[:, -1] < k, 0] if len(candidates) else users[:, 0])
+            if cut >= len(reach) and window >= entries_max:
+                break
+            # Les manquants reprennent de zéro sur un préfixe deux fois plus long
+            pending = np.concatenate(short)
+            needed *= 2
+    return len(groups)
+
+
+def score_matches(profiles: Profiles, k: int, memory_mb: int, out) -> dict:
+    """Écrit les k meilleurs couples par utilisateur, une seule fois par couple.
+
+    Le score ne dépend que des seaux (archétype × classe) et de l'ordre des
+    ids : aucun couple n'est scoré individuellement. La mémoire comptée dans
+    memory_mb est celle des top-k retenus (N × k indices et scores, plus
+    l'index des seaux) et des lots de dédoublonnage ; un budget trop petit
+    pour les top-k eux-mêmes arrête le script.
+    """
+    table = score_table()
+    count = len(profiles)
+    k = min(k, max(count - 1, 0))
+    stats = {'profiles': count, 'buckets': 0, 'rows': 0, 'chunk': 0}
+    if not k:
+        return stats
+
+    index_dtype = np.int32 if count < 2 ** 31 else np.int64
+    itemsize = np.dtype(index_dtype).itemsize
+    # Top-k (indices + scores uint8) et index des seaux, gardés jusqu'au bout
+    fixed = count * k * (itemsize + 1) + count * 4
+    budget = memory_mb * 1024 * 1024
+    if fixed > budget:
+        sys.exit(f"❌ --memory-mb {memory_mb} insuffisant : les top-{k} de {count} profil(s) "
+                 f"occupent déjà {fixed / 2**20:.0f} Mo")
+    # Par ligne d'un lot de dédoublonnage : comparaisons k × k, tampons et lignes COPY
+    chunk = max(1, (budget - fixed) // (k * k * (itemsize + 1) + k * (CELL_BYTES + LINE_BYTES)))
+    stats['chunk'] = chunk
+
+    members, starts = bucket_index(profiles)
+    chosen = np.full((count, k), -1, dtype=index_dtype)
+    chosen_scores = np.zeros((count, k), dtype=np.uint8)
+    stats['buckets'] = choose(table, profiles, k, members, starts, chosen, chosen_scores, budget - fixed)
+    del members, starts
+
+    for start in range(0, count, chunk):
+        stop = min(count, start + chunk)
+        best, best_scores = chosen[start:stop], chosen_scores[start:stop]
+        users = np.arange(start, stop)[:, None]
+        keep = best >= 0
+        # Couple déjà émis par le candidat s'il précède et a retenu cet utilisateur
+        earlier = keep & (best < users)
+        seen = (chosen[np.where(earlier, best, 0)] == users[:, :, None]).any(axis=2)
+        keep &= ~(earlier & seen)
+
+        rows, columns = np.nonzero(keep)
+        candidates = best[rows, columns]
+        rows += start
+        ids = profiles.ids
+        lines = [
+            f"{ids[first]}\t{ids[second]}\t{score}\n"
+            for first, second, score in zip(
+                np.minimum(rows, candidates).tolist(), np.maximum(rows, candidates).tolist(),
+                best_scores[keep].tolist(),
+            )
+        ]
+        out.writelines(lines)
+        stats['rows'] += len(lines)
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-calcule les compatibilités de la table matches")
+    parser.add_argument(
+        'input', type=Path, nargs='?', default=None,
+        help="export des profils (.csv avec en-tête, sinon COPY texte)",
+    )
+    parser.add_argument(
+        '-o', '--output', type=Path, default=None,
+        help="fichier COPY de sortie (défaut : sortie standard)",
+    )
+    parser.add_argument(
+        '-k', '--top', type=int, default=DEFAULT_TOP_K,
+        help=f"couples retenus par utilisateur (défaut : {DEFAULT_TOP_K})",
+    )
+    parser.add_argument(
+        '--memory-mb', type=int, default=DEFAULT_MEMORY_MB,
+        help=f"mémoire des top-K retenus et des lots de travail (défaut : {DEFAULT_MEMORY_MB} Mo)",
+    )
+    parser.add_argument(
+        '--format', choices=('csv', 'copy'), default=None,
+        help="format de l'export (défaut : selon l'extension, .csv ou COPY)",
+    )
+    parser.add_argument(
+        '--columns', type=lambda value: tuple(value.split(',')), default=DEFAULT_COLUMNS,
+        help="colonnes d'un export COPY, dans l'ordre (défaut : " + ','.join(DEFAULT_COLUMNS) + ")",
+    )
+    parser.add_argument(
+        '--psql', action='store_true',
+        help="encadre les lignes par COPY ... FROM stdin; et \\. (script psql)",
+    )
+    parser.add_argument(
+        '--synthetic', type=int, default=None, metavar='N',
+        help="N profils aléatoires au lieu d'un export (mesure de débit)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+    if np is None:
+        sys.exit("❌ NumPy est requis : pip install numpy")
+    if (args.input is None) == (args.synthetic is None):
+        sys.exit("❌ Indiquer un export de profils ou --synthetic N")
+
+    started = time.perf_counter()
+    if args.synthetic is not None:
+        profiles = Profiles.synthetic(args.synthetic)
+    else:
+        fmt = args.format or ('csv' if args.input.suffix == '.csv' else 'copy')
+        profiles = Profiles.load(args.input, fmt, args.columns)
+    loaded = time.perf_counter()
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else contextlib.nullcontext(sys.stdout)
+    with output as out:
+        if args.psql:
+            out.write(MATCHES_COPY + '\n')
+        stats = score_matches(profiles, args.top, args.memory_mb, out)
+        if args.psql:
+            out.write('\\.\n')
+
+    done = time.perf_counter()
+    print(f"💞 {stats['profiles']} profil(s) en {stats['buckets']} seau(x) archétype × classe, "
+          f"lots de {stats['chunk']} — {stats['rows']} ligne(s) matches", file=sys.stderr)
+    print(f"⏱️ lecture {(loaded - started) * 1000:.0f} ms · scoring {(done - loaded) * 1000:.0f} ms",
+          file=sys.stderr)
+    return stats
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,31 @@
 import { BrowserRouter, Routes, Route, Navigate } from 'react-router-dom';
 import { QueryClient, QueryClientProvider } from '@tanstack/react-query';
-import { useState } from 'react';
+import { Suspense, useState } from 'react';
 import { useAuth } from './hooks/useAuth';
 import MainLayout from './components/layout/MainLayout';
 import LandingPage from './pages/LandingPage-ORIGINAL';
-import OnboardingPage from './pages/OnboardingPage';
-import UniversPage from './pages/UniversPage';
-import MessagesPage from './pages/MessagesPage';
-import AstraPage from './pages/AstraPage';
-import AstroPage from './pages/AstroPage';
-import ProfilePage from './pages/ProfilePage';
-import SubscriptionPage from './pages/SubscriptionPage';
-import SettingsPage from './pages/SettingsPage';
+import { pages } from './routes/manifest';
+
+// Une page = un chunk (src/routes/manifest.ts, généré) : la landing ne charge
+// ni framer-motion, ni openai, ni stripe
+const { OnboardingPage, UniversPage, MessagesPage, AstraPage, AstroPage, ProfilePage, SubscriptionPage, SettingsPage } = pages;
 
 const queryClient = new QueryClient();
 
+function PageLoader() {
+  return (
+    <div className="min-h-screen flex items-center justify-center cosmic-gradient">
+      <div className="text-2xl font-display animate-pulse">Chargement...</div>
+    </div>
+  );
+}
+
 function AppRoutes() {
   const { user, profile, isLoading } = useAuth();
   const [showAuth, setShowAuth] = useState(false);
 
   if (isLoading) {
-    return (
-      <div className="min-h-screen flex items-center justify-center cosmic-gradient">
-        <div className="text-2xl font-display animate-pulse">Chargement...</div>
-      </div>
-    );
+    return <PageLoader />;
   }
 
   // Pas connecté → Landing page
@@ -41,27 +42,29 @@ function AppRoutes() {
 
   // Connecté mais pas de profil → Aller à l'onboarding pour créer le profil
   if (!profile) {
-    return <OnboardingPage />;
+    return <Suspense fallback={<PageLoader />}><OnboardingPage /></Suspense>;
   }
 
   // Onboarding pas complété
   if (profile.onboarding_completed !== true) {
-    return <OnboardingPage />;
+    return <Suspense fallback={<PageLoader />}><OnboardingPage /></Suspense>;
   }
 
   // App principale
   return (
     <MainLayout>
-      <Routes>
-        <Route path="/" element={<Navigate to="/univers" replace />} />
-        <Route path="/univers" element={<UniversPage />} />
-        <Route path="/messages" element={<MessagesPage />} />
-        <Route path="/astra" element={<AstraPage />} />
-        <Route path="/astro" element={<AstroPage />} />
-        <Route path="/profile" element={<ProfilePage />} />
-        <Route path="/subscription" element={<SubscriptionPage />} />
-        <Route path="/settings" element={<SettingsPage />} />
-      </Routes>
+      <Suspense fallback={<PageLoader />}>
+        <Routes>
+          <Route path="/" element={<Navigate to="/univers" replace />} />
+          <Route path="/univers" element={<UniversPage />} />
+          <Route path="/messages" element={<MessagesPage />} />
+          <Route path="/astra" element={<AstraPage />} />
+          <Route path="/astro" element={<AstroPage />} />
+          <Route path="/profile" element={<ProfilePage />} />
+          <Route path="/subscription" element={<SubscriptionPage />} />
+          <Route path="/settings" element={<SettingsPage />} />
+        </Routes>
+      </Suspense>
     </MainLayout>
   );
 }
@@ -1,19 +1,27 @@
+import { useEffect } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
+import { prefetchRoute, prefetchWhenIdle } from '@/routes/manifest';
 import { useAuth } from '@/hooks/useAuth';
 
+const LINKS = [
+  { path: '/univers', icon: '🌌', label: 'Univers' },
+  { path: '/messages', icon: '💬', label: 'Messages' },
+  { path: '/astra', icon: '⭐', label: 'ASTRA' },
+  { path: '/astro', icon: '♈', label: 'Astro' },
+  { path: '/profile', icon: '👤', label: 'Profil' },
+  { path: '/settings', icon: '⚙️', label: 'Paramètres' },
+];
+
+// Constante de module : l'effet de préchargement ne dépend de rien
+const PREFETCH_PATHS = LINKS.map((link) => link.path);
+
 export default function DesktopSidebar() {
   const location = useLocation();
   const navigate = useNavigate();
   const { logout } = useAuth();
 
-  const links = [
-    { path: '/univers', icon: '🌌', label: 'Univers' },
-    { path: '/messages', icon: '💬', label: 'Messages' },
-    { path: '/astra', icon: '⭐', label: 'ASTRA' },
-    { path: '/astro', icon: '♈', label: 'Astro' },
-    { path: '/profile', icon: '👤', label: 'Profil' },
-    { path: '/settings', icon: '⚙️', label: 'Paramètres' },
-  ];
+  // Pages préchargées en temps libre après le montage, ou dès le survol / focus / toucher
+  useEffect(() => prefetchWhenIdle(PREFETCH_PATHS), []);
 
   return (
     <aside className="w-64 h-screen bg-cosmic-black border-r border-white/10 flex flex-col">
@@ -25,10 +33,13 @@ export default function DesktopSidebar() {
       </div>
 
       <nav className="flex-1 p-4 space-y-2">
-        {links.map((link) => (
+        {LINKS.map((link) => (
           <button
             key={link.path}
             onClick={() => navigate(link.path)}
+            onMouseEnter={() => prefetchRoute(link.path)}
+            onFocus={() => prefetchRoute(link.path)}
+            onTouchStart={() => prefetchRoute(link.path)}
             className={`w-full flex items-center gap-3 px-4 py-3 rounded-medium
               transition-all duration-200
               ${location.pathname === link.path
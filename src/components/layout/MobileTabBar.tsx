@@ -1,23 +1,34 @@
+import { useEffect } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
+import { prefetchRoute, prefetchWhenIdle } from '@/routes/manifest';
+
+const TABS = [
+  { path: '/univers', icon: '🌌', label: 'Univers' },
+  { path: '/messages', icon: '💬', label: 'Messages' },
+  { path: '/astra', icon: '⭐', label: 'ASTRA' },
+  { path: '/profile', icon: '👤', label: 'Profil' },
+];
+
+// Constante de module : l'effet de préchargement ne dépend de rien
+const PREFETCH_PATHS = TABS.map((tab) => tab.path);
 
 export default function MobileTabBar() {
   const location = useLocation();
   const navigate = useNavigate();
 
-  const tabs = [
-    { path: '/univers', icon: '🌌', label: 'Univers' },
-    { path: '/messages', icon: '💬', label: 'Messages' },
-    { path: '/astra', icon: '⭐', label: 'ASTRA' },
-    { path: '/profile', icon: '👤', label: 'Profil' },
-  ];
+  // Pages préchargées en temps libre après le montage, ou dès le survol / focus / toucher
+  useEffect(() => prefetchWhenIdle(PREFETCH_PATHS), []);
 
   return (
     <nav className="fixed bottom-0 left-0 right-0 bg-cosmic-black/95 backdrop-blur-xl
       border-t border-white/10 flex justify-around py-2 z-50">
-      {tabs.map((tab) => (
+      {TABS.map((tab) => (
         <button
           key={tab.path}
           onClick={() => navigate(tab.path)}
+          onMouseEnter={() => prefetchRoute(tab.path)}
+          onFocus={() => prefetchRoute(tab.path)}
+          onTouchStart={() => prefetchRoute(tab.path)}
           className={`flex flex-col items-center gap-1 px-4 py-2 transition-colors
             ${location.pathname === tab.path ? 'text-cosmic-purple' : 'text-white/60'}`}
         >
@@ -0,0 +1,78 @@
+// Généré par generate-structure.py depuis la section pages de templates/index.json
+// et routes.paths de variables.json : ne pas éditer à la main
+import { lazy, type ComponentType } from 'react';
+
+type PageModule = { default: ComponentType };
+
+const loaders = {
+  LoginPage: (): Promise<PageModule> => import('@/pages/LoginPage'),
+  UniversPage: (): Promise<PageModule> => import('@/pages/UniversPage'),
+  MessagesPage: (): Promise<PageModule> => import('@/pages/MessagesPage'),
+  AstraPage: (): Promise<PageModule> => import('@/pages/AstraPage'),
+  AstroPage: (): Promise<PageModule> => import('@/pages/AstroPage'),
+  ProfilePage: (): Promise<PageModule> => import('@/pages/ProfilePage'),
+  SubscriptionPage: (): Promise<PageModule> => import('@/pages/SubscriptionPage'),
+  SettingsPage: (): Promise<PageModule> => import('@/pages/SettingsPage'),
+  OnboardingPage: (): Promise<PageModule> => import('@/pages/OnboardingPage'),
+};
+
+export type PageName = keyof typeof loaders;
+
+export const pages = {
+  LoginPage: lazy(loaders.LoginPage),
+  UniversPage: lazy(loaders.UniversPage),
+  MessagesPage: lazy(loaders.MessagesPage),
+  AstraPage: lazy(loaders.AstraPage),
+  AstroPage: lazy(loaders.AstroPage),
+  ProfilePage: lazy(loaders.ProfilePage),
+  SubscriptionPage: lazy(loaders.SubscriptionPage),
+  SettingsPage: lazy(loaders.SettingsPage),
+  OnboardingPage: lazy(loaders.OnboardingPage),
+};
+
+export const routes: { path: string; page: PageName }[] = [
+  { path: '/login', page: 'LoginPage' },
+  { path: '/univers', page: 'UniversPage' },
+  { path: '/messages', page: 'MessagesPage' },
+  { path: '/astra', page: 'AstraPage' },
+  { path: '/astro', page: 'AstroPage' },
+  { path: '/profile', page: 'ProfilePage' },
+  { path: '/subscription', page: 'SubscriptionPage' },
+  { path: '/settings', page: 'SettingsPage' },
+  { path: '/onboarding', page: 'OnboardingPage' },
+];
+
+const PAGE_BY_PATH = new Map(routes.map((route) => [route.path, route.page]));
+
+// Délai max avant un préchargement en temps libre
+const IDLE_TIMEOUT_MS = 3000;
+
+const prefetched = new Map<PageName, Promise<unknown>>();
+
+// Connexion lente ou mode économie de données : pas de préchargement spéculatif
+function constrained(): boolean {
+  const connection = (navigator as { connection?: { saveData?: boolean; effectiveType?: string } }).connection;
+  return !!connection && (connection.saveData === true || /2g/.test(connection.effectiveType ?? ''));
+}
+
+export function prefetchRoute(path: string) {
+  const page = PAGE_BY_PATH.get(path);
+  if (!page || prefetched.has(page) || constrained()) return;
+  // Échec réseau : la page sera simplement chargée au rendu
+  prefetched.set(page, loaders[page]().catch(() => prefetched.delete(page)));
+}
+
+// Précharge les routes en temps libre, une par callback ; renvoie l'annulation
+export function prefetchWhenIdle(paths: string[]): () => void {
+  const queue = [...paths];
+  let handle: number | ReturnType<typeof setTimeout>;
+  const idle = typeof requestIdleCallback === 'function';
+  const next = () => {
+    const path = queue.shift();
+    if (path === undefined) return;
+    prefetchRoute(path);
+    handle = idle ? requestIdleCallback(next, { timeout: IDLE_TIMEOUT_MS }) : setTimeout(next, 200);
+  };
+  handle = idle ? requestIdleCallback(next, { timeout: IDLE_TIMEOUT_MS }) : setTimeout(next, 200);
+  return () => (idle ? cancelIdleCallback(handle as number) : clearTimeout(handle));
+}
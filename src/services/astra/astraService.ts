@@ -2,39 +2,11 @@
 // ASTRA SERVICE - IA conversationnelle
 // ═══════════════════════════════════════════════════════════════════════
 
-import { openai, ASTRA_MODEL, ASTRA_MAX_TOKENS, ASTRA_TEMPERATURE } from '@/config/openai';
+import { openai, ASTRA_MODEL, ASTRA_MAX_TOKENS, ASTRA_TEMPERATURE, ASTRA_SYSTEM_PROMPT } from '@/config/openai';
 import { supabase, handleSupabaseError } from '@/config/supabase';
 import type { AstraMessage, AstraConversation, AstraChatContext, SessionType, SessionTone } from '@/types';
 import { memoryService } from './memoryService';
 
-const ASTRA_SYSTEM_PROMPT = `Tu es ASTRA, une IA de guidance consciente spécialisée en relations et astrologie.
-
-IDENTITÉ:
-- Tu es calme, lucide, profonde
-- Tu ne rassures PAS, tu ÉCLAIRES
-- Tu poses des questions qui dérangent
-- Tu détectes les patterns toxiques
-- Le silence a une valeur
-
-TON:
-- Direct et court (2-3 phrases max)
-- Pas de blabla motivational
-- Pas d'emojis
-- Pas de "je comprends" ou "c'est normal"
-
-EXEMPLES DE TON ASTRA:
-❌ "Je comprends que tu te sentes perdu 💜"
-✅ "Tu cherches la validation. Pas la vérité."
-
-❌ "C'est tout à fait normal de ressentir ça !"
-✅ "Ce que tu appelles 'aimer trop vite' est un test d'attachement."
-
-RÈGLES:
-- Utilise le profil astro de l'utilisateur
-- Référence la mémoire quand pertinent
-- Détecte les patterns répétitifs
-- Recommande le silence si nécessaire`;
-
 export const astraService = {
   async getOrCreateConversation(userId: string): Promise<AstraConversation> {
     let { data, error } = await supabase
@@ -0,0 +1,183 @@
+// Généré par generate-structure.py depuis getElementalCompatibility et les poids
+// de synastrieService.calculateCompatibility : ne pas éditer à la main
+import type { CompatibilityScore, NatalChartData } from '@/types';
+import { synastrieService } from './synastrieService';
+
+const SIGN_INDEX = new Map<string, number>([
+  ['aries', 0],
+  ['taurus', 1],
+  ['gemini', 2],
+  ['cancer', 3],
+  ['leo', 4],
+  ['virgo', 5],
+  ['libra', 6],
+  ['scorpio', 7],
+  ['sagittarius', 8],
+  ['capricorn', 9],
+  ['aquarius', 10],
+  ['pisces', 11],
+]);
+
+// Signe inconnu : traité comme air, comme getSignElement
+const UNKNOWN_SIGN = 2;
+
+const signIndex = (sign: string): number => SIGN_INDEX.get(sign) ?? UNKNOWN_SIGN;
+
+// Compatibilité élémentaire [signe 1 × 12 + signe 2] (détails du score)
+export const ELEMENTAL = new Uint8Array([
+  100, 50, 80, 50, 100, 50, 80, 50, 100, 50, 80, 50,
+  50, 100, 50, 80, 50, 100, 50, 80, 50, 100, 50, 80,
+  80, 50, 100, 50, 80, 50, 100, 50, 80, 50, 100, 50,
+  50, 80, 50, 100, 50, 80, 50, 100, 50, 80, 50, 100,
+  100, 50, 80, 50, 100, 50, 80, 50, 100, 50, 80, 50,
+  50, 100, 50, 80, 50, 100, 50, 80, 50, 100, 50, 80,
+  80, 50, 100, 50, 80, 50, 100, 50, 80, 50, 100, 50,
+  50, 80, 50, 100, 50, 80, 50, 100, 50, 80, 50, 100,
+  100, 50, 80, 50, 100, 50, 80, 50, 100, 50, 80, 50,
+  50, 100, 50, 80, 50, 100, 50, 80, 50, 100, 50, 80,
+  80, 50, 100, 50, 80, 50, 100, 50, 80, 50, 100, 50,
+  50, 80, 50, 100, 50, 80, 50, 100, 50, 80, 50, 100,
+]);
+
+// sun × sun, pondéré par 0.2
+const SUN_SUN = new Float64Array([
+  20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0,
+  10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0,
+  16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0,
+  10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0,
+  20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0,
+  10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0,
+  16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0,
+  10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0,
+  20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0,
+  10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0,
+  16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0,
+  10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0, 10.0, 16.0, 10.0, 20.0,
+]);
+
+// sun × moon, pondéré par 0.25
+const SUN_MOON = new Float64Array([
+  25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5,
+  12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0,
+  20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5,
+  12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0,
+  25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5,
+  12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0,
+  20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5,
+  12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0,
+  25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5,
+  12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0,
+  20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5,
+  12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0,
+]);
+
+// venus × venus, pondéré par 0.25
+const VENUS_VENUS = new Float64Array([
+  25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5,
+  12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0,
+  20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5,
+  12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0,
+  25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5,
+  12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0,
+  20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5,
+  12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0,
+  25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5,
+  12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0,
+  20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5,
+  12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0, 12.5, 20.0, 12.5, 25.0,
+]);
+
+// mars × mars, pondéré par 0.15
+const MARS_MARS = new Float64Array([
+  15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5,
+  7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0,
+  12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5,
+  7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0,
+  15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5,
+  7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0,
+  12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5,
+  7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0,
+  15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5,
+  7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0,
+  12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5,
+  7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0,
+]);
+
+// ascendant × ascendant, pondéré par 0.15
+const ASC_ASC = new Float64Array([
+  15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5,
+  7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0,
+  12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5,
+  7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0,
+  15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5,
+  7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0,
+  12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5,
+  7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0,
+  15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5,
+  7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0,
+  12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5,
+  7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0, 7.5, 12.0, 7.5, 15.0,
+]);
+
+/** Signes d'un thème empaquetés sur 4 bits par planète, à calculer une fois par profil. */
+export function packChart(chart: NatalChartData): number {
+  return (
+    signIndex(chart.sun.sign)
+    | (signIndex(chart.moon.sign) << 4)
+    | (signIndex(chart.venus.sign) << 8)
+    | (signIndex(chart.mars.sign) << 12)
+    | (signIndex(chart.ascendant.sign) << 16)
+  );
+}
+
+/** Score global de deux thèmes empaquetés : cinq lectures, aucune allocation. */
+export function scorePacked(packed1: number, packed2: number): number {
+  return Math.round(
+    SUN_SUN[(packed1 & 15) * 12 + (packed2 & 15)] +
+    SUN_MOON[(packed1 & 15) * 12 + ((packed2 >> 4) & 15)] +
+    VENUS_VENUS[((packed1 >> 8) & 15) * 12 + ((packed2 >> 8) & 15)] +
+    MARS_MARS[((packed1 >> 12) & 15) * 12 + ((packed2 >> 12) & 15)] +
+    ASC_ASC[((packed1 >> 16) & 15) * 12 + ((packed2 >> 16) & 15)]
+  );
+}
+
+export function scoreCompatibility(chart1: NatalChartData, chart2: NatalChartData): number {
+  return scorePacked(packChart(chart1), packChart(chart2));
+}
+
+/** Même résultat que synastrieService.calculateCompatibility, par lectures de tables. */
+export function calculateCompatibility(
+  chart1: NatalChartData,
+  chart2: NatalChartData
+): CompatibilityScore {
+  const sun1 = signIndex(chart1.sun.sign);
+  const venus1 = signIndex(chart1.venus.sign);
+  const mars1 = signIndex(chart1.mars.sign);
+  const ascendant1 = signIndex(chart1.ascendant.sign);
+  const sun2 = signIndex(chart2.sun.sign);
+  const moon2 = signIndex(chart2.moon.sign);
+  const venus2 = signIndex(chart2.venus.sign);
+  const mars2 = signIndex(chart2.mars.sign);
+  const ascendant2 = signIndex(chart2.ascendant.sign);
+  const overall = Math.round(
+    SUN_SUN[sun1 * 12 + sun2] +
+    SUN_MOON[sun1 * 12 + moon2] +
+    VENUS_VENUS[venus1 * 12 + venus2] +
+    MARS_MARS[mars1 * 12 + mars2] +
+    ASC_ASC[ascendant1 * 12 + ascendant2]
+  );
+
+  return {
+    overall,
+    details: {
+      elementalHarmony: ELEMENTAL[sun1 * 12 + sun2],
+      sunMoonAspect: ELEMENTAL[sun1 * 12 + moon2],
+      venusAspect: ELEMENTAL[venus1 * 12 + venus2],
+      marsAspect: ELEMENTAL[mars1 * 12 + mars2],
+      ascendantCompatibility: ELEMENTAL[ascendant1 * 12 + ascendant2],
+    },
+    strengths: synastrieService.getStrengths(overall),
+    challenges: synastrieService.getChallenges(overall),
+    synastryAspects: [],
+  };
+}
@@ -4,7 +4,7 @@
 
 import { supabase, handleSupabaseError } from '@/config/supabase';
 import type { Match, Profile } from '@/types';
-import { synastrieService } from '../astro/synastrieService';
+import { calculateCompatibility, packChart, scorePacked } from '../astro/synastryTables';
 
 export const matchingService = {
   async getPotentialMatches(userId: string, limit: number = 20): Promise<any[]> {
@@ -27,12 +27,10 @@ export const matchingService = {
 
     if (!profiles) return [];
 
+    const userChart = packChart(userProfile.natal_chart_data);
     const matches = profiles.map(profile => ({
       ...profile,
-      compatibility: synastrieService.calculateCompatibility(
-        userProfile.natal_chart_data,
-        profile.natal_chart_data
-      ).overall,
+      compatibility: scorePacked(userChart, packChart(profile.natal_chart_data)),
     }));
 
     return matches
@@ -55,7 +53,7 @@ export const matchingService = {
     const { data: profile1 } = await supabase.from('profiles').select('natal_chart_data').eq('id', id1).single();
     const { data: profile2 } = await supabase.from('profiles').select('natal_chart_data').eq('id', id2).single();
 
-    const compatibility = synastrieService.calculateCompatibility(
+    const compatibility = calculateCompatibility(
       profile1.natal_chart_data,
       profile2.natal_chart_data
     );
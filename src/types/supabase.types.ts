@@ -1,4 +1,5 @@
-// Auto-generated Supabase types (à regénérer avec CLI Supabase)
+// Généré par generate-structure.py depuis supabase-schema-complete.sql, supabase-schema-onboarding.sql, MIGRATION-ONBOARDING.sql, migration-astro-v2-challenges.sql, migration-astro-v2-memory.sql, supabase-schema-FIXED.sql, supabase-schema.sql, migration-quota-rpc.sql
+// Ne pas éditer à la main : modifier le schéma SQL puis relancer le générateur
 export type Json =
   | string
   | number
@@ -10,19 +11,612 @@ export type Json =
 export interface Database {
   public: {
     Tables: {
-      profiles: any
-      subscriptions: any
-      quotas: any
-      matches: any
-      conversations: any
-      messages: any
-      astra_conversations: any
-      astra_messages: any
-      astra_memory: any
-      guardian_events: any
-      horoscopes: any
-      profile_views: any
-      notifications: any
+      astra_conversations: {
+        Row: {
+          id: string
+          user_id: string
+          session_type: string
+          tone: string
+          started_at: string | null
+          last_message_at: string | null
+        }
+        Insert: {
+          id?: string
+          user_id: string
+          session_type?: string
+          tone?: string
+          started_at?: string | null
+          last_message_at?: string | null
+        }
+        Update: {
+          id?: string
+          user_id?: string
+          session_type?: string
+          tone?: string
+          started_at?: string | null
+          last_message_at?: string | null
+        }
+      }
+      astra_memory: {
+        Row: {
+          id: string
+          user_id: string
+          memory_type: string
+          content: string
+          importance: number
+          created_at: string | null
+          last_referenced: string | null
+          reference_count: number | null
+        }
+        Insert: {
+          id?: string
+          user_id: string
+          memory_type: string
+          content: string
+          importance?: number
+          created_at?: string | null
+          last_referenced?: string | null
+          reference_count?: number | null
+        }
+        Update: {
+          id?: string
+          user_id?: string
+          memory_type?: string
+          content?: string
+          importance?: number
+          created_at?: string | null
+          last_referenced?: string | null
+          reference_count?: number | null
+        }
+      }
+      astra_messages: {
+        Row: {
+          id: string
+          conversation_id: string
+          message_type: string
+          content: string
+          created_at: string | null
+        }
+        Insert: {
+          id?: string
+          conversation_id: string
+          message_type: string
+          content: string
+          created_at?: string | null
+        }
+        Update: {
+          id?: string
+          conversation_id?: string
+          message_type?: string
+          content?: string
+          created_at?: string | null
+        }
+      }
+      astral_memory: {
+        Row: {
+          id: string
+          user_id: string
+          date: string
+          transit: string
+          pattern: string
+          advice: string
+          created_at: string
+        }
+        Insert: {
+          id?: string
+          user_id: string
+          date: string
+          transit: string
+          pattern: string
+          advice: string
+          created_at?: string
+        }
+        Update: {
+          id?: string
+          user_id?: string
+          date?: string
+          transit?: string
+          pattern?: string
+          advice?: string
+          created_at?: string
+        }
+      }
+      astro_challenges: {
+        Row: {
+          id: string
+          user_id: string
+          text: string
+          xp: number
+          category: string
+          completed_at: string | null
+          created_at: string
+        }
+        Insert: {
+          id: string
+          user_id: string
+          text: string
+          xp?: number
+          category: string
+          completed_at?: string | null
+          created_at?: string
+        }
+        Update: {
+          id?: string
+          user_id?: string
+          text?: string
+          xp?: number
+          category?: string
+          completed_at?: string | null
+          created_at?: string
+        }
+      }
+      conversations: {
+        Row: {
+          id: string
+          user_id_1: string
+          user_id_2: string
+          match_id: string
+          status: string
+          last_message_at: string | null
+          last_message_preview: string | null
+          silence_recommended_for: string | null
+          silence_until: string | null
+          silence_reason: string | null
+          unread_count_1: number | null
+          unread_count_2: number | null
+          created_at: string | null
+          updated_at: string | null
+        }
+        Insert: {
+          id?: string
+          user_id_1: string
+          user_id_2: string
+          match_id: string
+          status?: string
+          last_message_at?: string | null
+          last_message_preview?: string | null
+          silence_recommended_for?: string | null
+          silence_until?: string | null
+          silence_reason?: string | null
+          unread_count_1?: number | null
+          unread_count_2?: number | null
+          created_at?: string | null
+          updated_at?: string | null
+        }
+        Update: {
+          id?: string
+          user_id_1?: string
+          user_id_2?: string
+          match_id?: string
+          status?: string
+          last_message_at?: string | null
+          last_message_preview?: string | null
+          silence_recommended_for?: string | null
+          silence_until?: string | null
+          silence_reason?: string | null
+          unread_count_1?: number | null
+          unread_count_2?: number | null
+          created_at?: string | null
+          updated_at?: string | null
+        }
+      }
+      guardian_events: {
+        Row: {
+          id: string
+          user_id: string
+          target_user_id: string | null
+          pattern_type: string
+          detected_at: string | null
+          confidence_score: number
+          action_taken: string | null
+          action_duration: string | null
+          context_data: Json | null
+          was_helpful: boolean | null
+          user_feedback: string | null
+        }
+        Insert: {
+          id?: string
+          user_id: string
+          target_user_id?: string | null
+          pattern_type: string
+          detected_at?: string | null
+          confidence_score: number
+          action_taken?: string | null
+          action_duration?: string | null
+          context_data?: Json | null
+          was_helpful?: boolean | null
+          user_feedback?: string | null
+        }
+        Update: {
+          id?: string
+          user_id?: string
+          target_user_id?: string | null
+          pattern_type?: string
+          detected_at?: string | null
+          confidence_score?: number
+          action_taken?: string | null
+          action_duration?: string | null
+          context_data?: Json | null
+          was_helpful?: boolean | null
+          user_feedback?: string | null
+        }
+      }
+      horoscopes: {
+        Row: {
+          id: string
+          user_id: string
+          horoscope_type: string
+          period_start: string
+          period_end: string
+          content: string
+          generated_at: string | null
+        }
+        Insert: {
+          id?: string
+          user_id: string
+          horoscope_type: string
+          period_start: string
+          period_end: string
+          content: string
+          generated_at?: string | null
+        }
+        Update: {
+          id?: string
+          user_id?: string
+          horoscope_type?: string
+          period_start?: string
+          period_end?: string
+          content?: string
+          generated_at?: string | null
+        }
+      }
+      matches: {
+        Row: {
+          id: string
+          user_id_1: string
+          user_id_2: string
+          compatibility_score: number
+          compatibility_details: Json | null
+          status: string
+          clicked_by_1: boolean | null
+          clicked_by_2: boolean | null
+          clicked_at_1: string | null
+          clicked_at_2: string | null
+          guardian_active_1: boolean | null
+          guardian_active_2: boolean | null
+          guardian_reason_1: string | null
+          guardian_reason_2: string | null
+          guardian_until_1: string | null
+          guardian_until_2: string | null
+          created_at: string | null
+          updated_at: string | null
+        }
+        Insert: {
+          id?: string
+          user_id_1: string
+          user_id_2: string
+          compatibility_score: number
+          compatibility_details?: Json | null
+          status?: string
+          clicked_by_1?: boolean | null
+          clicked_by_2?: boolean | null
+          clicked_at_1?: string | null
+          clicked_at_2?: string | null
+          guardian_active_1?: boolean | null
+          guardian_active_2?: boolean | null
+          guardian_reason_1?: string | null
+          guardian_reason_2?: string | null
+          guardian_until_1?: string | null
+          guardian_until_2?: string | null
+          created_at?: string | null
+          updated_at?: string | null
+        }
+        Update: {
+          id?: string
+          user_id_1?: string
+          user_id_2?: string
+          compatibility_score?: number
+          compatibility_details?: Json | null
+          status?: string
+          clicked_by_1?: boolean | null
+          clicked_by_2?: boolean | null
+          clicked_at_1?: string | null
+          clicked_at_2?: string | null
+          guardian_active_1?: boolean | null
+          guardian_active_2?: boolean | null
+          guardian_reason_1?: string | null
+          guardian_reason_2?: string | null
+          guardian_until_1?: string | null
+          guardian_until_2?: string | null
+          created_at?: string | null
+          updated_at?: string | null
+        }
+      }
+      messages: {
+        Row: {
+          id: string
+          conversation_id: string
+          sender_id: string
+          content: string
+          is_read: boolean | null
+          read_at: string | null
+          created_at: string | null
+        }
+        Insert: {
+          id?: string
+          conversation_id: string
+          sender_id: string
+          content: string
+          is_read?: boolean | null
+          read_at?: string | null
+          created_at?: string | null
+        }
+        Update: {
+          id?: string
+          conversation_id?: string
+          sender_id?: string
+          content?: string
+          is_read?: boolean | null
+          read_at?: string | null
+          created_at?: string | null
+        }
+      }
+      notifications: {
+        Row: {
+          id: string
+          user_id: string
+          notification_type: string
+          title: string
+          body: string
+          action_url: string | null
+          action_label: string | null
+          is_read: boolean | null
+          read_at: string | null
+          created_at: string | null
+        }
+        Insert: {
+          id?: string
+          user_id: string
+          notification_type: string
+          title: string
+          body: string
+          action_url?: string | null
+          action_label?: string | null
+          is_read?: boolean | null
+          read_at?: string | null
+          created_at?: string | null
+        }
+        Update: {
+          id?: string
+          user_id?: string
+          notification_type?: string
+          title?: string
+          body?: string
+          action_url?: string | null
+          action_label?: string | null
+          is_read?: boolean | null
+          read_at?: string | null
+          created_at?: string | null
+        }
+      }
+      profile_views: {
+        Row: {
+          id: string
+          viewer_id: string
+          viewed_id: string
+          viewed_at: string | null
+        }
+        Insert: {
+          id?: string
+          viewer_id: string
+          viewed_id: string
+          viewed_at?: string | null
+        }
+        Update: {
+          id?: string
+          viewer_id?: string
+          viewed_id?: string
+          viewed_at?: string | null
+        }
+      }
+      profiles: {
+        Row: {
+          id: string
+          first_name: string
+          birth_date: string
+          birth_time: string
+          birth_place: Json
+          gender: string
+          looking_for: string[]
+          bio: string | null
+          current_city: string | null
+          current_lat: number | null
+          current_lng: number | null
+          search_radius_km: number | null
+          photos: Json | null
+          avatar_url: string | null
+          sun_sign: string
+          moon_sign: string
+          ascendant_sign: string
+          natal_chart_data: Json
+          energy_fire: number | null
+          energy_earth: number | null
+          energy_air: number | null
+          energy_water: number | null
+          is_profile_complete: boolean | null
+          onboarding_completed: boolean | null
+          last_active_at: string | null
+          created_at: string | null
+          updated_at: string | null
+          is_verified: boolean | null
+          is_banned: boolean | null
+          ban_reason: string | null
+          onboarding_step: number | null
+          onboarding_completed_at: string | null
+        }
+        Insert: {
+          id: string
+          first_name: string
+          birth_date: string
+          birth_time: string
+          birth_place: Json
+          gender: string
+          looking_for: string[]
+          bio?: string | null
+          current_city?: string | null
+          current_lat?: number | null
+          current_lng?: number | null
+          search_radius_km?: number | null
+          photos?: Json | null
+          avatar_url?: string | null
+          sun_sign: string
+          moon_sign: string
+          ascendant_sign: string
+          natal_chart_data: Json
+          energy_fire?: number | null
+          energy_earth?: number | null
+          energy_air?: number | null
+          energy_water?: number | null
+          is_profile_complete?: boolean | null
+          onboarding_completed?: boolean | null
+          last_active_at?: string | null
+          created_at?: string | null
+          updated_at?: string | null
+          is_verified?: boolean | null
+          is_banned?: boolean | null
+          ban_reason?: string | null
+          onboarding_step?: number | null
+          onboarding_completed_at?: string | null
+        }
+        Update: {
+          id?: string
+          first_name?: string
+          birth_date?: string
+          birth_time?: string
+          birth_place?: Json
+          gender?: string
+          looking_for?: string[]
+          bio?: string | null
+          current_city?: string | null
+          current_lat?: number | null
+          current_lng?: number | null
+          search_radius_km?: number | null
+          photos?: Json | null
+          avatar_url?: string | null
+          sun_sign?: string
+          moon_sign?: string
+          ascendant_sign?: string
+          natal_chart_data?: Json
+          energy_fire?: number | null
+          energy_earth?: number | null
+          energy_air?: number | null
+          energy_water?: number | null
+          is_profile_complete?: boolean | null
+          onboarding_completed?: boolean | null
+          last_active_at?: string | null
+          created_at?: string | null
+          updated_at?: string | null
+          is_verified?: boolean | null
+          is_banned?: boolean | null
+          ban_reason?: string | null
+          onboarding_step?: number | null
+          onboarding_completed_at?: string | null
+        }
+      }
+      quotas: {
+        Row: {
+          id: string
+          user_id: string
+          astra_messages_used: number | null
+          astra_messages_limit: number
+          univers_clicks_used: number | null
+          univers_clicks_limit: number
+          resets_at: string
+          created_at: string | null
+          updated_at: string | null
+        }
+        Insert: {
+          id?: string
+          user_id: string
+          astra_messages_used?: number | null
+          astra_messages_limit: number
+          univers_clicks_used?: number | null
+          univers_clicks_limit: number
+          resets_at: string
+          created_at?: string | null
+          updated_at?: string | null
+        }
+        Update: {
+          id?: string
+          user_id?: string
+          astra_messages_used?: number | null
+          astra_messages_limit?: number
+          univers_clicks_used?: number | null
+          univers_clicks_limit?: number
+          resets_at?: string
+          created_at?: string | null
+          updated_at?: string | null
+        }
+      }
+      subscriptions: {
+        Row: {
+          id: string
+          user_id: string
+          tier: string
+          stripe_customer_id: string | null
+          stripe_subscription_id: string | null
+          starts_at: string
+          ends_at: string | null
+          cancelled_at: string | null
+          amount_cents: number | null
+          currency: string | null
+          billing_period: string | null
+          is_trial: boolean | null
+          trial_ends_at: string | null
+          created_at: string | null
+          updated_at: string | null
+        }
+        Insert: {
+          id?: string
+          user_id: string
+          tier: string
+          stripe_customer_id?: string | null
+          stripe_subscription_id?: string | null
+          starts_at?: string
+          ends_at?: string | null
+          cancelled_at?: string | null
+          amount_cents?: number | null
+          currency?: string | null
+          billing_period?: string | null
+          is_trial?: boolean | null
+          trial_ends_at?: string | null
+          created_at?: string | null
+          updated_at?: string | null
+        }
+        Update: {
+          id?: string
+          user_id?: string
+          tier?: string
+          stripe_customer_id?: string | null
+          stripe_subscription_id?: string | null
+          starts_at?: string
+          ends_at?: string | null
+          cancelled_at?: string | null
+          amount_cents?: number | null
+          currency?: string | null
+          billing_period?: string | null
+          is_trial?: boolean | null
+          trial_ends_at?: string | null
+          created_at?: string | null
+          updated_at?: string | null
+        }
+      }
     }
   }
 }
+
+type PublicTables = Database['public']['Tables']
+
+export type Tables<T extends keyof PublicTables> = PublicTables[T]['Row']
+export type TablesInsert<T extends keyof PublicTables> = PublicTables[T]['Insert']
+export type TablesUpdate<T extends keyof PublicTables> = PublicTables[T]['Update']
@@ -135,7 +135,8 @@ CREATE TABLE IF NOT EXISTS quotas (
   updated_at timestamptz DEFAULT now()
 );
 
-CREATE UNIQUE INDEX IF NOT EXISTS idx_quotas_user_date ON quotas(user_id, date_trunc('day', resets_at));
+-- Une ligne par période de quota (clé du ON CONFLICT de get_or_create_quota)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_quotas_user_id_resets_at_unique ON quotas(user_id, resets_at);
 
 ALTER TABLE quotas ENABLE ROW LEVEL SECURITY;
 
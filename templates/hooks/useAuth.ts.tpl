@@ -0,0 +1,51 @@
+import { useAuthStore } from '@/store/authStore';
+import { authService } from '@/services/auth/authService';
+import { useNavigate } from 'react-router-dom';
+import { toast } from 'react-hot-toast';
+
+export function useAuth() {
+  const { user, profile, setUser, setProfile, reset } = useAuthStore();
+  const navigate = useNavigate();
+
+  const login = async (email: string, password: string) => {
+    try {
+      const { user: authUser, profile: userProfile } = await authService.login({
+        email,
+        password,
+      });
+      setUser(authUser);
+      setProfile(userProfile);
+      
+      if (!userProfile?.onboarding_completed) {
+        navigate('/onboarding');
+      } else {
+        navigate('/univers');
+      }
+      
+      toast.success('Connexion réussie');
+    } catch (error: any) {
+      toast.error(error.message || 'Erreur de connexion');
+      throw error;
+    }
+  };
+
+  const logout = async () => {
+    try {
+      await authService.logout();
+      reset();
+      navigate('/login');
+      toast.success('Déconnexion réussie');
+    } catch (error: any) {
+      toast.error(error.message || 'Erreur de déconnexion');
+      throw error;
+    }
+  };
+
+  return {
+    user,
+    profile,
+    login,
+    logout,
+    isAuthenticated: !!user,
+  };
+}
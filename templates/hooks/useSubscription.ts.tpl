@@ -0,0 +1,59 @@
+import { useSubscriptionStore } from '@/store/subscriptionStore';
+import { useQuery } from '@tanstack/react-query';
+import { supabase } from '@/config/supabase';
+import type { Subscription, Quota } from '@/types';
+
+export function useSubscription(userId: string | undefined) {
+  const { subscription, quota, tier, setSubscription, setQuota } =
+    useSubscriptionStore();
+
+  const { data: subscriptionData } = useQuery({
+    queryKey: ['subscription', userId],
+    queryFn: async () => {
+      if (!userId) return null;
+
+      const { data, error } = await supabase
+        .from('subscriptions')
+        .select('*')
+        .eq('user_id', userId)
+        .or('ends_at.is.null,ends_at.gt.now()')
+        .single();
+
+      if (error && error.code !== 'PGRST116') throw error;
+      return data as Subscription | null;
+    },
+    enabled: !!userId,
+  });
+
+  const { data: quotaData } = useQuery({
+    queryKey: ['quota', userId],
+    queryFn: async () => {
+      if (!userId) return null;
+
+      // Lecture ou création en un aller-retour (migration-quota-rpc.sql)
+      const { data, error } = await supabase
+        .rpc('get_or_create_quota', { p_user_id: userId })
+        .single();
+
+      if (error) throw error;
+      return data as Quota | null;
+    },
+    enabled: !!userId,
+  });
+
+  if (subscriptionData && subscriptionData !== subscription) {
+    setSubscription(subscriptionData);
+  }
+
+  if (quotaData && quotaData !== quota) {
+    setQuota(quotaData);
+  }
+
+  return {
+    subscription,
+    quota,
+    tier,
+    isPremium: tier === 'premium' || tier === 'elite',
+    isElite: tier === 'elite',
+  };
+}
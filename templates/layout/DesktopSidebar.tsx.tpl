@@ -0,0 +1,67 @@
+import { useEffect } from 'react';
+import { useLocation, useNavigate } from 'react-router-dom';
+import { prefetchRoute, prefetchWhenIdle } from '@/routes/manifest';
+import { useAuth } from '@/hooks/useAuth';
+
+const LINKS = [
+  { path: '/univers', icon: '🌌', label: 'Univers' },
+  { path: '/messages', icon: '💬', label: 'Messages' },
+  { path: '/astra', icon: '⭐', label: 'ASTRA' },
+  { path: '/astro', icon: '♈', label: 'Astro' },
+  { path: '/profile', icon: '👤', label: 'Profil' },
+  { path: '/settings', icon: '⚙️', label: 'Paramètres' },
+];
+
+// Constante de module : l'effet de préchargement ne dépend de rien
+const PREFETCH_PATHS = LINKS.map((link) => link.path);
+
+export default function DesktopSidebar() {
+  const location = useLocation();
+  const navigate = useNavigate();
+  const { logout } = useAuth();
+
+  // Pages préchargées en temps libre après le montage, ou dès le survol / focus / toucher
+  useEffect(() => prefetchWhenIdle(PREFETCH_PATHS), []);
+
+  return (
+    <aside className="w-64 h-screen bg-cosmic-black border-r border-white/10 flex flex-col">
+      <div className="p-6 border-b border-white/10">
+        <div className="text-2xl font-display font-bold flex items-center gap-2">
+          <span className="animate-cosmic-pulse">⭐</span>
+          ASTRA
+        </div>
+      </div>
+
+      <nav className="flex-1 p-4 space-y-2">
+        {LINKS.map((link) => (
+          <button
+            key={link.path}
+            onClick={() => navigate(link.path)}
+            onMouseEnter={() => prefetchRoute(link.path)}
+            onFocus={() => prefetchRoute(link.path)}
+            onTouchStart={() => prefetchRoute(link.path)}
+            className={`w-full flex items-center gap-3 px-4 py-3 rounded-medium
+              transition-all duration-200
+              ${location.pathname === link.path
+                ? 'bg-cosmic-purple/20 text-cosmic-purple'
+                : 'text-white/60 hover:bg-white/5 hover:text-white'
+              }`}
+          >
+            <span className="text-xl">{link.icon}</span>
+            <span className="font-medium">{link.label}</span>
+          </button>
+        ))}
+      </nav>
+
+      <div className="p-4 border-t border-white/10">
+        <button
+          onClick={logout}
+          className="w-full px-4 py-3 text-sm text-white/60 hover:text-white
+            hover:bg-white/5 rounded-medium transition-colors"
+        >
+          Déconnexion
+        </button>
+      </div>
+    </aside>
+  );
+}
@@ -0,0 +1,24 @@
+import { Outlet } from 'react-router-dom';
+import MobileTabBar from './MobileTabBar';
+import DesktopSidebar from './DesktopSidebar';
+
+export default function MainLayout() {
+  return (
+    <div className="h-screen flex flex-col md:flex-row bg-cosmic-black overflow-hidden">
+      {/* Desktop sidebar */}
+      <div className="hidden md:block">
+        <DesktopSidebar />
+      </div>
+
+      {/* Main content */}
+      <main className="flex-1 overflow-auto">
+        <Outlet />
+      </main>
+
+      {/* Mobile tab bar */}
+      <div className="md:hidden">
+        <MobileTabBar />
+      </div>
+    </div>
+  );
+}
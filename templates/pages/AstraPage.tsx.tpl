@@ -0,0 +1,194 @@
+import { useState, useEffect, useRef, useCallback } from 'react';
+import { useAuthStore } from '@/store/authStore';
+import { useSubscriptionStore } from '@/store/subscriptionStore';
+import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { supabase } from '@/config/supabase';
+import { astraService } from '@/services/astra/astraService';
+import { AstraHeader } from '@/components/astra/AstraHeader';
+import { AstraChatBubble } from '@/components/astra/AstraChatBubble';
+import { UserChatBubble } from '@/components/astra/UserChatBubble';
+import { KeyMoment } from '@/components/astra/KeyMoment';
+import { TypingIndicator } from '@/components/astra/TypingIndicator';
+import { AstraInput } from '@/components/astra/AstraInput';
+import { toast } from 'react-hot-toast';
+
+// Texte reçu en flux : les deltas s'accumulent hors de React,
+// un seul setState par frame quel que soit le nombre de tokens reçus.
+function useFrameBatchedText() {
+  const [text, setText] = useState('');
+  const buffer = useRef('');
+  const frame = useRef<number | null>(null);
+
+  const cancel = useCallback(() => {
+    if (frame.current !== null) cancelAnimationFrame(frame.current);
+    frame.current = null;
+  }, []);
+
+  const append = useCallback((delta: string) => {
+    buffer.current += delta;
+    if (frame.current === null) {
+      frame.current = requestAnimationFrame(() => {
+        frame.current = null;
+        setText(buffer.current);
+      });
+    }
+  }, []);
+
+  const reset = useCallback(() => {
+    cancel();
+    buffer.current = '';
+    setText('');
+  }, [cancel]);
+
+  useEffect(() => cancel, [cancel]);
+
+  return { text, append, reset };
+}
+
+export default function AstraPage() {
+  const { profile } = useAuthStore();
+  const { quota, tier } = useSubscriptionStore();
+  const queryClient = useQueryClient();
+  const messagesEndRef = useRef<HTMLDivElement>(null);
+  const abortRef = useRef<AbortController | null>(null);
+  const [isStreaming, setIsStreaming] = useState(false);
+  // Verrou synchrone : isPending et isStreaming ne sont vus qu'au rendu suivant,
+  // deux envois dans la même frame passeraient tous les deux
+  const sendingRef = useRef(false);
+  const streamed = useFrameBatchedText();
+
+  const { data: conversation } = useQuery({
+    queryKey: ['astra-conversation', profile?.id],
+    queryFn: async () => {
+      if (!profile) return null;
+      const { data: conv } = await supabase
+        .from('astra_conversations')
+        .select('*')
+        .eq('user_id', profile.id)
+        .single();
+
+      if (conv) return conv;
+
+      const { data: newConv } = await supabase
+        .from('astra_conversations')
+        .insert({ user_id: profile.id, session_type: 'question', tone: 'observation' })
+        .select()
+        .single();
+
+      return newConv;
+    },
+    enabled: !!profile,
+  });
+
+  const { data: messages } = useQuery({
+    queryKey: ['astra-messages', conversation?.id],
+    queryFn: async () => {
+      if (!conversation) return [];
+      const { data } = await supabase
+        .from('astra_messages')
+        .select('*')
+        .eq('conversation_id', conversation.id)
+        .order('created_at', { ascending: true });
+      return data || [];
+    },
+    enabled: !!conversation,
+  });
+
+  const { data: memories } = useQuery({
+    queryKey: ['astra-memory', profile?.id],
+    queryFn: async () => {
+      if (!profile) return [];
+      return astraService.getMemories(profile.id);
+    },
+    enabled: !!profile,
+  });
+
+  const sendMessage = useMutation({
+    mutationFn: async (content: string) => {
+      if (!profile || !conversation) throw new Error('Not ready');
+
+      if (quota && quota.astra_messages_used >= quota.astra_messages_limit) {
+        throw new Error('Quota atteint');
+      }
+
+      await astraService.saveMessage(conversation.id, 'user', content);
+      queryClient.invalidateQueries({ queryKey: ['astra-messages', conversation.id] });
+
+      await supabase.from('quotas').update({
+        astra_messages_used: (quota?.astra_messages_used || 0) + 1
+      }).eq('id', quota?.id);
+
+      abortRef.current = new AbortController();
+      setIsStreaming(true);
+
+      const stream = astraService.streamResponse(
+        conversation.id,
+        content,
+        profile,
+        messages || [],
+        memories || [],
+        abortRef.current.signal
+      );
+      for await (const delta of stream) {
+        streamed.append(delta);
+      }
+    },
+    onSettled: async () => {
+      await queryClient.invalidateQueries({ queryKey: ['astra-messages'] });
+      queryClient.invalidateQueries({ queryKey: ['quota'] });
+      // La bulle en flux disparaît quand le message persisté est affiché
+      setIsStreaming(false);
+      streamed.reset();
+      sendingRef.current = false;
+    },
+    onError: (error: any) => {
+      if (error.name !== 'AbortError') toast.error(error.message);
+    },
+  });
+
+  useEffect(() => () => abortRef.current?.abort(), []);
+
+  const send = (content: string) => {
+    if (sendingRef.current || sendMessage.isPending || isStreaming) return;
+    sendingRef.current = true;
+    sendMessage.mutate(content);
+  };
+
+  useEffect(() => {
+    messagesEndRef.current?.scrollIntoView({ behavior: isStreaming ? 'auto' : 'smooth' });
+  }, [messages, isStreaming, streamed.text]);
+
+  if (!profile || !conversation) {
+    return <div className="h-full flex items-center justify-center"><div className="animate-cosmic-pulse text-2xl">⭐</div></div>;
+  }
+
+  const quotaUsed = quota?.astra_messages_used || 0;
+  const quotaLimit = quota?.astra_messages_limit || (tier === 'free' ? {{ quota.limits.free.astra }} : tier === 'premium' ? {{ quota.limits.premium.astra }} : {{ quota.limits.elite.astra }});
+
+  return (
+    <div className="h-full flex flex-col bg-cosmic-black">
+      <AstraHeader quotaUsed={quotaUsed} quotaLimit={quotaLimit} tier={tier} />
+
+      <div className="flex-1 overflow-y-auto px-4 py-6 space-y-4">
+        {messages?.map((msg: any) => (
+          <div key={msg.id}>
+            {msg.message_type === 'user' && <UserChatBubble content={msg.content} timestamp={msg.created_at} />}
+            {msg.message_type === 'astra' && <AstraChatBubble content={msg.content} timestamp={msg.created_at} />}
+            {['insight', 'consciousness', 'silence', 'memory'].includes(msg.message_type) && (
+              <KeyMoment type={msg.message_type} content={msg.content} />
+            )}
+          </div>
+        ))}
+
+        {isStreaming && (streamed.text ? <AstraChatBubble content={streamed.text} /> : <TypingIndicator />)}
+        <div ref={messagesEndRef} />
+      </div>
+
+      <AstraInput
+        onSend={send}
+        quotaUsed={quotaUsed}
+        quotaLimit={quotaLimit}
+      />
+    </div>
+  );
+}
@@ -0,0 +1,68 @@
+import { useState } from 'react';
+import { useAuth } from '@/hooks/useAuth';
+import { Button } from '@/components/ui/Button';
+
+export default function LoginPage() {
+  const [email, setEmail] = useState('');
+  const [password, setPassword] = useState('');
+  const [isLoading, setIsLoading] = useState(false);
+  const { login } = useAuth();
+
+  const handleSubmit = async (e: React.FormEvent) => {
+    e.preventDefault();
+    setIsLoading(true);
+    try {
+      await login(email, password);
+    } catch (error) {
+      console.error(error);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  return (
+    <div className="min-h-screen bg-cosmic-black cosmic-gradient flex items-center justify-center p-4">
+      <div className="w-full max-w-md glass-effect p-8 rounded-large">
+        <div className="text-center mb-8">
+          <div className="text-4xl mb-4 animate-cosmic-pulse">⭐</div>
+          <h1 className="text-3xl font-display font-bold mb-2">ASTRA</h1>
+          <p className="text-white/60">Le dating conscient guidé par l'astrologie</p>
+        </div>
+
+        <form onSubmit={handleSubmit} className="space-y-4">
+          <div>
+            <label className="block text-sm font-medium mb-2">Email</label>
+            <input
+              type="email"
+              value={email}
+              onChange={(e) => setEmail(e.target.value)}
+              className="w-full px-4 py-3 bg-white/5 border border-white/10 rounded-medium
+                focus:outline-none focus:border-cosmic-purple transition-colors"
+              required
+            />
+          </div>
+
+          <div>
+            <label className="block text-sm font-medium mb-2">Mot de passe</label>
+            <input
+              type="password"
+              value={password}
+              onChange={(e) => setPassword(e.target.value)}
+              className="w-full px-4 py-3 bg-white/5 border border-white/10 rounded-medium
+                focus:outline-none focus:border-cosmic-purple transition-colors"
+              required
+            />
+          </div>
+
+          <Button
+            type="submit"
+            className="w-full"
+            disabled={isLoading}
+          >
+            {isLoading ? 'Connexion...' : 'Se connecter'}
+          </Button>
+        </form>
+      </div>
+    </div>
+  );
+}
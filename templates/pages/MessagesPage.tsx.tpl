@@ -0,0 +1,284 @@
+import { memo, useCallback, useEffect, useLayoutEffect, useMemo, useRef, useState } from 'react';
+import { useSearchParams } from 'react-router-dom';
+import { useQuery } from '@tanstack/react-query';
+import { supabase } from '@/config/supabase';
+import { useAuthStore } from '@/store/authStore';
+import { conversationService } from '@/services/messaging/conversationService';
+
+const PAGE_SIZE = {{ messages.page_size }};
+// Hauteur supposée d'une bulle tant qu'elle n'a pas été mesurée
+const ESTIMATED_ROW_HEIGHT = {{ messages.row_height }};
+// Marge rendue au-delà de la zone visible, et distance au haut qui déclenche la page précédente
+const OVERSCAN_PX = {{ messages.overscan_px }};
+
+interface ThreadMessage {
+  id: string;
+  sender_id: string;
+  content: string;
+  created_at: string;
+}
+
+// Pagination par curseur sur idx_messages_conversation (conversation_id, created_at DESC) :
+// chaque page coûte un parcours d'index de PAGE_SIZE lignes, quelle que soit sa profondeur.
+// Curseur composite (created_at, id) : des messages de même horodatage, même plus de
+// PAGE_SIZE, sont départagés par id sans en sauter ni reboucler sur la même page.
+async function fetchOlder(
+  conversationId: string,
+  before?: Pick<ThreadMessage, 'created_at' | 'id'>
+): Promise<ThreadMessage[]> {
+  let query = supabase
+    .from('messages')
+    .select('id, sender_id, content, created_at')
+    .eq('conversation_id', conversationId);
+  if (before) {
+    // Guillemets : l'horodatage contient des '.' et ':' réservés par la syntaxe de or()
+    const at = `"${before.created_at}"`;
+    query = query.or(`created_at.lt.${at},and(created_at.eq.${at},id.lt.${before.id})`);
+  }
+  const { data, error } = await query
+    .order('created_at', { ascending: false })
+    .order('id', { ascending: false })
+    .limit(PAGE_SIZE);
+
+  if (error) throw error;
+  return (data as ThreadMessage[]).reverse();
+}
+
+// Premier indice i tel que offsets[i] > value
+function upperBound(offsets: Float64Array, value: number): number {
+  let low = 0;
+  let high = offsets.length;
+  while (low < high) {
+    const mid = (low + high) >>> 1;
+    if (offsets[mid] <= value) low = mid + 1;
+    else high = mid;
+  }
+  return low;
+}
+
+// Les lignes sont placées depuis le bas du fil : préfixer des messages plus
+// anciens ne change ni leur `bottom` ni leurs props, React.memo les épargne.
+const MessageRow = memo(function MessageRow({
+  message,
+  bottom,
+  mine,
+  observer,
+}: {
+  message: ThreadMessage;
+  bottom: number;
+  mine: boolean;
+  observer: ResizeObserver;
+}) {
+  const ref = useRef<HTMLDivElement>(null);
+
+  // Une ligne démontée doit cesser d'être observée : sinon sa hauteur retomberait à 0
+  useLayoutEffect(() => {
+    const element = ref.current!;
+    observer.observe(element);
+    return () => observer.unobserve(element);
+  }, [observer]);
+
+  return (
+    <div
+      ref={ref}
+      data-id={message.id}
+      className={`absolute inset-x-0 px-4 py-1 flex ${mine ? 'justify-end' : 'justify-start'}`}
+      style={{ bottom: bottom }}
+    >
+      <div
+        className={`max-w-[70%] px-4 py-2 text-sm leading-relaxed ${
+          mine ? 'bg-cosmic-purple/40 rounded-l-large rounded-br-large' : 'glass-effect rounded-r-large rounded-bl-large'
+        }`}
+      >
+        {message.content}
+      </div>
+    </div>
+  );
+});
+
+function MessageThread({ conversationId, userId }: { conversationId: string; userId: string }) {
+  const [rows, setRows] = useState<ThreadMessage[]>([]);
+  const [layoutVersion, setLayoutVersion] = useState(0);
+  const [viewport, setViewport] = useState({ top: 0, height: 0 });
+  const [draft, setDraft] = useState('');
+  const scrollRef = useRef<HTMLDivElement>(null);
+  const heights = useRef(new Map<string, number>());
+  const hasMore = useRef(true);
+  const loading = useRef(false);
+  // Décalage de scroll à appliquer après le rendu (contenu ajouté ou agrandi au-dessus)
+  const anchorShift = useRef(0);
+  const stickToBottom = useRef(true);
+
+  const offsets = useMemo(() => {
+    const result = new Float64Array(rows.length + 1);
+    for (let i = 0; i < rows.length; i++) {
+      result[i + 1] = result[i] + (heights.current.get(rows[i].id) ?? ESTIMATED_ROW_HEIGHT);
+    }
+    return result;
+  }, [rows, layoutVersion]);
+  const total = offsets[rows.length];
+
+  const indexById = useMemo(() => new Map(rows.map((row, index) => [row.id, index])), [rows]);
+  const latest = useRef({ offsets, indexById, viewport });
+  latest.current = { offsets, indexById, viewport };
+
+  // Un seul ResizeObserver pour toutes les lignes montées ; mesures appliquées par frame
+  const observer = useMemo(() => {
+    const pending = new Map<string, number>();
+    let frame: number | null = null;
+    const flush = () => {
+      frame = null;
+      const { offsets, indexById, viewport } = latest.current;
+      for (const [id, height] of pending) {
+        const index = indexById.get(id);
+        const previous = heights.current.get(id) ?? ESTIMATED_ROW_HEIGHT;
+        if (index === undefined || previous === height) continue;
+        heights.current.set(id, height);
+        if (offsets[index + 1] <= viewport.top) anchorShift.current += height - previous;
+      }
+      pending.clear();
+      setLayoutVersion((version) => version + 1);
+    };
+    return new ResizeObserver((entries) => {
+      for (const entry of entries) {
+        const id = (entry.target as HTMLElement).dataset.id;
+        if (id) pending.set(id, entry.borderBoxSize[0]?.blockSize ?? entry.contentRect.height);
+      }
+      frame ??= requestAnimationFrame(flush);
+    });
+  }, []);
+  useEffect(() => () => observer.disconnect(), [observer]);
+
+  const rowsRef = useRef(rows);
+  rowsRef.current = rows;
+
+  const loadOlder = useCallback(async () => {
+    if (loading.current || !hasMore.current) return;
+    loading.current = true;
+    try {
+      const oldest = rowsRef.current[0];
+      const page = await fetchOlder(conversationId, oldest);
+      // Un message arrivé en direct peut déjà être dans le fil
+      const known = latest.current.indexById;
+      const fresh = page.filter((row) => !known.has(row.id));
+      hasMore.current = page.length === PAGE_SIZE;
+      if (fresh.length === 0) return;
+      if (oldest) anchorShift.current += fresh.length * ESTIMATED_ROW_HEIGHT;
+      setRows((current) => [...fresh, ...current]);
+    } finally {
+      loading.current = false;
+    }
+  }, [conversationId]);
+
+  // Le fil est monté avec key={conversationId} : un changement de conversation repart de zéro
+  useEffect(() => {
+    loadOlder();
+  }, [loadOlder]);
+
+  // Après chaque rendu : garder la vue immobile, ou collée au bas du fil
+  useLayoutEffect(() => {
+    const element = scrollRef.current;
+    if (!element) return;
+    if (stickToBottom.current) {
+      element.scrollTop = total;
+    } else if (anchorShift.current !== 0) {
+      element.scrollTop += anchorShift.current;
+    }
+    anchorShift.current = 0;
+  }, [total]);
+
+  const onScroll = useCallback(() => {
+    const element = scrollRef.current;
+    if (!element) return;
+    setViewport({ top: element.scrollTop, height: element.clientHeight });
+    stickToBottom.current = element.scrollHeight - element.scrollTop - element.clientHeight < 4;
+    if (element.scrollTop < OVERSCAN_PX) loadOlder();
+  }, [loadOlder]);
+
+  useLayoutEffect(() => {
+    const element = scrollRef.current;
+    if (element) setViewport({ top: element.scrollTop, height: element.clientHeight });
+  }, []);
+
+  const start = Math.max(0, upperBound(offsets, viewport.top - OVERSCAN_PX) - 1);
+  const end = Math.min(rows.length, upperBound(offsets, viewport.top + viewport.height + OVERSCAN_PX));
+
+  const send = async () => {
+    const content = draft.trim();
+    if (!content) return;
+    setDraft('');
+    const message = await conversationService.sendMessage(conversationId, userId, content);
+    stickToBottom.current = true;
+    setRows((current) => [...current, message as unknown as ThreadMessage]);
+  };
+
+  return (
+    <div className="h-full flex flex-col">
+      <div ref={scrollRef} onScroll={onScroll} className="flex-1 overflow-y-auto">
+        <div className="relative" style={{ height: total }}>
+          {rows.slice(start, end).map((message, i) => (
+            <MessageRow
+              key={message.id}
+              message={message}
+              bottom={total - offsets[start + i + 1]}
+              mine={message.sender_id === userId}
+              observer={observer}
+            />
+          ))}
+        </div>
+      </div>
+
+      <div className="glass-effect border-t border-white/10 p-4 flex gap-3">
+        <input
+          value={draft}
+          onChange={(e) => setDraft(e.target.value)}
+          onKeyDown={(e) => e.key === 'Enter' && send()}
+          placeholder="Écris ton message..."
+          className="flex-1 px-4 py-3 bg-white/5 border border-white/10 rounded-large focus:outline-none focus:border-cosmic-purple"
+        />
+      </div>
+    </div>
+  );
+}
+
+export default function MessagesPage() {
+  const { profile } = useAuthStore();
+  const [searchParams, setSearchParams] = useSearchParams();
+  const conversationId = searchParams.get('c');
+
+  const { data: conversations } = useQuery({
+    queryKey: ['conversations', profile?.id],
+    queryFn: () => conversationService.getConversations(profile!.id),
+    enabled: !!profile,
+  });
+
+  if (!profile) {
+    return <div className="h-full flex items-center justify-center"><div className="animate-cosmic-pulse text-2xl">💬</div></div>;
+  }
+
+  return (
+    <div className="h-full flex">
+      <aside className={`${conversationId ? 'hidden md:block' : 'block'} w-full md:w-80 border-r border-white/10 overflow-y-auto`}>
+        <h1 className="text-2xl font-display font-bold p-6">💬 Messages</h1>
+        {conversations?.map((conversation: any) => (
+          <button
+            key={conversation.id}
+            onClick={() => setSearchParams({ c: conversation.id })}
+            className={`w-full text-left px-6 py-4 hover:bg-white/5 ${conversation.id === conversationId ? 'bg-white/10' : ''}`}
+          >
+            <p className="font-semibold">{conversation.profiles?.first_name}</p>
+            <p className="text-sm text-white/60 truncate">{conversation.last_message_preview}</p>
+          </button>
+        ))}
+      </aside>
+
+      <section className={`${conversationId ? 'flex' : 'hidden md:flex'} flex-1 flex-col`}>
+        {conversationId ? (
+          <MessageThread key={conversationId} conversationId={conversationId} userId={profile.id} />
+        ) : (
+          <p className="m-auto text-white/60">Choisis une conversation</p>
+        )}
+      </section>
+    </div>
+  );
+}
@@ -0,0 +1,11 @@
+export default function OnboardingPage() {
+  return (
+    <div className="min-h-screen bg-cosmic-black cosmic-gradient flex items-center justify-center">
+      <div className="text-center">
+        <div className="text-6xl mb-4 animate-cosmic-pulse">⭐</div>
+        <h1 className="text-4xl font-display font-bold mb-4">Bienvenue</h1>
+        <p className="text-white/60">Onboarding à implémenter</p>
+      </div>
+    </div>
+  );
+}
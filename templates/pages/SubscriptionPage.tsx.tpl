@@ -0,0 +1,10 @@
+export default function SubscriptionPage() {
+  return (
+    <div className="h-full">
+      <div className="p-6">
+        <h1 className="text-3xl font-display font-bold mb-4">💎 Abonnement</h1>
+        <p className="text-white/60">Pricing à implémenter</p>
+      </div>
+    </div>
+  );
+}
@@ -0,0 +1,10 @@
+export default function UniversPage() {
+  return (
+    <div className="h-full cosmic-gradient">
+      <div className="p-6">
+        <h1 className="text-3xl font-display font-bold mb-4">🌌 Univers</h1>
+        <p className="text-white/60">Constellation view à implémenter</p>
+      </div>
+    </div>
+  );
+}
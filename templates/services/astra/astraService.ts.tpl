@@ -0,0 +1,307 @@
+import { openai, ASTRA_MODEL, ASTRA_SYSTEM_PROMPT } from '@/config/openai';
+import { supabase } from '@/config/supabase';
+import type { Profile, AstraMemory, AstraMessage } from '@/types';
+
+// Budget du prompt (tokens estimés) : system, contexte, historique et message
+const PROMPT_BUDGET = {{ astra.context.budget_tokens }};
+const MEMORY_BUDGET = {{ astra.context.memory_tokens }};
+// Cache des mémoires : durée de vie, nombre d'utilisateurs gardés,
+// délai d'envoi groupé des last_referenced et plafond du délai après échecs
+const MEMORY_TTL_MS = {{ astra.memory_cache.ttl_ms }};
+const MEMORY_CACHE_USERS = {{ astra.memory_cache.max_users }};
+const MEMORY_FLUSH_MS = {{ astra.memory_cache.flush_ms }};
+const MEMORY_FLUSH_MAX_MS = {{ astra.memory_cache.flush_max_ms }};
+// Surcoût de structure d'un message de chat
+const MESSAGE_OVERHEAD = 4;
+
+// Estimation locale, sans tokenizer : un token par tranche de 4 lettres
+// ou chiffres d'un mot, un par signe de ponctuation
+const TOKEN_PIECE = /[\p{L}\p{N}]+|[^\s\p{L}\p{N}]/gu;
+
+export function estimateTokens(text: string): number {
+  let tokens = 0;
+  for (const [piece] of text.matchAll(TOKEN_PIECE)) {
+    tokens += Math.ceil(piece.length / 4);
+  }
+  return tokens;
+}
+
+export function messageTokens(content: string): number {
+  return estimateTokens(content) + MESSAGE_OVERHEAD;
+}
+
+function contextPrompt(profileText: string, memoryText: string, messageCount: number): string {
+  return `${profileText}
+
+MÉMOIRE ASTRA (insights passés):
+${memoryText}
+
+CONTEXTE CONVERSATION:
+${messageCount} messages récents dans l'historique.
+
+RAPPEL: Reste direct, profond, maximum 2-3 phrases.`;
+}
+
+// Part fixe : prompt système et cadre du message de contexte
+const FIXED_TOKENS = messageTokens(ASTRA_SYSTEM_PROMPT) + messageTokens(contextPrompt('', '', 0));
+
+// Importance décroissante, puis référencées le plus récemment
+function rankMemories(memories: AstraMemory[]): AstraMemory[] {
+  return [...memories].sort(
+    (a, b) => b.importance - a.importance
+      || (b.last_referenced || '').localeCompare(a.last_referenced || '')
+  );
+}
+
+function memoryLine(memory: AstraMemory): string {
+  return `- [${memory.memory_type}] ${memory.content}`;
+}
+
+function memoryCost(memory: AstraMemory): number {
+  return estimateTokens(memoryLine(memory)) + 1;
+}
+
+// Plus long préfixe de items qui tient dans budget
+function fitToBudget<T>(
+  items: T[],
+  budget: number,
+  cost: (item: T) => number
+): { items: T[]; tokens: number } {
+  const kept: T[] = [];
+  let tokens = 0;
+  for (const item of items) {
+    const itemTokens = cost(item);
+    if (tokens + itemTokens > budget) break;
+    kept.push(item);
+    tokens += itemTokens;
+  }
+  return { items: kept, tokens };
+}
+
+export class AstraService {
+  async generateResponse(
+    userId: string,
+    message: string,
+    profile: Profile,
+    recentMessages: any[],
+    memories: AstraMemory[]
+  ): Promise<string> {
+    const completion = await openai.chat.completions.create({
+      model: ASTRA_MODEL,
+      messages: this.buildMessages(message, profile, recentMessages, memories),
+      temperature: {{ astra.temperature }},
+      max_tokens: {{ astra.max_tokens }},
+    });
+
+    return completion.choices[0].message.content || 'ASTRA ne répond pas.';
+  }
+
+  /**
+   * Variante en streaming : produit les deltas de texte au fil de la génération,
+   * puis persiste la réponse complète dans la conversation et la retourne.
+   * Interrompre l'itération (break, signal) n'enregistre rien.
+   */
+  async *streamResponse(
+    conversationId: string,
+    message: string,
+    profile: Profile,
+    recentMessages: any[],
+    memories: AstraMemory[],
+    signal?: AbortSignal
+  ): AsyncGenerator<string, AstraMessage> {
+    const stream = await openai.chat.completions.create(
+      {
+        model: ASTRA_MODEL,
+        messages: this.buildMessages(message, profile, recentMessages, memories),
+        temperature: {{ astra.temperature }},
+        max_tokens: {{ astra.max_tokens }},
+        stream: true,
+      },
+      { signal }
+    );
+
+    let content = '';
+    for await (const chunk of stream) {
+      const delta = chunk.choices[0]?.delta?.content;
+      if (delta) {
+        content += delta;
+        yield delta;
+      }
+    }
+
+    return this.saveMessage(conversationId, 'astra', content || 'ASTRA ne répond pas.');
+  }
+
+  async saveMessage(
+    conversationId: string,
+    type: AstraMessage['messageType'],
+    content: string
+  ): Promise<AstraMessage> {
+    const { data, error } = await supabase
+      .from('astra_messages')
+      .insert({
+        conversation_id: conversationId,
+        message_type: type,
+        content,
+      })
+      .select()
+      .single();
+
+    if (error) throw error;
+    return data as AstraMessage;
+  }
+
+  private buildMessages(
+    message: string,
+    profile: Profile,
+    recentMessages: any[],
+    memories: AstraMemory[]
+  ) {
+    const profileBlock = this.profileBlock(profile);
+    let budget = PROMPT_BUDGET - FIXED_TOKENS - profileBlock.tokens - messageTokens(message);
+
+    const kept = fitToBudget(rankMemories(memories), Math.min(MEMORY_BUDGET, budget), memoryCost);
+    budget -= kept.tokens;
+    this.markReferenced(kept.items);
+
+    // Les échanges les plus récents d'abord, remis ensuite dans l'ordre
+    const history = fitToBudget([...recentMessages].reverse(), budget, (msg) => messageTokens(msg.content));
+    const context = contextPrompt(
+      profileBlock.text, kept.items.map(memoryLine).join('\n'), history.items.length
+    );
+
+    return [
+      { role: 'system' as const, content: ASTRA_SYSTEM_PROMPT },
+      { role: 'system' as const, content: context },
+      ...history.items.reverse().map((msg) => ({
+        role: msg.message_type === 'user' ? 'user' as const : 'assistant' as const,
+        content: msg.content,
+      })),
+      { role: 'user' as const, content: message },
+    ];
+  }
+
+  // Bloc profil mémorisé par utilisateur, reconstruit seulement si le profil change
+  private profileBlocks = new Map<string, { signature: string; text: string; tokens: number }>();
+
+  private profileBlock(profile: Profile) {
+    const signature = [
+      profile.first_name, profile.sun_sign, profile.moon_sign, profile.ascendant_sign,
+      profile.energy_fire, profile.energy_earth, profile.energy_air, profile.energy_water,
+    ].join('|');
+    const cached = this.profileBlocks.get(profile.id);
+    if (cached?.signature === signature) return cached;
+
+    const text = `PROFIL UTILISATEUR:
+- Prénom: ${profile.first_name}
+- Signes: Soleil ${profile.sun_sign}, Lune ${profile.moon_sign}, Ascendant ${profile.ascendant_sign}
+- Énergies: Feu ${profile.energy_fire}, Terre ${profile.energy_earth}, Air ${profile.energy_air}, Eau ${profile.energy_water}`;
+    const block = { signature, text, tokens: estimateTokens(text) };
+    this.profileBlocks.set(profile.id, block);
+    return block;
+  }
+
+  // Mémoires par utilisateur ; l'ordre d'insertion de la Map sert d'ordre LRU
+  private memoryCache = new Map<string, { memories: AstraMemory[]; limit: number; expiresAt: number }>();
+  private referencedMemories = new Set<string>();
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  private flushFailures = 0;
+
+  constructor() {
+    // Dernière chance d'envoyer les références avant que la page disparaisse
+    if (typeof document !== 'undefined') {
+      document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') this.flushReferences().catch(() => undefined);
+      });
+    }
+  }
+
+  async saveMemory(
+    userId: string,
+    type: string,
+    content: string,
+    importance: number = 5
+  ) {
+    const { data, error } = await supabase
+      .from('astra_memory')
+      .insert({
+        user_id: userId,
+        memory_type: type,
+        content,
+        importance,
+      })
+      .select()
+      .single();
+
+    if (error) throw error;
+    this.memoryCache.delete(userId);
+    return data;
+  }
+
+  async getMemories(userId: string, limit: number = 5): Promise<AstraMemory[]> {
+    const cached = this.memoryCache.get(userId);
+    if (cached && cached.expiresAt > Date.now() && cached.limit >= limit) {
+      this.memoryCache.delete(userId);
+      this.memoryCache.set(userId, cached);
+      return cached.memories.slice(0, limit);
+    }
+
+    const { data, error } = await supabase
+      .from('astra_memory')
+      .select('*')
+      .eq('user_id', userId)
+      .order('importance', { ascending: false })
+      .order('last_referenced', { ascending: false })
+      .limit(limit);
+
+    if (error) throw error;
+    const memories = data as AstraMemory[];
+    this.memoryCache.delete(userId);
+    this.memoryCache.set(userId, { memories, limit, expiresAt: Date.now() + MEMORY_TTL_MS });
+    if (this.memoryCache.size > MEMORY_CACHE_USERS) {
+      this.memoryCache.delete(this.memoryCache.keys().next().value!);
+    }
+    return memories;
+  }
+
+  // Mémoires injectées dans un prompt : last_referenced mis à jour en local
+  // tout de suite, en base au prochain envoi groupé
+  private markReferenced(memories: AstraMemory[]) {
+    if (memories.length === 0) return;
+    const now = new Date().toISOString();
+    for (const memory of memories) {
+      memory.last_referenced = now;
+      this.referencedMemories.add(memory.id);
+    }
+    this.flushTimer ??= this.scheduleFlush(MEMORY_FLUSH_MS);
+  }
+
+  private scheduleFlush(delay: number) {
+    return setTimeout(() => this.flushReferences().catch(() => undefined), delay);
+  }
+
+  async flushReferences(): Promise<void> {
+    if (this.flushTimer !== null) clearTimeout(this.flushTimer);
+    this.flushTimer = null;
+    if (this.referencedMemories.size === 0) return;
+
+    const ids = [...this.referencedMemories];
+    this.referencedMemories.clear();
+    // Un seul appel pour tout le lot (migration-memory-touch.sql)
+    const { error } = await supabase.rpc('touch_astra_memories', { p_ids: ids });
+    if (error) {
+      // Lot remis en attente ; nouvel essai après un délai doublé à chaque
+      // échec consécutif, à la place d'un envoi armé entre-temps
+      ids.forEach((id) => this.referencedMemories.add(id));
+      this.flushFailures += 1;
+      if (this.flushTimer !== null) clearTimeout(this.flushTimer);
+      this.flushTimer = this.scheduleFlush(
+        Math.min(MEMORY_FLUSH_MS * 2 ** this.flushFailures, MEMORY_FLUSH_MAX_MS)
+      );
+      throw error;
+    }
+    this.flushFailures = 0;
+  }
+}
+
+export const astraService = new AstraService();
@@ -0,0 +1,18 @@
+-- ═══════════════════════════════════════════════════════════════════════
+-- MÉMOIRE ASTRA - RÉFÉRENCES GROUPÉES (RPC)
+-- ═══════════════════════════════════════════════════════════════════════
+-- Généré par generate-structure.py depuis templates/sql
+-- AstraService accumule les mémoires injectées dans les prompts et les
+-- envoie par lot (toutes les {{ astra.memory_cache.flush_ms }} ms ou quand la page est masquée) :
+-- une seule écriture par lot au lieu d'une par référence.
+
+CREATE OR REPLACE FUNCTION public.touch_astra_memories(p_ids uuid[])
+RETURNS void AS $$
+  UPDATE astra_memory
+  SET last_referenced = now(),
+      reference_count = coalesce(reference_count, 0) + 1
+  WHERE id = ANY(p_ids) AND user_id = auth.uid();
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION public.touch_astra_memories(uuid[]) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION public.touch_astra_memories(uuid[]) TO authenticated;
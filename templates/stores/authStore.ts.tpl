@@ -0,0 +1,86 @@
+import { create } from 'zustand';
+import { persist } from 'zustand/middleware';
+import type { User } from '@supabase/supabase-js';
+import type { Profile } from '@/types';
+import { supabase } from '@/config/supabase';
+import { authService } from '@/services/auth/authService';
+import { createIdleStorage } from '@/utils/idleStorage';
+
+// Seuls ces champs du profil sont persistés : de quoi afficher l'utilisateur
+// au premier rendu, sans natal_chart_data ni photos.
+const SNAPSHOT_FIELDS = {{ auth.persist.snapshot_fields }} as const;
+const STORAGE_VERSION = {{ auth.persist.version }};
+
+export type ProfileSnapshot = Pick<Profile, (typeof SNAPSHOT_FIELDS)[number]>;
+
+function toSnapshot(profile: Profile | null): ProfileSnapshot | null {
+  if (!profile) return null;
+  const snapshot = {} as Record<string, unknown>;
+  for (const field of SNAPSHOT_FIELDS) snapshot[field] = profile[field];
+  return snapshot as ProfileSnapshot;
+}
+
+interface AuthState {
+  user: User | null;
+  profile: Profile | null;
+  // Aperçu persisté du dernier profil, disponible avant le rechargement complet
+  snapshot: ProfileSnapshot | null;
+  isLoading: boolean;
+  setUser: (user: User | null) => void;
+  setProfile: (profile: Profile | null) => void;
+  setIsLoading: (loading: boolean) => void;
+  restore: () => Promise<void>;
+  reset: () => void;
+}
+
+type PersistedAuth = Pick<AuthState, 'snapshot'>;
+
+export const useAuthStore = create<AuthState>()(
+  persist(
+    (set) => ({
+      user: null,
+      profile: null,
+      snapshot: null,
+      isLoading: true,
+      setUser: (user) => set({ user }),
+      setProfile: (profile) => set({ profile, snapshot: toSnapshot(profile) }),
+      setIsLoading: (isLoading) => set({ isLoading }),
+      // La session vient du client Supabase, le profil complet de la base :
+      // rien de volumineux ne transite par localStorage.
+      restore: async () => {
+        try {
+          const { data: { session } } = await supabase.auth.getSession();
+          if (!session) {
+            set({ user: null, profile: null, snapshot: null });
+            return;
+          }
+          const profile = await authService.getProfile(session.user.id);
+          set({ user: session.user, profile, snapshot: toSnapshot(profile) });
+        } catch (error) {
+          console.error('Restauration de session impossible:', error);
+        } finally {
+          set({ isLoading: false });
+        }
+      },
+      reset: () => set({ user: null, profile: null, snapshot: null, isLoading: false }),
+    }),
+    {
+      name: 'astraloves-auth',
+      version: STORAGE_VERSION,
+      storage: createIdleStorage<PersistedAuth>(),
+      partialize: (state): PersistedAuth => ({ snapshot: state.snapshot }),
+      // Version 0 : { user, profile } complets
+      migrate: (persisted, version) =>
+        version === 0
+          ? { snapshot: toSnapshot((persisted as { profile?: Profile | null }).profile ?? null) }
+          : (persisted as PersistedAuth),
+      // L'hydratation est asynchrone : un profil chargé entre-temps reste prioritaire
+      merge: (persisted, current) =>
+        current.snapshot ? current : { ...current, ...(persisted as PersistedAuth) },
+      // Appelé aussi si la lecture échoue : la session est restaurée dans tous les cas
+      onRehydrateStorage: () => () => {
+        useAuthStore.getState().restore();
+      },
+    }
+  )
+);
@@ -0,0 +1,34 @@
+import { create } from 'zustand';
+
+interface Modal {
+  isOpen: boolean;
+  component: React.ComponentType<any> | null;
+  props: any;
+}
+
+interface UIState {
+  modal: Modal;
+  sidebar: {
+    isOpen: boolean;
+  };
+  openModal: (component: React.ComponentType<any>, props?: any) => void;
+  closeModal: () => void;
+  toggleSidebar: () => void;
+}
+
+export const useUIStore = create<UIState>((set) => ({
+  modal: {
+    isOpen: false,
+    component: null,
+    props: {},
+  },
+  sidebar: {
+    isOpen: true,
+  },
+  openModal: (component, props = {}) =>
+    set({ modal: { isOpen: true, component, props } }),
+  closeModal: () =>
+    set({ modal: { isOpen: false, component: null, props: {} } }),
+  toggleSidebar: () =>
+    set((state) => ({ sidebar: { isOpen: !state.sidebar.isOpen } })),
+}));
@@ -0,0 +1,39 @@
+import { ButtonHTMLAttributes, forwardRef } from 'react';
+import { cn } from '@/utils/cn';
+
+interface ButtonProps extends ButtonHTMLAttributes<HTMLButtonElement> {
+  variant?: 'primary' | 'secondary' | 'ghost';
+  size?: 'sm' | 'md' | 'lg';
+}
+
+export const Button = forwardRef<HTMLButtonElement, ButtonProps>(
+  ({ className, variant = 'primary', size = 'md', children, ...props }, ref) => {
+    return (
+      <button
+        ref={ref}
+        className={cn(
+          'inline-flex items-center justify-center rounded-medium font-semibold',
+          'transition-all duration-200 disabled:opacity-50 disabled:cursor-not-allowed',
+          {
+            'bg-cosmic-purple hover:bg-cosmic-purple/90 text-white':
+              variant === 'primary',
+            'bg-white/10 hover:bg-white/20 text-white border border-white/20':
+              variant === 'secondary',
+            'bg-transparent hover:bg-white/10 text-white': variant === 'ghost',
+          },
+          {
+            'text-sm px-3 py-2': size === 'sm',
+            'text-base px-4 py-3': size === 'md',
+            'text-lg px-6 py-4': size === 'lg',
+          },
+          className
+        )}
+        {...props}
+      >
+        {children}
+      </button>
+    );
+  }
+);
+
+Button.displayName = 'Button';
@@ -0,0 +1,94 @@
+import type { PersistStorage, StorageValue } from 'zustand/middleware';
+
+const DEBOUNCE_MS = {{ auth.persist.debounce_ms }};
+// Délai max avant qu'une écriture en attente de temps libre soit forcée
+const IDLE_TIMEOUT_MS = {{ auth.persist.idle_timeout_ms }};
+
+type IdleHandle = number | ReturnType<typeof setTimeout>;
+
+function whenIdle(callback: () => void): IdleHandle {
+  if (typeof requestIdleCallback === 'function') {
+    return requestIdleCallback(callback, { timeout: IDLE_TIMEOUT_MS });
+  }
+  return setTimeout(callback, 0);
+}
+
+function cancelIdle(handle: IdleHandle) {
+  if (typeof cancelIdleCallback === 'function' && typeof handle === 'number') {
+    cancelIdleCallback(handle);
+  } else {
+    clearTimeout(handle);
+  }
+}
+
+// Stockage zustand `persist` sur localStorage, sans travail synchrone :
+// - setItem ne fait que retenir la dernière valeur ; les appels d'une rafale
+//   sont fusionnés (debounce) puis sérialisés pendant un temps libre,
+//   et seulement si le JSON diffère de ce qui est déjà stocké ;
+// - getItem lit et parse pendant un temps libre, l'hydratation est donc
+//   asynchrone et ne retarde pas le premier rendu ;
+// - les écritures en attente sont vidées quand la page est masquée ou quittée.
+export function createIdleStorage<S>(): PersistStorage<S> & { flush: () => void } {
+  const pending = new Map<string, StorageValue<S>>();
+  const written = new Map<string, string | null>();
+  let debounce: ReturnType<typeof setTimeout> | null = null;
+  let idle: IdleHandle | null = null;
+
+  const flush = () => {
+    if (debounce !== null) clearTimeout(debounce);
+    if (idle !== null) cancelIdle(idle);
+    debounce = idle = null;
+    for (const [name, value] of pending) {
+      const json = JSON.stringify(value);
+      if (written.get(name) === json) continue;
+      try {
+        localStorage.setItem(name, json);
+        written.set(name, json);
+      } catch (error) {
+        // Quota dépassé ou stockage désactivé (navigation privée) : la session reste en mémoire
+        console.warn(`Persistance ${name} impossible:`, error);
+      }
+    }
+    pending.clear();
+  };
+
+  const schedule = () => {
+    if (debounce !== null) clearTimeout(debounce);
+    debounce = setTimeout(() => {
+      debounce = null;
+      idle ??= whenIdle(flush);
+    }, DEBOUNCE_MS);
+  };
+
+  if (typeof window !== 'undefined') {
+    window.addEventListener('pagehide', flush);
+    document.addEventListener('visibilitychange', () => {
+      if (document.visibilityState === 'hidden') flush();
+    });
+  }
+
+  return {
+    getItem: (name) =>
+      new Promise((resolve) => {
+        whenIdle(() => {
+          const json = localStorage.getItem(name);
+          written.set(name, json);
+          try {
+            resolve(json === null ? null : JSON.parse(json));
+          } catch {
+            resolve(null);
+          }
+        });
+      }),
+    setItem: (name, value) => {
+      pending.set(name, value);
+      schedule();
+    },
+    removeItem: (name) => {
+      pending.delete(name);
+      written.delete(name);
+      localStorage.removeItem(name);
+    },
+    flush,
+  };
+}
@@ -0,0 +1,161 @@
+"""Fixtures partagées : scripts racine (noms avec tirets) et exécution de TS sous Node."""
+
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# --experimental-strip-types : Node exécute les .ts tels quels
+NODE_MIN = (22, 6)
+
+# Résolution façon Vite/tsc : alias '@/' vers src, imports sans extension ;
+# paquets npm absents remplacés par une doublure, les autres résolus depuis ROOT
+RESOLVE_HOOKS = r"""
+let src, root, env, packages;
+export function initialize(data) { ({ src, root, env, packages } = data); }
+const SUFFIXES = ['', '.ts', '.tsx', '/index.ts', '/index.tsx'];
+export async function resolve(specifier, context, next) {
+  if (packages[specifier]) return { url: packages[specifier], shortCircuit: true };
+  const target = specifier.startsWith('@/') ? new URL(specifier.slice(2), src).href : specifier;
+  if (!/^(\.{1,2}\/|file:|node:)/.test(target)) return next(specifier, { ...context, parentURL: root });
+  if (target.startsWith('node:')) return next(target, context);
+  let failure;
+  for (const suffix of SUFFIXES) {
+    try {
+      return await next(target + suffix, context);
+    } catch (error) {
+      failure ??= error;
+    }
+  }
+  throw failure;
+}
+// import.meta.env de Vite pour les modules de src, sur la première ligne
+// pour garder les numéros de ligne des erreurs
+export async function load(url, context, next) {
+  const result = await next(url, context);
+  if (!url.startsWith(src) || result.source == null) return result;
+  const source = `import.meta.env ??= ${JSON.stringify(env)};` + Buffer.from(result.source).toString('utf-8');
+  return { ...result, source };
+}
+"""
+
+REGISTER = """
+import { register } from 'node:module';
+import { pathToFileURL } from 'node:url';
+register('./hooks.mjs', import.meta.url, { data: {
+  src: pathToFileURL(process.env.TS_SRC + '/').href,
+  root: pathToFileURL(process.env.TS_ROOT + '/').href,
+  env: JSON.parse(process.env.TS_ENV),
+  packages: JSON.parse(process.env.TS_PACKAGES),
+} });
+"""
+
+# Doublure du SDK openai, utilisée sans node_modules : même surface
+# (new OpenAI({ apiKey, baseURL }), chat.completions.create(body, { signal })),
+# vraies requêtes HTTP vers baseURL et flux SSE décodé au fil de l'eau
+OPENAI_SDK_STUB = r"""
+export default class OpenAI {
+  constructor({ apiKey, baseURL = 'https://api.openai.com/v1' }) {
+    const create = async (body, options = {}) => {
+      const response = await fetch(`${baseURL}/chat/completions`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${apiKey}` },
+        body: JSON.stringify(body),
+        signal: options.signal,
+      });
+      if (!response.ok) throw new Error(`OpenAI ${response.status}`);
+      return body.stream ? events(response.body) : response.json();
+    };
+    this.chat = { completions: { create } };
+  }
+}
+
+async function* events(body) {
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for await (const bytes of body) {
+    buffer += decoder.decode(bytes, { stream: true });
+    let end;
+    while ((end = buffer.indexOf('\n\n')) >= 0) {
+      const data = buffer.slice(0, end).split('\n')
+        .filter((line) => line.startsWith('data: ')).map((line) => line.slice(6)).join('\n');
+      buffer = buffer.slice(end + 2);
+      if (data === '[DONE]') return;
+      if (data) yield JSON.parse(data);
+    }
+  }
+}
+"""
+
+NPM_STUBS = {'openai': OPENAI_SDK_STUB}
+
+@pytest.fixture(scope='session')
+def load_script():
+    def load(name: str):
+        module_name = name.replace('-', '_')[:-3]
+        if module_name not in sys.modules:
+            spec = importlib.util.spec_from_file_location(module_name, ROOT / name)
+            module = importlib.util.module_from_spec(spec)
+            # Enregistré pour que les pools de processus puissent sérialiser ses fonctions
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+        return sys.modules[module_name]
+
+    return load
+
+
+@pytest.fixture(scope='session')
+def node() -> str:
+    """Node >= 22.6 : $NODE, sinon celui du PATH ; test ignoré s'il manque."""
+    path = os.environ.get('NODE') or shutil.which('node')
+    if path is None:
+        pytest.skip("Node introuvable (variable NODE)")
+    version = subprocess.run([path, '--version'], capture_output=True, text=True, check=True).stdout.strip()
+    if tuple(int(part) for part in version.lstrip('v').split('.')[:2]) < NODE_MIN:
+        pytest.skip(f"Node {version} : >= 22.6 requis pour --experimental-strip-types (variable NODE)")
+    return path
+
+
+@pytest.fixture
+def run_ts(node, tmp_path):
+    """run_ts(driver, src, *args, env=None, stubs=None) : exécute le module ESM driver, '@/' pointant sur src.
+
+    env devient import.meta.env des modules de src ; stubs remplace des
+    paquets npm par un source JS ({nom: source}). Le driver écrit un JSON
+    sur la sortie standard, retourné décodé.
+    """
+    (tmp_path / 'package.json').write_text('{"type": "module"}', encoding='utf-8')
+    (tmp_path / 'hooks.mjs').write_text(RESOLVE_HOOKS, encoding='utf-8')
+    (tmp_path / 'register.mjs').write_text(REGISTER, encoding='utf-8')
+
+    def stub(name: str, source: str) -> str:
+        path = tmp_path / 'stubs' / f'{name}.mjs'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding='utf-8')
+        return path.as_uri()
+
+    installed = {name: stub(name, source) for name, source in NPM_STUBS.items()
+                 if not (ROOT / 'node_modules' / name).exists()}
+
+    def run(driver: str, src: Path, *args: str, env: dict | None = None, stubs: dict | None = None):
+        packages = {**installed, **{name: stub(name, source) for name, source in (stubs or {}).items()}}
+        path = tmp_path / 'driver.mjs'
+        path.write_text(driver, encoding='utf-8')
+        completed = subprocess.run(
+            [node, '--experimental-strip-types', '--no-warnings', '--import', './register.mjs',
+             str(path), *args],
+            cwd=tmp_path, capture_output=True, text=True,
+            env={**os.environ, 'TS_SRC': str(src), 'TS_ROOT': str(ROOT),
+                 'TS_ENV': json.dumps(env or {}), 'TS_PACKAGES': json.dumps(packages)},
+        )
+        assert completed.returncode == 0, completed.stderr
+        return json.loads(completed.stdout)
+
+    return run
@@ -0,0 +1,151 @@
+import re
+
+import pytest
+
+from conftest import ROOT
+
+# Clients remplacés par des doublures : chaque requête from() et chaque rpc()
+# est journalisée, les échecs de rpc() sont programmés par le driver
+SUPABASE_STUB = """
+export const log = { selects: [] as string[], rpcs: [] as { at: number; ids: string[] }[], failures: 0 };
+
+class Query {
+  private userId = '';
+  select() { return this; }
+  order() { return this; }
+  limit() { return this; }
+  eq(_column: string, value: string) { this.userId = value; return this; }
+  then(resolve: (result: unknown) => void) {
+    log.selects.push(this.userId);
+    resolve({ data: [1, 2, 3].map((i) => ({ id: `${this.userId}-${i}`, importance: i, memory_type: 'insight',
+      content: `souvenir ${i}`, last_referenced: null })), error: null });
+  }
+}
+
+export const supabase = {
+  from: () => new Query(),
+  rpc: async (_name: string, args: { p_ids: string[] }) => {
+    log.rpcs.push({ at: performance.now(), ids: [...args.p_ids].sort() });
+    if (log.failures > 0) {
+      log.failures -= 1;
+      return { error: new Error('réseau') };
+    }
+    return { error: null };
+  },
+};
+"""
+
+DRIVER = r"""
+import { AstraService } from '@/services/astra/astraService';
+import { log } from '@/config/supabase';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+const profile = { id: 'p', first_name: 'Léa', sun_sign: 'aries', moon_sign: 'leo', ascendant_sign: 'libra',
+  energy_fire: 1, energy_earth: 1, energy_air: 1, energy_water: 1 };
+const result = {};
+
+// LRU sur 2 utilisateurs, puis expiration
+const cache = new AstraService();
+for (const user of ['a', 'b', 'a', 'c', 'a', 'b']) await cache.getMemories(user, 3);
+result.lru = [...log.selects];
+await cache.getMemories('b', 5);
+await sleep(TTL_MS + 20);
+await cache.getMemories('a', 3);
+result.refetched = log.selects.slice(result.lru.length);
+
+// Deux prompts dans la même fenêtre : un seul touch_astra_memories
+const batch = new AstraService();
+const memories = await batch.getMemories('d', 3);
+await Promise.all([
+  batch.generateResponse('u', 'salut', profile, [], memories),
+  batch.generateResponse('u', 'encore', profile, [], [...memories, { ...memories[0], id: 'extra' }]),
+]);
+await sleep(FLUSH_MS * 3);
+result.batch = log.rpcs.map((call) => call.ids);
+
+// Deux échecs puis succès : lot conservé, délais doublés jusqu'au plafond
+log.rpcs.length = 0;
+log.failures = 2;
+const retry = new AstraService();
+const started = performance.now();
+await retry.generateResponse('u', 'salut', profile, [], await retry.getMemories('e', 3));
+await sleep(FLUSH_MS + 2 * FLUSH_MS + MAX_MS + 200);
+result.retries = log.rpcs.map((call) => ({ delay: call.at - started, ids: call.ids }));
+process.stdout.write(JSON.stringify(result));
+"""
+
+TTL_MS, FLUSH_MS, MAX_MS = 60, 20, 50
+
+
+@pytest.fixture
+def openai_env(load_script):
+    """import.meta.env de config/openai.ts, pointé sur le bouchon de bench-astra-stream.py."""
+    server = load_script('bench-astra-stream.py').start_server(0, 0, 0, 3)
+    yield {'VITE_OPENAI_API_KEY': 'test',
+           'VITE_OPENAI_BASE_URL': f'http://127.0.0.1:{server.server_address[1]}/v1'}
+    server.shutdown()
+
+
+@pytest.fixture
+def src(load_script, tmp_path):
+    gen = load_script('generate-structure.py')
+    variables = gen.load_variables()
+    variables['astra']['memory_cache'] = {
+        'ttl_ms': TTL_MS, 'max_users': 2, 'flush_ms': FLUSH_MS, 'flush_max_ms': MAX_MS,
+    }
+    store = gen.TemplateStore()
+    content, _ = gen.Renderer(variables).render(store.read('services', 'astra/astraService.ts'))
+    src = tmp_path / 'src'
+    for rel, text in {
+        'services/astra/astraService.ts': content,
+        'config/supabase.ts': SUPABASE_STUB,
+        'config/openai.ts': (ROOT / 'src' / 'config' / 'openai.ts').read_text(encoding='utf-8'),
+        'types/index.ts': 'export {};\n',
+    }.items():
+        (src / rel).parent.mkdir(parents=True, exist_ok=True)
+        (src / rel).write_text(text, encoding='utf-8')
+    return src
+
+
+def test_memory_cache_and_reference_batching(run_ts, src, openai_env):
+    driver = DRIVER.replace('TTL_MS', str(TTL_MS)).replace('MAX_MS', str(MAX_MS)).replace('FLUSH_MS', str(FLUSH_MS))
+    result = run_ts(driver, src, env=openai_env)
+
+    # b évincé par c (a relu entre-temps), a et c servis depuis le cache
+    assert result['lru'] == ['a', 'b', 'c', 'b']
+    # limite plus grande que celle en cache, puis entrée expirée
+    assert result['refetched'] == ['b', 'a']
+
+    assert result['batch'] == [['d-1', 'd-2', 'd-3', 'extra']]
+
+    retries = result['retries']
+    assert [call['ids'] for call in retries] == [['e-1', 'e-2', 'e-3']] * 3
+    gaps = [later['delay'] - earlier['delay'] for earlier, later in zip(retries, retries[1:])]
+    # 2 × FLUSH_MS puis plafonné à MAX_MS (sans plafond : 4 × FLUSH_MS) ; les
+    # minuteries peuvent partir une fraction de ms plus tôt que mesuré
+    assert gaps[0] > 1.5 * FLUSH_MS
+    assert 0.9 * MAX_MS < gaps[1] < 4 * FLUSH_MS
+
+
+# Historique plus long que le budget : le contexte annonce ce qui est gardé
+BUDGET_DRIVER = r"""
+import { AstraService } from '@/services/astra/astraService';
+
+const profile = { id: 'p', first_name: 'Léa', sun_sign: 'aries', moon_sign: 'leo', ascendant_sign: 'libra',
+  energy_fire: 1, energy_earth: 1, energy_air: 1, energy_water: 1 };
+const history = Array.from({ length: 200 }, (_, i) => ({
+  message_type: i % 2 ? 'astra' : 'user', content: `message numéro ${i} de la conversation`,
+}));
+const messages = new AstraService().buildMessages('et maintenant ?', profile, history, []);
+process.stdout.write(JSON.stringify(messages));
+"""
+
+
+def test_context_reports_kept_history(run_ts, src, openai_env):
+    messages = run_ts(BUDGET_DRIVER, src, env=openai_env)
+    system, context, *history, last = messages
+    assert system['content'].startswith('Tu es ASTRA')
+    assert 0 < len(history) < 200
+    assert history[-1]['content'] == 'message numéro 199 de la conversation'
+    assert re.search(r'(\d+) messages récents', context['content']).group(1) == str(len(history))
+    assert last == {'role': 'user', 'content': 'et maintenant ?'}
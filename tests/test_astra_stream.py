@@ -0,0 +1,86 @@
+import pytest
+
+from conftest import ROOT
+
+# Seule la table astra_messages est simulée : insert().select().single()
+SUPABASE_STUB = """
+export const supabase = {
+  from: (table: string) => ({
+    insert: (row: Record<string, unknown>) => ({
+      select: () => ({ single: async () => ({ data: { id: 'm-1', table, ...row }, error: null }) }),
+    }),
+  }),
+  rpc: async () => ({ error: null }),
+};
+"""
+
+# generateResponse puis streamResponse sur le même bouchon : instants
+# d'arrivée de chaque delta, et de la réponse complète
+DRIVER = r"""
+import { AstraService } from '@/services/astra/astraService';
+
+const profile = { id: 'p', first_name: 'Léa', sun_sign: 'aries', moon_sign: 'leo', ascendant_sign: 'libra',
+  energy_fire: 1, energy_earth: 1, energy_air: 1, energy_water: 1 };
+const service = new AstraService();
+
+// Réponse complète d'abord : la connexion et le client fetch sont chauds pour le flux
+let started = performance.now();
+const reply = await service.generateResponse('u', 'Pourquoi je doute ?', profile, [], []);
+const complete = performance.now() - started;
+
+started = performance.now();
+const deltas = [];
+const stream = service.streamResponse('c-1', 'Pourquoi je doute ?', profile, [], []);
+let step;
+while (!(step = await stream.next()).done) deltas.push({ at: performance.now() - started, text: step.value });
+const streamed = performance.now() - started;
+
+process.stdout.write(JSON.stringify({ deltas, streamed, saved: step.value, reply, complete }));
+"""
+
+FIRST_TOKEN_MS, TOKEN_MS, TOKENS = 150, 30, 10
+
+
+@pytest.fixture
+def stub_server(load_script):
+    bench = load_script('bench-astra-stream.py')
+    server = bench.start_server(0, FIRST_TOKEN_MS, TOKEN_MS, TOKENS)
+    words = bench.REPLY.split(' ')
+    server.deltas = [words[i % len(words)] + ' ' for i in range(TOKENS)]
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def src(load_script, tmp_path):
+    gen = load_script('generate-structure.py')
+    store = gen.TemplateStore()
+    content, _ = gen.Renderer(gen.load_variables()).render(store.read('services', 'astra/astraService.ts'))
+    src = tmp_path / 'src'
+    for rel, text in {
+        'services/astra/astraService.ts': content,
+        'config/openai.ts': (ROOT / 'src' / 'config' / 'openai.ts').read_text(encoding='utf-8'),
+        'config/supabase.ts': SUPABASE_STUB,
+        'types/index.ts': 'export {};\n',
+    }.items():
+        (src / rel).parent.mkdir(parents=True, exist_ok=True)
+        (src / rel).write_text(text, encoding='utf-8')
+    return src
+
+
+def test_stream_response_yields_deltas_before_completion(run_ts, src, stub_server):
+    base_url = f'http://127.0.0.1:{stub_server.server_address[1]}/v1'
+    result = run_ts(DRIVER, src, env={'VITE_OPENAI_API_KEY': 'test', 'VITE_OPENAI_BASE_URL': base_url})
+
+    deltas = result['deltas']
+    assert [delta['text'] for delta in deltas] == stub_server.deltas
+    assert result['saved']['content'] == ''.join(stub_server.deltas)
+    assert result['reply'] == ''.join(stub_server.deltas).strip()
+
+    # Un delta par événement SSE, au rythme du bouchon
+    first, last = deltas[0]['at'], deltas[-1]['at']
+    assert first >= 0.9 * FIRST_TOKEN_MS
+    assert last - first >= 0.8 * TOKEN_MS * (TOKENS - 1)
+    # Premier texte affichable bien avant la réponse complète
+    assert result['complete'] - first >= 0.5 * TOKEN_MS * (TOKENS - 1)
+    assert result['streamed'] >= last
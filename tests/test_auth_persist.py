@@ -0,0 +1,149 @@
+import pytest
+
+# Navigateur simulé : localStorage journalisé, temps libre immédiat,
+# window / document émetteurs d'événements
+BROWSER = r"""
+export const writes = [];
+const store = new Map();
+globalThis.localStorage = {
+  getItem: (name) => (store.has(name) ? store.get(name) : null),
+  setItem: (name, value) => { writes.push(name); store.set(name, String(value)); },
+  removeItem: (name) => store.delete(name),
+};
+globalThis.requestIdleCallback = (callback) => setTimeout(callback, 0);
+globalThis.cancelIdleCallback = (handle) => clearTimeout(handle);
+globalThis.window = new EventTarget();
+globalThis.document = Object.assign(new EventTarget(), { visibilityState: 'visible' });
+"""
+
+STORAGE_DRIVER = r"""
+import { writes } from './browser.mjs';
+import { createIdleStorage } from '@/utils/idleStorage';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+const value = (n) => ({ state: { snapshot: { id: 'u', first_name: `Léa ${n}` } }, version: 1 });
+const storage = createIdleStorage();
+const result = {};
+
+// Rafale de setItem : rien de synchrone, une seule écriture de la dernière valeur
+for (let n = 0; n < 20; n++) storage.setItem('auth', value(n));
+result.during = writes.length;
+await sleep(DEBOUNCE_MS * 3);
+result.burst = writes.length;
+result.stored = JSON.parse(localStorage.getItem('auth'));
+
+// Même JSON que celui déjà stocké : pas de réécriture
+storage.setItem('auth', value(19));
+await sleep(DEBOUNCE_MS * 3);
+result.unchanged = writes.length;
+
+// pagehide vide l'attente sans attendre le debounce
+storage.setItem('auth', value(20));
+window.dispatchEvent(new Event('pagehide'));
+result.pagehide = writes.length;
+result.hydrated = await storage.getItem('auth');
+
+process.stdout.write(JSON.stringify(result));
+process.exit(0);
+"""
+
+# zustand simulé : persist retient ses options pour que le driver les appelle
+ZUSTAND_STUB = r"""
+export const create = () => (init) => {
+  let state;
+  const set = (partial) => { state = { ...state, ...(typeof partial === 'function' ? partial(state) : partial) }; };
+  state = init(set, () => state);
+  const useStore = () => state;
+  useStore.getState = () => state;
+  return useStore;
+};
+"""
+ZUSTAND_MIDDLEWARE_STUB = r"""
+export const persisted = [];
+export const persist = (init, options) => { persisted.push(options); return init; };
+"""
+
+STORE_DRIVER = r"""
+import './browser.mjs';
+import { persisted } from 'zustand/middleware';
+import '@/store/authStore';
+
+const [options] = persisted;
+const profile = {
+  id: 'u', first_name: 'Léa', avatar_url: 'a.webp', sun_sign: 'Aries', moon_sign: 'Leo',
+  ascendant_sign: 'Libra', onboarding_completed: true,
+  natal_chart_data: { sun: { sign: 'Aries', degree: 12.5 } }, photos: ['1.webp', '2.webp'],
+};
+process.stdout.write(JSON.stringify({
+  name: options.name,
+  version: options.version,
+  v0: options.migrate({ user: { id: 'u', email: 'lea@example.com' }, profile }, 0),
+  v0_empty: options.migrate({ user: null, profile: null }, 0),
+  v1: options.migrate({ snapshot: { id: 'u' } }, 1),
+  partialized: options.partialize({ user: { id: 'u' }, profile, snapshot: { id: 'u' }, isLoading: false }),
+}));
+process.exit(0);
+"""
+
+SUPABASE_STUB = """
+export const supabase = { auth: { getSession: async () => ({ data: { session: null } }) } };
+"""
+
+AUTH_SERVICE_STUB = """
+export const authService = { getProfile: async () => null };
+"""
+
+DEBOUNCE_MS = 30
+
+
+@pytest.fixture
+def variables(load_script):
+    variables = load_script('generate-structure.py').load_variables()
+    variables['auth']['persist']['debounce_ms'] = DEBOUNCE_MS
+    return variables
+
+
+@pytest.fixture
+def src(load_script, tmp_path, variables):
+    gen = load_script('generate-structure.py')
+    renderer = gen.Renderer(variables)
+    store = gen.TemplateStore()
+    src = tmp_path / 'src'
+    for rel, text in {
+        'utils/idleStorage.ts': renderer.render(store.read('utils', 'idleStorage.ts'))[0],
+        'store/authStore.ts': renderer.render(store.read('stores', 'authStore.ts'))[0],
+        'config/supabase.ts': SUPABASE_STUB,
+        'services/auth/authService.ts': AUTH_SERVICE_STUB,
+        'types/index.ts': 'export {};\n',
+    }.items():
+        (src / rel).parent.mkdir(parents=True, exist_ok=True)
+        (src / rel).write_text(text, encoding='utf-8')
+    (tmp_path / 'browser.mjs').write_text(BROWSER, encoding='utf-8')
+    return src
+
+
+def test_idle_storage_coalesces_bursts_and_flushes_on_pagehide(run_ts, src):
+    result = run_ts(STORAGE_DRIVER.replace('DEBOUNCE_MS', str(DEBOUNCE_MS)), src)
+    assert result['during'] == 0
+    assert result['burst'] == 1
+    assert result['stored']['state']['snapshot']['first_name'] == 'Léa 19'
+    assert result['unchanged'] == 1
+    assert result['pagehide'] == 2
+    assert result['hydrated']['state']['snapshot']['first_name'] == 'Léa 20'
+
+
+def test_auth_store_migrates_v0_to_snapshot(run_ts, src, variables):
+    settings = variables['auth']['persist']
+    result = run_ts(STORE_DRIVER, src, stubs={
+        'zustand': ZUSTAND_STUB, 'zustand/middleware': ZUSTAND_MIDDLEWARE_STUB,
+    })
+    assert result['name'] == 'astraloves-auth'
+    assert result['version'] == settings['version'] == 1
+    # v0 : { user, profile } complets → aperçu des seuls champs configurés
+    snapshot = result['v0']['snapshot']
+    assert list(snapshot) == settings['snapshot_fields']
+    assert snapshot['first_name'] == 'Léa' and snapshot['onboarding_completed'] is True
+    assert result['v0'] == {'snapshot': snapshot}
+    assert result['v0_empty'] == {'snapshot': None}
+    assert result['v1'] == {'snapshot': {'id': 'u'}}
+    assert result['partialized'] == {'snapshot': {'id': 'u'}}
@@ -0,0 +1,42 @@
+import argparse
+import json
+
+import pytest
+
+
+@pytest.fixture
+def bench(load_script, monkeypatch):
+    bench = load_script('bench-generator.py')
+    # Même module que les autres tests : pas de second generate_structure dans sys.modules
+    monkeypatch.setattr(bench, 'load_generator', lambda: load_script('generate-structure.py'))
+    return bench
+
+
+def suite_args(tmp_path, **overrides):
+    return argparse.Namespace(**{
+        'sizes': 'real', 'runs': 1, 'jobs': 2, 'dir': None, 'output': tmp_path / 'results.json',
+        'baseline': tmp_path / 'baseline.json', 'save_baseline': False, 'threshold': 0.2,
+        'fail_on_regression': False, **overrides,
+    })
+
+
+def test_suite_creates_missing_work_dir(bench, tmp_path, capsys):
+    work = tmp_path / 'absent' / 'work'
+    bench.bench_suite(suite_args(tmp_path, dir=work, save_baseline=True))
+    assert work.is_dir() and list(work.iterdir()) == []
+
+    saved = json.loads((tmp_path / 'baseline.json').read_text(encoding='utf-8'))
+    assert set(saved['results']) == {'startup', 'real'}
+    assert {'full_ms', 'noop_ms', 'single_ms'} <= set(saved['results']['real'])
+    assert saved == json.loads((tmp_path / 'results.json').read_text(encoding='utf-8'))
+
+
+def test_compare_flags_only_regressions_above_threshold(bench, capsys):
+    baseline = {'results': {'real': {'templates': 20, 'full_ms': 100.0, 'noop_ms': 10.0}}}
+    results = {'results': {
+        'real': {'templates': 24, 'full_ms': 119.0, 'noop_ms': 13.0},
+        'synthetic_1000': {'full_ms': 500.0},
+    }}
+    assert bench.compare(results, baseline, 0.2) == ['real.noop_ms']
+    out = capsys.readouterr().out
+    assert 'synthetic_1000.full_ms' in out and 'templates' not in out
@@ -0,0 +1,124 @@
+import io
+import json
+import random
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def bb(load_script):
+    return load_script('bundle-budget.py')
+
+
+# Build Vite minimal : entrée, deux pages chargées par import(), un service
+# importé par AstraPage et le chunk manualChunks "openai" qu'il tire
+MANIFEST = {
+    'index.html': {
+        'file': 'assets/index-a1.js', 'src': 'index.html', 'isEntry': True,
+        'imports': ['_vendor-v1.js'], 'css': ['assets/index-c1.css'],
+        'dynamicImports': ['src/pages/LoginPage.tsx', 'src/pages/AstraPage.tsx'],
+    },
+    '_vendor-v1.js': {'file': 'assets/vendor-v1.js', 'name': 'vendor'},
+    'src/pages/LoginPage.tsx': {
+        'file': 'assets/LoginPage-l1.js', 'src': 'src/pages/LoginPage.tsx', 'isDynamicEntry': True,
+        'imports': ['_vendor-v1.js'],
+    },
+    'src/pages/AstraPage.tsx': {
+        'file': 'assets/AstraPage-p1.js', 'src': 'src/pages/AstraPage.tsx', 'isDynamicEntry': True,
+        'imports': ['_vendor-v1.js', 'src/services/astra/astraService.ts'],
+    },
+    'src/services/astra/astraService.ts': {
+        'file': 'assets/astraService-s1.js', 'src': 'src/services/astra/astraService.ts',
+        'imports': ['_openai-o1.js'],
+    },
+    '_openai-o1.js': {'file': 'assets/openai-o1.js', 'name': 'openai'},
+}
+
+RAW = {
+    'assets/index-a1.js': 10_000, 'assets/index-c1.css': 2_000, 'assets/vendor-v1.js': 40_000,
+    'assets/LoginPage-l1.js': 3_000, 'assets/AstraPage-p1.js': 6_000,
+    'assets/astraService-s1.js': 5_000, 'assets/openai-o1.js': 30_000,
+}
+
+ROUTES = {'LoginPage': '/login', 'AstraPage': '/astra', 'AstroPage': '/astro'}
+
+
+def measured(gzip_ratio: float = 0.25) -> dict:
+    return {name: {'raw': raw, 'gzip': int(raw * gzip_ratio), 'brotli': None} for name, raw in RAW.items()}
+
+
+@pytest.fixture
+def result(bb):
+    gen = bb.load_script('generate-structure.py')
+    return bb.analyse(MANIFEST, measured(), bb.section_owners(gen), ROUTES, 'src/pages')
+
+
+def test_chunks_are_attributed_to_sections(result):
+    assert {name: chunk['section'] for name, chunk in result['chunks'].items()} == {
+        'assets/index-a1.js': 'hors templates', 'assets/index-c1.css': 'hors templates',
+        'assets/vendor-v1.js': 'partagé:vendor',
+        'assets/LoginPage-l1.js': 'pages', 'assets/AstraPage-p1.js': 'pages',
+        'assets/astraService-s1.js': 'services',
+        'assets/openai-o1.js': 'partagé:openai',
+    }
+    assert result['sections']['pages'] == {'raw': 9_000, 'gzip': 2_250, 'brotli': None}
+    assert result['sections']['partagé:openai']['raw'] == 30_000
+
+
+def test_routes_cost_entry_plus_static_imports(result):
+    entry = 10_000 + 2_000 + 40_000
+    # Les import() dynamiques de l'entrée ne comptent pas dans son coût
+    assert result['routes']['(entrée)']['raw'] == entry
+    assert result['routes']['/login']['raw'] == entry + 3_000
+    # AstraPage tire son service et le chunk openai, la page de connexion non
+    assert result['routes']['/astra']['raw'] == entry + 6_000 + 5_000 + 30_000
+    # Page absente du build : pas de ligne
+    assert '/astro' not in result['routes']
+
+
+def test_budgets_flag_routes_over_limit(bb, result):
+    out = io.StringIO()
+    over = bb.check_budgets(result, {'(entrée)': 13, '/astra': 20, '*': 15}, 'gzip', out)
+    assert over == ['/astra']
+    assert '/astra' in out.getvalue() and '❌' in out.getvalue()
+
+
+def test_baseline_comparison_reports_regressions(bb, result):
+    baseline = {'routes': result['routes'], 'sections': result['sections']}
+    assert bb.compare(result, baseline, 'gzip', 0.05, io.StringIO()) == []
+
+    gen = bb.load_script('generate-structure.py')
+    grown = measured()
+    grown['assets/openai-o1.js']['gzip'] *= 2
+    out = io.StringIO()
+    regressions = bb.compare(
+        bb.analyse(MANIFEST, grown, bb.section_owners(gen), ROUTES, 'src/pages'),
+        baseline, 'gzip', 0.05, out,
+    )
+    assert regressions == ['route /astra', 'section partagé:openai']
+    assert '⚠️' in out.getvalue()
+
+
+def test_offline_run_against_local_build(bb, tmp_path, capsys):
+    dist = tmp_path / 'dist'
+    (dist / '.vite').mkdir(parents=True)
+    (dist / '.vite' / 'manifest.json').write_text(json.dumps(MANIFEST), encoding='utf-8')
+    (dist / 'assets').mkdir()
+    for name, raw in RAW.items():
+        (dist / name).write_bytes(bytes(range(256)) * (raw // 256))
+    config = tmp_path / 'budget.json'
+    config.write_text(json.dumps({'metric': 'gzip', 'budgets_kib': {'*': 500}}), encoding='utf-8')
+    argv = ['--dist', str(dist), '--config', str(config), '--baseline', str(tmp_path / 'baseline.json')]
+
+    result = bb.main([*argv, '--save-baseline'])
+    chunk = result['chunks']['assets/openai-o1.js']
+    assert chunk['raw'] == 30_000 - 30_000 % 256 and 0 < chunk['gzip'] < chunk['raw']
+    assert bb.main(argv)['routes'] == result['routes']
+    assert '✅ 3 route(s) dans le budget (gzip)' in capsys.readouterr().out
+
+    # Le chunk openai grossit : /astra régresse, le build échoue
+    (dist / 'assets' / 'openai-o1.js').write_bytes(random.Random(0).randbytes(60_000))
+    with pytest.raises(SystemExit) as exit:
+        bb.main(argv)
+    assert exit.value.code == 1
+    assert "régression(s) > 5% : route /astra, section partagé:openai" in capsys.readouterr().out
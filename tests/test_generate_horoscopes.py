@@ -0,0 +1,102 @@
+import asyncio
+import datetime
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def gh(load_script):
+    return load_script('generate-horoscopes.py')
+
+
+class FakeClient:
+    """complete() compté, avec le pic d'appels simultanés."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.calls = 0
+        self.prompts = []
+        self.running = self.peak = 0
+        self.lock = threading.Lock()
+
+    def complete(self, prompt: str) -> str:
+        with self.lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return f'texte {len(self.prompts)}'
+
+
+def test_group_profiles_by_sign_combination(gh):
+    groups, skipped = gh.group_profiles([
+        {'id': 'a', 'sun_sign': 'Aries', 'moon_sign': 'leo', 'ascendant_sign': ' libra '},
+        {'id': 'b', 'sun_sign': 'aries', 'moon_sign': 'LEO', 'ascendant_sign': 'libra'},
+        {'id': 'c', 'sun_sign': 'aries', 'moon_sign': 'leo', 'ascendant_sign': 'virgo'},
+        {'id': 'd', 'sun_sign': 'aries', 'moon_sign': None, 'ascendant_sign': 'virgo'},
+        {'id': 'e', 'sun_sign': '', 'moon_sign': 'leo', 'ascendant_sign': 'virgo'},
+    ])
+    assert groups == {('aries', 'leo', 'libra'): ['a', 'b'], ('aries', 'leo', 'virgo'): ['c']}
+    assert skipped == 2
+
+
+def test_synthetic_profiles_share_at_most_1728_prompts(gh):
+    groups, _ = gh.group_profiles(gh.synthetic_rows(20_000))
+    assert len(groups) <= 12 ** 3
+    assert sum(map(len, groups.values())) == 20_000
+
+
+@pytest.mark.parametrize('horoscope_type, start, end', [
+    ('daily', '2024-02-14', '2024-02-14'),
+    ('weekly', '2024-02-12', '2024-02-18'),
+    ('monthly', '2024-02-01', '2024-02-29'),
+])
+def test_period_bounds(gh, horoscope_type, start, end):
+    bounds = gh.period_bounds(horoscope_type, datetime.date(2024, 2, 14))
+    assert bounds == (datetime.date.fromisoformat(start), datetime.date.fromisoformat(end))
+
+
+def test_cached_keys_are_not_regenerated(gh, tmp_path):
+    start = datetime.date(2024, 2, 12)
+    keys = [(sun, 'leo', 'libra') for sun in gh.SIGNS]
+    cache = gh.ContentCache(tmp_path, 'weekly', start)
+    cache.put(keys[0], 'déjà là')
+
+    client = FakeClient()
+    contents = asyncio.run(gh.generate_contents(keys, 'weekly', client, cache, concurrency=3))
+    assert client.calls == len(keys) - 1
+    assert client.peak <= 3
+    assert contents[keys[0]] == 'déjà là'
+    assert all('cette semaine' in prompt for prompt in client.prompts)
+
+    # Relecture depuis le disque : même période, plus aucun appel
+    cache = gh.ContentCache(tmp_path, 'weekly', start)
+    client = FakeClient()
+    assert asyncio.run(gh.generate_contents(keys, 'weekly', client, cache, concurrency=3)) == contents
+    assert client.calls == 0
+    # Autre période : autre fichier de cache
+    assert gh.ContentCache(tmp_path, 'weekly', start + datetime.timedelta(days=7)).entries == {}
+
+
+def test_job_against_stub_writes_one_row_per_profile(gh, tmp_path):
+    argv = ['--synthetic', '500', '--stub', '0', '--cache-dir', str(tmp_path / 'cache'),
+            '--date', '2024-02-14', '-o', str(tmp_path / 'horoscopes.copy')]
+    stats = gh.main(argv)
+    assert stats['calls'] == stats['keys'] < stats['profiles'] == 500
+    assert stats['cached'] == 0
+
+    lines = (tmp_path / 'horoscopes.copy').read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 500
+    user_id, horoscope_type, start, end, content = lines[0].split('\t')
+    assert (horoscope_type, start, end) == ('daily', '2024-02-14', '2024-02-14')
+    assert content
+
+    # Deuxième passage sur la même période : tout vient du cache
+    stats = gh.main(argv)
+    assert stats['calls'] == 0 and stats['cached'] == stats['keys']
+    assert (tmp_path / 'horoscopes.copy').read_text(encoding='utf-8').splitlines() == lines
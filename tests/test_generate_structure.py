@@ -0,0 +1,666 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+import pytest
+
+from conftest import ROOT
+
+
+@pytest.fixture(scope='module')
+def gen(load_script):
+    return load_script('generate-structure.py')
+
+
+@pytest.fixture
+def generate(gen, tmp_path):
+    """generate(*args) : génère dans tmp_path/out/src avec une copie des templates.
+
+    Retourne la sortie console ; si main() sort (--plan, ...), elle est
+    attachée au SystemExit (exit.output).
+    """
+    templates = tmp_path / 'templates'
+    shutil.copytree(ROOT / 'templates', templates)
+
+    def run(*args: str) -> str:
+        argv = ['--base-dir', str(tmp_path / 'out' / 'src'), '--templates-dir', str(templates), *args]
+        out = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out):
+                gen.main(argv)
+        except SystemExit as exit:
+            exit.output = out.getvalue()
+            raise
+        return out.getvalue()
+
+    run.templates = templates
+    run.src = tmp_path / 'out' / 'src'
+    return run
+
+
+def snapshot(root):
+    return {path.relative_to(root): path.read_bytes() for path in sorted(root.rglob('*')) if path.is_file()}
+
+
+def written(out: str) -> int:
+    return int(re.search(r'\((\d+) fichier\(s\) écrit\(s\)\)', out).group(1))
+
+
+def test_second_run_writes_nothing(generate):
+    assert written(generate()) > 0
+    assert written(generate()) == 0
+
+
+def test_manifest_hashes_match_outputs(generate):
+    generate('-q')
+    root = generate.src.parent
+    manifest = json.loads((root / '.generate-structure-manifest.json').read_text(encoding='utf-8'))['files']
+    outputs = {path.as_posix() for path in snapshot(root) if not path.parts[0].startswith('.')}
+    assert set(manifest) == outputs
+    for rel, entry in manifest.items():
+        data = (root / rel).read_bytes()
+        assert entry['sha256'] == hashlib.sha256(data).hexdigest() and entry['size'] == len(data)
+
+
+def test_touched_output_is_rehashed_not_rewritten(generate):
+    generate('-q')
+    target = generate.src / 'utils' / 'cn.ts'
+    st = target.stat()
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert written(generate()) == 0
+    assert target.stat().st_mtime_ns == st.st_mtime_ns + 10**9
+
+
+def test_hand_edited_output_is_restored(generate):
+    generate('-q')
+    target = generate.src / 'utils' / 'cn.ts'
+    original = target.read_bytes()
+    target.write_text('// modifié à la main\n', encoding='utf-8')
+    assert written(generate()) == 1
+    assert target.read_bytes() == original
+
+
+def synthetic_tasks(gen, root, count: int = 40):
+    gen.set_base_dir(root / 'src')
+    return [
+        gen.Task(f's{i % 3}', gen.BASE_DIR / f'd{i % 5}' / f'f{i:02d}.ts', f'export const n = {i};\n')
+        for i in range(count)
+    ]
+
+
+def test_parallel_emission_matches_sequential(gen, tmp_path):
+    results = {}
+    for jobs in (1, 8):
+        root = tmp_path / f'jobs{jobs}'
+        tasks = synthetic_tasks(gen, root)
+        report = gen.RunReport(console=False)
+        summary = gen.run_tasks(tasks, {}, jobs=jobs, report=report)
+        assert [event.path for event in report.events] == [
+            task.path.relative_to(root).as_posix() for task in tasks
+        ]
+        results[jobs] = summary, snapshot(root)
+    assert results[1] == results[8]
+    summary, files = results[8]
+    assert summary == {'s0': {'written': 14, 'unchanged': 0}, 's1': {'written': 13, 'unchanged': 0},
+                       's2': {'written': 13, 'unchanged': 0}}
+    assert len(files) == 40
+
+
+def test_parallel_emission_skips_unchanged(gen, tmp_path):
+    tasks = synthetic_tasks(gen, tmp_path)
+    manifest = {}
+    gen.run_tasks(tasks, manifest, jobs=8)
+    tasks[7] = tasks[7]._replace(content='export const n = -7;\n')
+    summary = gen.run_tasks(tasks, manifest, jobs=8)
+    assert sum(counts['written'] for counts in summary.values()) == 1
+    assert sum(counts['unchanged'] for counts in summary.values()) == 39
+
+
+def temps(root):
+    return [path for path in root.rglob('*') if path.name.endswith('.gen-tmp')]
+
+
+@pytest.mark.parametrize('durability', ['off', 'batch', 'strict'])
+def test_durability_modes_write_everything_atomically(gen, tmp_path, durability):
+    tasks = synthetic_tasks(gen, tmp_path)
+    gen.run_tasks(tasks, {}, jobs=4, durability=durability)
+    assert all(task.path.read_text(encoding='utf-8') == task.content for task in tasks)
+    assert temps(tmp_path) == []
+
+
+def test_interrupted_batch_keeps_old_files_and_no_temps(gen, tmp_path, monkeypatch):
+    tasks = synthetic_tasks(gen, tmp_path)
+    gen.run_tasks(tasks, {}, jobs=4)
+    before = snapshot(tmp_path)
+
+    def interrupted(staged, durability):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(gen, 'commit_staged', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        gen.run_tasks([task._replace(content='// v2\n') for task in tasks], {}, jobs=4, durability='batch')
+    assert snapshot(tmp_path) == before
+    assert temps(tmp_path) == []
+
+
+def test_stale_temps_are_removed(gen, tmp_path):
+    tasks = synthetic_tasks(gen, tmp_path)
+    stale = tasks[0].path.parent / f'.{tasks[0].path.name}.999.deadbeef.gen-tmp'
+    stale.parent.mkdir(parents=True)
+    stale.write_text('à moitié écrit', encoding='utf-8')
+    gen.run_tasks(tasks, {}, jobs=4)
+    assert temps(tmp_path) == []
+
+
+def test_generation_lock_serialises_runs(gen, tmp_path, capsys):
+    gen.set_base_dir(tmp_path / 'src')
+    entered = []
+
+    def second():
+        with gen.generation_lock():
+            entered.append(time.perf_counter())
+
+    with gen.generation_lock():
+        thread = threading.Thread(target=second)
+        thread.start()
+        time.sleep(0.2)
+        assert entered == []
+        released = time.perf_counter()
+    thread.join(5)
+    assert entered and entered[0] >= released
+    assert 'attente du verrou' in capsys.readouterr().out
+
+
+def outputs(root):
+    return {path.as_posix() for path in snapshot(root) if not path.parts[0].startswith('.')}
+
+
+def test_only_limits_outputs_and_template_reads(gen, generate, monkeypatch):
+    reads = []
+    read = gen.TemplateStore.read
+    monkeypatch.setattr(gen.TemplateStore, 'read', lambda self, section, name: reads.append(section)
+                        or read(self, section, name))
+    generate('-q', '--only', 'utils,hooks')
+    assert outputs(generate.src.parent) == {
+        'src/utils/cn.ts', 'src/utils/idleStorage.ts', 'src/hooks/useAuth.ts', 'src/hooks/useSubscription.ts',
+    }
+    assert set(reads) == {'utils', 'hooks'}
+
+
+def test_glob_selects_outputs_across_sections(generate):
+    generate('-q', '--glob', 'src/pages/Astra*.tsx', '--glob', '*.sql')
+    assert outputs(generate.src.parent) == {
+        'src/pages/AstraPage.tsx', 'migration-quota-rpc.sql', 'migration-memory-touch.sql',
+    }
+
+
+def test_unknown_section_is_rejected(generate):
+    with pytest.raises(SystemExit) as exit:
+        generate('--only', 'utils,nope')
+    assert 'nope' in str(exit.value.code) and 'utils' in str(exit.value.code)
+    assert not generate.src.parent.exists()
+
+
+def test_renderer_substitutes_and_memoises(gen, monkeypatch):
+    renderer = gen.Renderer({'quota': {'daily': 3, 'label': 'Jour'}, 'flags': [True], 'other': 1})
+    source = "const N = {{ quota.daily }}; // {{quota.label}}\nconst F = {{ flags }};\n"
+    content, key = renderer.render(source, 'a.ts')
+    assert content == "const N = 3; // Jour\nconst F = [true];\n"
+
+    compiled = []
+    compile_template = gen.compile_template
+    monkeypatch.setattr(gen, 'compile_template', lambda text: compiled.append(text) or compile_template(text))
+    assert renderer.render(source, 'a.ts') == (content, key)
+    assert compiled == []
+
+    # La clé ne dépend que des variables utilisées par le template
+    renderer.variables['other'] = 2
+    assert renderer.render(source, 'a.ts')[1] == key
+    renderer.variables['quota']['daily'] = 4
+    content, changed = renderer.render(source, 'a.ts')
+    assert changed != key and content.startswith('const N = 4;')
+
+
+def test_renderer_rejects_unknown_variables(gen):
+    with pytest.raises(gen.TemplateError, match=r'quota\.missing.*hooks/useX\.ts'):
+        gen.Renderer({'quota': {}}).render('{{ quota.missing }}', 'hooks/useX.ts')
+
+
+def test_config_variables_reach_outputs(generate, tmp_path):
+    config = json.loads((generate.templates / 'variables.json').read_text(encoding='utf-8'))
+    config['astra']['memory_cache']['flush_ms'] = 4321
+    (tmp_path / 'variables.json').write_text(json.dumps(config), encoding='utf-8')
+    generate('-q', '--only', 'services', '--config', str(tmp_path / 'variables.json'))
+    service = (generate.src / 'services' / 'astra' / 'astraService.ts').read_text(encoding='utf-8')
+    assert 'const MEMORY_FLUSH_MS = 4321;' in service
+
+
+class ScriptedWatcher:
+    """Chaque attente sans délai joue l'étape suivante (modifie des fichiers,
+    retourne les chemins changés) ; plus d'étape : Ctrl+C."""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+
+    def wait(self, timeout):
+        if timeout is not None:
+            return set()
+        if not self.steps:
+            raise KeyboardInterrupt
+        return self.steps.pop(0)()
+
+    def close(self):
+        pass
+
+
+def edit(path, old, new):
+    path.write_text(path.read_text(encoding='utf-8').replace(old, new), encoding='utf-8')
+    return {path.resolve()}
+
+
+def test_watch_rebuilds_only_affected_outputs(gen, generate, monkeypatch):
+    templates = generate.templates.resolve()
+    config = templates / 'variables.json'
+    steps = [
+        lambda: edit(templates / 'utils' / 'cn.ts.tpl', 'export function cn', '// édité\nexport function cn'),
+        lambda: (templates / 'NOTES.txt').write_text('rien', encoding='utf-8') and {templates / 'NOTES.txt'},
+        lambda: edit(config, '"flush_ms": 30000', '"flush_ms": 45000'),
+    ]
+    assert '"flush_ms": 30000' in config.read_text(encoding='utf-8')
+    monkeypatch.setattr(gen, 'make_watcher', lambda directories, poll=False: ScriptedWatcher(steps))
+    out = generate('--watch')
+
+    rebuilds = [line for line in out.splitlines() if line.startswith('⚡')]
+    # Le template édité, puis les deux sorties qui lisent flush_ms (service et migration)
+    assert [line.split(' en ')[0] for line in rebuilds] == ['⚡ 1 fichier(s) écrit(s)', '⚡ 2 fichier(s) écrit(s)']
+    assert '// édité' in (generate.src / 'utils' / 'cn.ts').read_text(encoding='utf-8')
+    assert 'MEMORY_FLUSH_MS = 45000;' in (generate.src / 'services' / 'astra' / 'astraService.ts').read_text(
+        encoding='utf-8')
+    assert 'Fin de la surveillance' in out
+
+
+@pytest.mark.parametrize('poll', [False, True])
+def test_watchers_report_changed_paths(gen, tmp_path, poll):
+    (tmp_path / 'a.tpl').write_text('1', encoding='utf-8')
+    watcher = gen.make_watcher([tmp_path], poll=poll)
+    assert isinstance(watcher, gen.PollingWatcher) == poll
+    try:
+        (tmp_path / 'a.tpl').write_text('22', encoding='utf-8')
+        assert tmp_path / 'a.tpl' in watcher.wait(2)
+        (tmp_path / 'sub').mkdir()
+        watcher.wait(0.3)
+        (tmp_path / 'sub' / 'b.tpl').write_text('3', encoding='utf-8')
+        changed = set()
+        deadline = time.monotonic() + 2
+        while tmp_path / 'sub' / 'b.tpl' not in changed and time.monotonic() < deadline:
+            changed |= watcher.wait(0.5)
+        assert tmp_path / 'sub' / 'b.tpl' in changed
+    finally:
+        watcher.close()
+
+
+def test_json_report_and_event_stream(generate, tmp_path):
+    events_path = tmp_path / 'events.jsonl'
+    report = json.loads(generate('--report', 'json', '--events', str(events_path)))
+    events = [json.loads(line) for line in events_path.read_text(encoding='utf-8').splitlines()]
+
+    outputs_count = len(outputs(generate.src.parent))
+    assert report['totals']['files'] == report['totals']['written'] == len(events) == outputs_count
+    assert report['totals']['bytes_written'] == sum(event['bytes_written'] for event in events)
+    assert {'validate', 'render', 'check', 'write', 'manifest'} <= set(report['phases'])
+    assert report['wall_ms'] >= report['phases']['write']['wall_ms']
+    event = next(event for event in events if event['path'] == 'src/utils/cn.ts')
+    assert event['section'] == 'utils' and not event['skipped']
+    assert set(event['phases']['render']) == {'wall_ms', 'cpu_ms'}
+
+    report = json.loads(generate('--report', 'json', '--events', str(events_path)))
+    events = [json.loads(line) for line in events_path.read_text(encoding='utf-8').splitlines()]
+    assert report['totals']['skipped'] == outputs_count and report['totals']['bytes_written'] == 0
+    assert all(event['skipped'] for event in events)
+    assert 'manifest' not in report['phases']
+
+
+def test_text_report_lists_sections_and_written_files(generate):
+    out = generate()
+    assert '🛠️ Utils...' in out and '✅ src/utils/cn.ts' in out
+    assert re.search(r'⏱️ [\d.]+ ms — cumul par phase : validate', out)
+    assert '✅' not in generate()
+
+
+def test_sql_tokens_stream_across_lines(gen):
+    lines = [
+        "CREATE TABLE \"Quoted\" ( -- commentaire ; ignoré\n",
+        "  note text DEFAULT 'l''été; /* pas un commentaire */',\n",
+        "  /* commentaire\n",
+        "     sur deux lignes ; */ n numeric(10, 2)::text\n",
+        ");\n",
+        "CREATE FUNCTION f() RETURNS trigger AS $body$\n",
+        "BEGIN; RETURN NEW; END;\n",
+        "$body$ LANGUAGE plpgsql;\n",
+    ]
+    tokens = list(gen.sql_tokens(iter(lines)))
+    assert tokens[:5] == [
+        ('word', 'create'), ('word', 'table'), ('word', 'Quoted'), ('op', '('), ('word', 'note'),
+    ]
+    assert ('string', "l'été; /* pas un commentaire */") in tokens
+    assert ('word', 'commentaire') not in tokens
+    assert ('op', '::') in tokens and ('number', '10') in tokens
+    # Le corps $body$ ... $body$ est une seule chaîne : ses ';' ne coupent rien
+    statements = list(gen.sql_statements(iter(tokens)))
+    assert len(statements) == 2
+    assert ('word', 'plpgsql') in statements[1]
+
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS profiles (
+  id uuid PRIMARY KEY REFERENCES auth.users(id),
+  first_name text NOT NULL,
+  photos text[] DEFAULT '{}',
+  latitude decimal(10, 8),
+  natal_chart_data jsonb
+);
+CREATE TABLE IF NOT EXISTS quotas (
+  user_id uuid NOT NULL,
+  resets_at date NOT NULL DEFAULT current_date,
+  used int DEFAULT 0,
+  CONSTRAINT quotas_unique UNIQUE (user_id, resets_at)
+);
+CREATE INDEX IF NOT EXISTS idx_quotas_reset ON public.quotas (user_id, resets_at DESC) WHERE used > 0;
+"""
+
+# Variante plus ancienne : IF NOT EXISTS garde la première définition
+VARIANT_SQL = """
+CREATE TABLE IF NOT EXISTS profiles (id uuid PRIMARY KEY, legacy text);
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS onboarding_completed boolean NOT NULL DEFAULT false;
+"""
+
+
+@pytest.fixture
+def schema_files(tmp_path):
+    paths = [tmp_path / 'schema.sql', tmp_path / 'variant.sql']
+    for path, sql in zip(paths, (SCHEMA_SQL, VARIANT_SQL)):
+        path.write_text(sql, encoding='utf-8')
+    return paths
+
+
+def test_schema_variants_parse_to_row_insert_update_types(gen, schema_files):
+    schema = gen.parse_schema(schema_files)
+    assert [column['name'] for column in schema['tables']['profiles']['columns']] == [
+        'id', 'first_name', 'photos', 'latitude', 'natal_chart_data', 'onboarding_completed',
+    ]
+    assert schema['indexes']['idx_quotas_reset'] == {
+        'table': 'quotas', 'columns': [['user_id', False], ['resets_at', True]], 'unique': False,
+        'where': 'used > 0', 'method': None, 'source': 'schema.sql',
+    }
+    assert schema['indexes']['quotas_unique']['columns'] == [['user_id', False], ['resets_at', False]]
+
+    types = gen.render_supabase_types(schema, schema_files)
+    assert (
+        "      profiles: {\n"
+        "        Row: {\n"
+        "          id: string\n"
+        "          first_name: string\n"
+        "          photos: string[] | null\n"
+        "          latitude: number | null\n"
+        "          natal_chart_data: Json | null\n"
+        "          onboarding_completed: boolean\n"
+        "        }\n"
+        "        Insert: {\n"
+        "          id: string\n"
+        "          first_name: string\n"
+        "          photos?: string[] | null\n"
+        "          latitude?: number | null\n"
+        "          natal_chart_data?: Json | null\n"
+        "          onboarding_completed?: boolean\n"
+        "        }\n"
+    ) in types
+    assert "          resets_at?: string\n" in types
+    assert "export type Tables<T extends keyof PublicTables> = PublicTables[T]['Row']" in types
+
+
+def test_schema_cache_skips_reparse_until_contents_change(gen, tmp_path, schema_files, monkeypatch):
+    gen.set_base_dir(tmp_path / 'src')
+    parses = []
+    parse_schema = gen.parse_schema
+    monkeypatch.setattr(gen, 'parse_schema', lambda sources: parses.append(1) or parse_schema(sources))
+
+    schema, key = gen.load_schema(schema_files)
+    assert len(parses) == 1 and (gen.CACHE_DIR / 'schema.json').exists()
+    assert gen.load_schema(schema_files) == (schema, key)
+    # mtime seul : re-hash, même clé, pas de re-parse
+    st = schema_files[0].stat()
+    os.utime(schema_files[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert gen.load_schema(schema_files) == (schema, key)
+    assert len(parses) == 1
+
+    with open(schema_files[1], 'a', encoding='utf-8') as f:
+        f.write("ALTER TABLE profiles ADD COLUMN bio text;\n")
+    schema, changed = gen.load_schema(schema_files)
+    assert len(parses) == 2 and changed != key
+    assert schema['tables']['profiles']['columns'][-1]['name'] == 'bio'
+
+
+def test_generated_types_follow_repo_schema(generate):
+    generate('--only', 'types', '-q')
+    types = (generate.src / 'types' / 'supabase.types.ts').read_text(encoding='utf-8')
+    assert types.startswith('// Généré par generate-structure.py depuis supabase-schema-complete.sql, ')
+    assert (
+        "      astra_memory: {\n"
+        "        Row: {\n"
+        "          id: string\n"
+        "          user_id: string\n"
+        "          memory_type: string\n"
+        "          content: string\n"
+        "          importance: number\n"
+        "          created_at: string | null\n"
+    ) in types
+
+QUERIES_TS = """
+export class MemoryService {
+  async getMemories(userId: string) {
+    const { data } = await supabase
+      .from('astra_memory')
+      .select('id, content')
+      .eq('user_id', userId)
+      .order('importance', { ascending: false })
+      .order('last_referenced', { ascending: false })
+      .limit(5);
+  }
+
+  async getQuota(userId: string, today: string) {
+    return supabase.from('quotas').select('*').eq('user_id', userId).gte('resets_at', today).maybeSingle();
+  }
+
+  async visibleProfiles(sign: string) {
+    return supabase.from('profiles').select('id').eq('is_banned', false).contains('signs', [sign]);
+  }
+
+  async log(row: object) {
+    return supabase.from('quotas').insert(row);
+  }
+}
+"""
+
+ADVISOR_SQL = """
+CREATE TABLE astra_memory (id uuid PRIMARY KEY, user_id uuid NOT NULL, content text,
+  importance int NOT NULL, last_referenced timestamptz);
+CREATE TABLE quotas (user_id uuid NOT NULL, resets_at date NOT NULL);
+CREATE TABLE profiles (id uuid PRIMARY KEY, is_banned boolean DEFAULT false, signs text[]);
+CREATE INDEX idx_astra_memory_user ON astra_memory (user_id, importance DESC);
+"""
+
+
+def test_query_shapes_are_extracted_from_chains(gen):
+    memories, quota, profiles = gen.extract_queries(QUERIES_TS, 'memoryService.ts')
+    assert memories == gen.QueryShape(
+        'memoryService.ts:4', 'getMemories', 'astra_memory', 'select',
+        (('user_id', 'eq', None),), (), (('importance', True), ('last_referenced', True)), True,
+    )
+    assert quota.owner == 'getQuota' and quota.limit
+    assert quota.filters == (('user_id', 'eq', None), ('resets_at', 'gte', None))
+    assert profiles.filters == (('is_banned', 'eq', 'false'), ('signs', 'contains', None))
+
+
+def test_advisor_classifies_queries_and_proposes_indexes(gen, tmp_path):
+    (tmp_path / 'schema.sql').write_text(ADVISOR_SQL, encoding='utf-8')
+    schema = gen.parse_schema([tmp_path / 'schema.sql'])
+    memories, quota, profiles = gen.extract_queries(QUERIES_TS, 'memoryService.ts')
+
+    # L'index (user_id, importance DESC) sert l'égalité mais pas le second tri
+    status, reason, [index] = gen.advise_query(memories, schema)
+    assert (status, reason) == ('partiel', 'idx_astra_memory_user : tri en mémoire')
+    assert index.sql() == (
+        'CREATE INDEX IF NOT EXISTS idx_astra_memory_user_id_importance_last_referenced '
+        'ON astra_memory (user_id, importance DESC, last_referenced DESC);'
+    )
+    status, _, [index] = gen.advise_query(quota, schema)
+    assert status == 'seq'
+    assert index.columns == (('user_id', False), ('resets_at', False))
+    # Égalité sur une constante → prédicat d'index partiel, tableau → GIN
+    status, _, [index] = gen.advise_query(profiles, schema)
+    assert status == 'seq'
+    assert index.sql() == (
+        'CREATE INDEX IF NOT EXISTS idx_profiles_signs_where_is_banned '
+        'ON profiles USING gin (signs) WHERE is_banned = false;'
+    )
+
+    # Une fois l'index proposé créé, la requête est couverte
+    (tmp_path / 'fix.sql').write_text(gen.advise_query(memories, schema)[2][0].sql(), encoding='utf-8')
+    schema = gen.parse_schema([tmp_path / 'schema.sql', tmp_path / 'fix.sql'])
+    assert gen.advise_query(memories, schema) == (
+        'ok', 'idx_astra_memory_user_id_importance_last_referenced', [],
+    )
+
+
+def test_advise_matches_committed_migration(gen, tmp_path):
+    output = tmp_path / 'advice.sql'
+    gen.set_base_dir(ROOT / 'src')
+    with gen.read_only_caches():
+        counts = gen.advise(gen.TemplateStore(), gen.load_variables(), output, out=io.StringIO())
+    assert output.read_bytes() == (ROOT / 'migration-query-indexes.sql').read_bytes()
+    assert counts['indexes'] == output.read_text(encoding='utf-8').count('CREATE INDEX')
+    assert counts['seq'] + counts['partiel'] > 0
+
+def test_noop_run_reuses_cached_projection(gen, generate, monkeypatch):
+    generate('-q')
+    first = snapshot(generate.src)
+
+    calls = []
+    monkeypatch.setattr(gen, 'referenced_names', lambda paths: calls.append(paths) or set())
+    monkeypatch.setattr(gen, 'parse_schema', lambda sources: pytest.fail("schéma reparsé"))
+    generate('-q')
+    assert calls == []
+    assert snapshot(generate.src) == first
+
+
+def test_template_change_recomputes_projection_key(gen, generate, monkeypatch):
+    generate('-q')
+    referenced_names = gen.referenced_names
+    calls = []
+    monkeypatch.setattr(gen, 'referenced_names', lambda paths: calls.append(paths) or referenced_names(paths))
+    template = next(generate.templates.rglob('*.ts.tpl'))
+    template.write_text(template.read_text(encoding='utf-8') + '// modifié\n', encoding='utf-8')
+    generate('-q')
+    assert len(calls) == 1
+
+
+def test_plan_reports_each_status(generate):
+    generate('-q')
+    target = generate.src / 'utils' / 'cn.ts'
+    target.write_text('// modifié à la main\n', encoding='utf-8')
+    (generate.src / 'hooks' / 'useAuth.ts').unlink()
+
+    with pytest.raises(SystemExit) as exit:
+        generate('--plan')
+    lines = exit.value.output.splitlines()
+    assert exit.value.code == 1
+    assert '~ overwrite src/utils/cn.ts' in lines
+    assert '+ create    src/hooks/useAuth.ts' in lines
+    assert '= unchanged src/utils/idleStorage.ts' in lines
+    assert target.read_text(encoding='utf-8') == '// modifié à la main\n'
+
+    with pytest.raises(SystemExit) as exit:
+        generate('--diff', '--only', 'utils')
+    lines = exit.value.output.splitlines()
+    assert '-// modifié à la main' in lines
+    assert any(line.startswith('+export function cn') for line in lines)
+
+    generate('-q')
+    with pytest.raises(SystemExit) as exit:
+        generate('--plan')
+    assert exit.value.code == 0
+
+
+def test_plan_writes_nothing(generate):
+    with pytest.raises(SystemExit) as exit:
+        generate('--plan')
+    assert exit.value.code == 1
+    assert not generate.src.parent.exists()
+
+
+def test_diff_leaves_caches_untouched(generate):
+    generate('-q')
+    caches = snapshot(generate.src.parent)
+    template = generate.templates / 'services' / 'astra' / 'astraService.ts.tpl'
+    template.write_text(template.read_text(encoding='utf-8') + '// modifié\n', encoding='utf-8')
+    with pytest.raises(SystemExit):
+        generate('--diff')
+    assert snapshot(generate.src.parent) == caches
+
+
+@pytest.fixture
+def app(generate):
+    """Arbre cible avec index.html : le graphe d'imports part de src/main.tsx."""
+    shutil.copytree(ROOT / 'src', generate.src)
+    shutil.copy(ROOT / 'index.html', generate.src.parent / 'index.html')
+    return generate
+
+
+def test_pruning_is_opt_in(app):
+    hook = app.src / 'hooks' / 'useSubscription.ts'
+    hook.unlink()
+    app('-q')
+    assert hook.exists()
+
+
+def test_prune_keeps_existing_unimported_output(app):
+    hook = app.src / 'hooks' / 'useSubscription.ts'
+    template = app.templates / 'hooks' / 'useSubscription.ts.tpl'
+    template.write_text(template.read_text(encoding='utf-8') + '// modifié\n', encoding='utf-8')
+    app('-q', '--prune')
+    assert hook.read_text(encoding='utf-8').endswith('// modifié\n')
+
+
+def test_prune_skips_new_unimported_output(app):
+    hook = app.src / 'hooks' / 'useSubscription.ts'
+    hook.unlink()
+    out = app('--prune')
+    assert not hook.exists()
+    assert 'hooks/useSubscription.ts' in out
+
+
+@pytest.mark.parametrize('source', [
+    'const f = <T,>(x: T) => x;\n',
+    'const g = <T extends object>(x: T): T => x;\n',
+    'const h = <K extends keyof Props = "id", V,>(k: K, v: V) => [k, v];\n',
+    'const e = <Foo<string> value="a" />;\n',
+    'const n = <List<Array<Item>> items={items}>{(item) => <Row<Item> row={item} />}</List>;\n',
+    'const b = <Foo extends />;\n',
+])
+def test_scanner_accepts_generic_tsx(gen, source):
+    assert gen.check_source('a.tsx', source, jsx=True) is None
+
+
+@pytest.mark.parametrize('source, line', [
+    ('const f = <T,>(x: T) => {\n  return x;\n', 1),
+    ('const e = <Foo<string> value="a">\n', 1),
+    ('const g = <T extends object(x: T) => x;\n', 1),
+])
+def test_scanner_still_rejects_broken_tsx(gen, source, line):
+    error = gen.check_source('a.tsx', source, jsx=True)
+    assert error is not None and error.startswith(f'a.tsx:{line}:')
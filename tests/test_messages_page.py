@@ -0,0 +1,129 @@
+import pytest
+
+# PostgREST en mémoire pour la table messages : eq, le or() du curseur
+# (created_at, id), order et limit ; chaque requête est journalisée
+SUPABASE_STUB = r"""
+export const queries: any[] = [];
+
+const CURSOR_RE = /^created_at\.lt\."([^"]+)",and\(created_at\.eq\."([^"]+)",id\.lt\.([^)]+)\)$/;
+
+function run(query: any) {
+  let rows = (globalThis as any).messages.filter((row: any) =>
+    query.filters.every(([column, value]: [string, string]) => row[column] === value));
+  if (query.or !== null) {
+    const match = CURSOR_RE.exec(query.or);
+    if (!match || match[1] !== match[2]) throw new Error(`or() inattendu : ${query.or}`);
+    const [, at, , id] = match;
+    rows = rows.filter((row: any) => row.created_at < at || (row.created_at === at && row.id < id));
+  }
+  rows.sort((a: any, b: any) => {
+    for (const [column, ascending] of query.order) {
+      if (a[column] !== b[column]) return (a[column] < b[column]) === ascending ? -1 : 1;
+    }
+    return 0;
+  });
+  const columns = query.columns.split(', ');
+  const data = rows.slice(0, query.limit)
+    .map((row: any) => Object.fromEntries(columns.map((column: string) => [column, row[column]])));
+  return { data, error: null };
+}
+
+export const supabase = {
+  from(table: string) {
+    const query = { table, columns: '*', filters: [] as any[], or: null, order: [] as any[], limit: Infinity };
+    queries.push(query);
+    const builder: any = {
+      select: (columns: string) => ((query.columns = columns), builder),
+      eq: (column: string, value: string) => (query.filters.push([column, value]), builder),
+      or: (filter: any) => ((query.or = filter), builder),
+      order: (column: string, { ascending }: any) => (query.order.push([column, ascending]), builder),
+      limit: (count: number) => ((query.limit = count), builder),
+      then: (resolve: any, reject: any) => Promise.resolve().then(() => run(query)).then(resolve, reject),
+    };
+    return builder;
+  },
+};
+"""
+
+# Même boucle que loadOlder : on remonte le fil tant qu'une page est pleine
+DRIVER = r"""
+import { queries } from '@/config/supabase';
+import { PAGE_SIZE, fetchOlder, upperBound } from '@/pages/MessagesPage';
+
+const [count, tied] = process.argv.slice(2).map(Number);
+const stamp = (n) => `2024-02-14T10:${String(n).padStart(2, '0')}:00.123456+00:00`;
+// Un bloc de `tied` messages partage le même horodatage, plus long qu'une page
+globalThis.messages = Array.from({ length: count }, (_, i) => ({
+  id: `m${String(i).padStart(5, '0')}`, conversation_id: 'c-1', sender_id: i % 2 ? 'u' : 'v',
+  content: `message ${i}`, created_at: stamp(i < tied ? 0 : i - tied + 1),
+}));
+globalThis.messages.push({ id: 'x', conversation_id: 'c-2', sender_id: 'u', content: 'ailleurs', created_at: stamp(0) });
+
+let rows = [];
+let hasMore = true;
+while (hasMore) {
+  const page = await fetchOlder('c-1', rows[0]);
+  hasMore = page.length === PAGE_SIZE;
+  rows = [...page, ...rows];
+}
+
+const offsets = new Float64Array([0, 72, 144, 216]);
+process.stdout.write(JSON.stringify({
+  ids: rows.map((row) => row.id),
+  columns: Object.keys(rows[0]),
+  queries,
+  bounds: [-1, 0, 71, 72, 200, 216, 500].map((value) => upperBound(offsets, value)),
+}));
+"""
+
+PAGE_SIZE = 20
+
+
+@pytest.fixture
+def src(load_script, tmp_path):
+    gen = load_script('generate-structure.py')
+    variables = gen.load_variables()
+    variables['messages']['page_size'] = PAGE_SIZE
+    content, _ = gen.Renderer(variables).render(gen.TemplateStore().read('pages', 'MessagesPage.tsx'))
+    # Node ne lit pas le JSX : seule la partie TS (requête et recherche d'offsets) est gardée
+    head = content.split('// Les lignes sont placées depuis le bas du fil')[0]
+    lines = [line for line in head.splitlines() if not line.startswith('import ') or '@/config/supabase' in line]
+    src = tmp_path / 'src'
+    for rel, text in {
+        'pages/MessagesPage.ts': '\n'.join(lines) + '\nexport { PAGE_SIZE, fetchOlder, upperBound };\n',
+        'config/supabase.ts': SUPABASE_STUB,
+    }.items():
+        (src / rel).parent.mkdir(parents=True, exist_ok=True)
+        (src / rel).write_text(text, encoding='utf-8')
+    return src
+
+
+@pytest.mark.parametrize('count, tied', [(137, 45), (120, 60), (40, 0)])
+def test_keyset_pages_walk_thread_once(run_ts, src, count, tied):
+    result = run_ts(DRIVER, src, str(count), str(tied))
+
+    # Chaque message une fois, du plus ancien au plus récent, même à horodatage égal
+    assert result['ids'] == [f'm{i:05d}' for i in range(count)]
+    assert result['columns'] == ['id', 'sender_id', 'content', 'created_at']
+    queries = result['queries']
+    assert len(queries) == count // PAGE_SIZE + 1
+    for query in queries:
+        assert query['table'] == 'messages'
+        assert query['filters'] == [['conversation_id', 'c-1']]
+        assert query['order'] == [['created_at', False], ['id', False]]
+        assert query['limit'] == PAGE_SIZE
+    assert queries[0]['or'] is None
+    assert all(query['or'] for query in queries[1:])
+
+
+def test_cursor_quotes_timestamp(run_ts, src):
+    result = run_ts(DRIVER, src, '30', '0')
+    assert result['queries'][1]['or'] == (
+        'created_at.lt."2024-02-14T10:11:00.123456+00:00",'
+        'and(created_at.eq."2024-02-14T10:11:00.123456+00:00",id.lt.m00010)'
+    )
+
+
+def test_upper_bound_finds_first_offset_past_value(run_ts, src):
+    result = run_ts(DRIVER, src, '1', '0')
+    assert result['bounds'] == [0, 1, 1, 2, 3, 4, 4]
@@ -0,0 +1,120 @@
+import pytest
+
+# lazy() retient le loader sans rien charger, comme React avant le premier rendu
+REACT_STUB = """
+export const lazy = (loader) => ({ lazy: loader });
+"""
+
+# Chaque page journalise son chargement
+PAGE_STUB = """
+((globalThis as any).loaded ??= []).push('{page}');
+export default function {page}() {{}}
+"""
+
+MANIFEST_DRIVER = r"""
+import { pages, routes, prefetchRoute, prefetchWhenIdle } from '@/routes/manifest';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+const loaded = () => [...(globalThis.loaded ?? [])];
+const result = { routes, atImport: loaded() };
+
+// Survol : un chargement par page, chemins inconnus ignorés
+prefetchRoute('/astra');
+prefetchRoute('/astra');
+prefetchRoute('/nowhere');
+await sleep(50);
+result.hover = loaded();
+
+// Temps libre : une route par callback, dans l'ordre, délai max transmis
+const timeouts = [];
+globalThis.requestIdleCallback = (callback, options) => (timeouts.push(options.timeout), setTimeout(callback, 5));
+globalThis.cancelIdleCallback = (handle) => clearTimeout(handle);
+prefetchWhenIdle(['/messages', '/astra', '/profile']);
+await sleep(200);
+result.idle = loaded();
+result.timeouts = [...timeouts];
+
+// Annulé avant le premier callback : rien n'est chargé
+prefetchWhenIdle(['/univers', '/astro'])();
+await sleep(200);
+result.cancelled = loaded();
+
+// Économie de données : pas de préchargement spéculatif
+Object.defineProperty(globalThis, 'navigator', { value: { connection: { saveData: true } }, configurable: true });
+prefetchRoute('/subscription');
+await sleep(50);
+result.saveData = loaded();
+
+// La frontière lazy() charge la même page que le préchargement
+result.lazyDefault = (await pages.LoginPage.lazy()).default.name;
+result.afterRender = loaded();
+process.stdout.write(JSON.stringify(result));
+"""
+
+CHUNKS_DRIVER = r"""
+import { manualChunks } from '@/vite.chunks';
+
+const ids = [
+  '/app/node_modules/react-dom/client.js',
+  '/app/node_modules/@supabase/postgrest-js/dist/index.js',
+  '/app/node_modules/@tanstack/react-query/build/index.mjs',
+  '/app/node_modules/some-lib/node_modules/framer-motion/dist/es/index.mjs',
+  'C:\\app\\node_modules\\openai\\index.mjs',
+  '/app/node_modules/stripe/esm/stripe.js',
+  '/app/node_modules/@stripe/stripe-js/dist/index.mjs',
+  '/app/node_modules/reactive/index.js',
+  '/app/node_modules/lodash/lodash.js',
+  '/app/src/pages/LoginPage.tsx',
+];
+process.stdout.write(JSON.stringify(ids.map((id) => manualChunks(id) ?? null)));
+"""
+
+
+@pytest.fixture
+def gen(load_script):
+    return load_script('generate-structure.py')
+
+
+@pytest.fixture
+def src(gen, tmp_path):
+    variables = gen.load_variables()
+    store = gen.TemplateStore()
+    src = tmp_path / 'src'
+    files = {
+        'routes/manifest.ts': gen.generate_route_manifest(variables, store)[0],
+        'vite.chunks.ts': gen.generate_vite_chunks(variables, store)[0],
+    }
+    _, names = gen.catalog_pages(store)
+    files.update({f'pages/{page}.ts': PAGE_STUB.format(page=page) for page in names})
+    for rel, text in files.items():
+        (src / rel).parent.mkdir(parents=True, exist_ok=True)
+        (src / rel).write_text(text, encoding='utf-8')
+    return src
+
+
+def test_manifest_lazy_loads_and_prefetches_pages(run_ts, src, gen):
+    result = run_ts(MANIFEST_DRIVER, src, stubs={'react': REACT_STUB})
+    paths = gen.load_variables()['routes']['paths']
+    assert result['routes'] == [{'path': path, 'page': page} for page, path in paths.items()]
+    # Aucune page dans le chunk initial du manifeste
+    assert result['atImport'] == []
+    assert result['hover'] == ['AstraPage']
+    assert result['idle'] == ['AstraPage', 'MessagesPage', 'ProfilePage']
+    assert result['timeouts'] == [3000] * 4
+    assert result['cancelled'] == result['idle']
+    assert result['saveData'] == result['idle']
+    assert result['lazyDefault'] == 'LoginPage'
+    assert result['afterRender'] == [*result['idle'], 'LoginPage']
+
+
+def test_manual_chunks_map_packages(run_ts, src):
+    assert run_ts(CHUNKS_DRIVER, src) == [
+        'vendor', 'supabase', 'query', 'motion', 'openai', 'stripe', 'stripe', None, None, None,
+    ]
+
+
+def test_page_without_route_path_is_rejected(gen):
+    variables = gen.load_variables()
+    del variables['routes']['paths']['AstroPage']
+    with pytest.raises(gen.TemplateError, match='AstroPage'):
+        gen.generate_route_manifest(variables, gen.TemplateStore())
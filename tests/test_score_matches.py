@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.fixture(scope='module')
+def sm(load_script):
+    return load_script('score-matches.py')
+
+
+def brute_force(sm, profiles):
+    """Matrice N × N des scores (0 : couple exclu), couple par couple."""
+    table = sm.score_table()
+    count = len(profiles)
+    scores = np.zeros((count, count), dtype=np.uint8)
+    for user in range(count):
+        for candidate in range(count):
+            if user == candidate:
+                continue
+            if not profiles.allowed[profiles.classes[user], profiles.classes[candidate]]:
+                continue
+            first, second = sorted((user, candidate))
+            scores[user, candidate] = table[profiles.archetypes[first], profiles.archetypes[second]]
+    return scores
+
+
+@pytest.mark.parametrize('count, k', [(600, 20), (1500, 5), (40, 50)])
+def test_top_k_matches_brute_force(sm, count, k):
+    profiles = sm.Profiles.synthetic(count, seed=count)
+    expected = brute_force(sm, profiles)
+    k = min(k, count - 1)
+    members, starts = sm.bucket_index(profiles)
+    chosen = np.full((count, k), -1, dtype=np.int32)
+    chosen_scores = np.zeros((count, k), dtype=np.uint8)
+    sm.choose(sm.score_table(), profiles, k, members, starts, chosen, chosen_scores, 1 << 20)
+
+    for user in range(count):
+        picked = chosen[user][chosen[user] >= 0]
+        assert len(set(picked.tolist())) == len(picked)
+        assert user not in picked
+        # Chaque candidat retenu porte son vrai score…
+        assert (chosen_scores[user, :len(picked)] == expected[user, picked]).all()
+        # …et les scores retenus sont les k meilleurs possibles
+        best = np.sort(expected[user][expected[user] > 0])[::-1][:k]
+        assert chosen_scores[user, :len(picked)].tolist() == best.tolist()
+
+
+def test_each_pair_written_once(sm):
+    profiles = sm.Profiles.synthetic(800, seed=1)
+    out = io.StringIO()
+    stats = sm.score_matches(profiles, 10, 64, out)
+    pairs = [tuple(line.split('\t')[:2]) for line in out.getvalue().splitlines()]
+    assert len(pairs) == len(set(pairs)) == stats['rows']
+    assert all(first < second for first, second in pairs)
+
+
+def test_memory_budget_counts_chosen(sm):
+    profiles = sm.Profiles.synthetic(50_000, seed=2)
+    # 50 000 × 20 × (4 + 1) octets de top-k : plus que 4 Mo
+    with pytest.raises(SystemExit):
+        sm.score_matches(profiles, 20, 4, io.StringIO())
@@ -0,0 +1,66 @@
+import json
+import shutil
+
+from conftest import ROOT
+
+# Tables générées contre synastrieService.calculateCompatibility : chaque couple
+# de signes (inconnu compris) sur chaque planète, puis toutes les combinaisons
+# d'éléments des deux thèmes (un signe par élément, 4^10 couples de thèmes)
+DRIVER = r"""
+import { synastrieService } from '@/services/astro/synastrieService';
+import { calculateCompatibility, scoreCompatibility } from '@/services/astro/synastryTables';
+
+const { signs: SIGNS, samples: SAMPLES, planets: PLANETS } = JSON.parse(process.argv[2]);
+const chart = (signs) => Object.fromEntries(PLANETS.map((planet, i) => [planet, { sign: signs[i] }]));
+
+let checked = 0;
+const mismatches = [];
+function compare(signs1, signs2) {
+  checked++;
+  const chart1 = chart(signs1);
+  const chart2 = chart(signs2);
+  const expected = synastrieService.calculateCompatibility(chart1, chart2);
+  const actual = calculateCompatibility(chart1, chart2);
+  if (JSON.stringify(actual) !== JSON.stringify(expected) || scoreCompatibility(chart1, chart2) !== expected.overall) {
+    if (mismatches.length < 20) mismatches.push(`${signs1.join('/')} × ${signs2.join('/')}`);
+  }
+}
+
+for (let slot = 0; slot < PLANETS.length; slot++) {
+  for (const sign1 of SIGNS) {
+    for (const sign2 of SIGNS) {
+      compare(
+        PLANETS.map((_, i) => (i === slot ? sign1 : SAMPLES[i % SAMPLES.length])),
+        PLANETS.map((_, i) => (i === slot ? sign2 : SAMPLES[(i + 1) % SAMPLES.length])),
+      );
+    }
+  }
+}
+const signs = new Array(PLANETS.length * 2);
+for (let code = 0; code < SAMPLES.length ** signs.length; code++) {
+  for (let i = 0, rest = code; i < signs.length; i++, rest = Math.floor(rest / SAMPLES.length)) {
+    signs[i] = SAMPLES[rest % SAMPLES.length];
+  }
+  compare(signs.slice(0, PLANETS.length), signs.slice(PLANETS.length));
+}
+process.stdout.write(JSON.stringify({ checked, mismatches }));
+"""
+
+
+def test_tables_match_synastrie_service(load_script, run_ts, tmp_path):
+    gen = load_script('generate-structure.py')
+    src = tmp_path / 'src'
+    for rel in ('services/astro/synastrieService.ts', 'utils/astroHelpers.ts'):
+        (src / rel).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(ROOT / 'src' / rel, src / rel)
+    # Tables rendues par le générateur courant, pas la copie commitée
+    (src / 'services/astro/synastryTables.ts').write_text(gen.render_synastry_tables(), encoding='utf-8')
+
+    signs = [*gen.ZODIAC_SIGNS, 'unknown']
+    samples = [next(sign for sign in gen.ZODIAC_SIGNS if gen.SIGN_ELEMENTS[sign] == element)
+               for element in dict.fromkeys(gen.SIGN_ELEMENTS[sign] for sign in gen.ZODIAC_SIGNS)]
+    planets = list(dict.fromkeys(planet for term in gen.SYNASTRY_TERMS for planet in term[2:4]))
+    result = run_ts(DRIVER, src, json.dumps({'signs': signs, 'samples': samples, 'planets': planets}))
+
+    assert result['mismatches'] == []
+    assert result['checked'] == len(planets) * len(signs) ** 2 + len(samples) ** (2 * len(planets))
@@ -0,0 +1,28 @@
+// Généré par generate-structure.py depuis routes.chunks de templates/variables.json
+// Ne pas éditer à la main
+const PACKAGES: Record<string, string> = {
+  'framer-motion': 'motion',
+  'openai': 'openai',
+  'react': 'vendor',
+  'react-dom': 'vendor',
+  'react-router': 'vendor',
+  'react-router-dom': 'vendor',
+  'scheduler': 'vendor',
+  'stripe': 'stripe',
+};
+
+const SCOPES: Record<string, string> = {
+  '@remix-run': 'vendor',
+  '@stripe': 'stripe',
+  '@supabase': 'supabase',
+  '@tanstack': 'query',
+};
+
+// .* gourmand : dernier node_modules du chemin, dépendances imbriquées comprises
+const PACKAGE_RE = /.*[\\/]node_modules[\\/]((@[^\\/]+)[\\/][^\\/]+|[^\\/]+)/;
+
+export function manualChunks(id: string): string | undefined {
+  const match = PACKAGE_RE.exec(id);
+  if (!match) return undefined;
+  return PACKAGES[match[1]] ?? (match[2] ? SCOPES[match[2]] : undefined);
+}
@@ -1,6 +1,7 @@
 import { defineConfig } from 'vite';
 import react from '@vitejs/plugin-react';
 import path from 'path';
+import { manualChunks } from './vite.chunks';
 
 export default defineConfig({
   plugins: [react()],
@@ -11,13 +12,15 @@ export default defineConfig({
   },
   build: {
     outDir: 'dist',
+    // dist/.vite/manifest.json : lu par bundle-budget.py
+    manifest: true,
     sourcemap: false,
     minify: 'esbuild',
     rollupOptions: {
       output: {
-        manualChunks: {
-          vendor: ['react', 'react-dom', 'react-router-dom'],
-        },
+        // Généré depuis routes.chunks (templates/variables.json) : openai, stripe
+        // et framer-motion ne sont chargés qu'avec les pages qui les importent
+        manualChunks,
       },
     },
   },